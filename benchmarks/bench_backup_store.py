@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Platzbedarf und Zeit des Backup-Speichers (Manifest + Chunks) gegenüber
+Vollkopien je Backup.
+
+Simuliert eine Notiz, an die zwischen zwei Backups ein paar Einträge angehängt
+werden; jedes zehnte Backup enthält zusätzlich eine Änderung mitten im Text.
+
+Aufruf aus der Repository-Wurzel:
+    python benchmarks/bench_backup_store.py [MB] [BACKUPS] [zlib|lzma|none]
+"""
+
+from __future__ import annotations
+
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench_colorize import make_journal  # noqa: E402
+
+from mindpic import settings  # noqa: E402
+from mindpic.colorize import generate_timestamp  # noqa: E402
+from mindpic.persistence import restore_backup, store_snapshot  # noqa: E402
+
+
+def _disk_usage(root: Path) -> int:
+    return sum(p.stat().st_size for p in root.rglob("*") if p.is_file())
+
+
+def run(size_mb: float, backups: int, codec: str) -> None:
+    settings.BACKUP_COMPRESSION = codec
+    rnd = random.Random(1)
+    text = make_journal(size_mb)
+    tmp = Path(tempfile.mkdtemp(prefix="mindpic-bench-"))
+    try:
+        note, store = tmp / "Allgemein.txt", tmp / "backups"
+        full_copies = 0
+        times = []
+        for n in range(backups):
+            text += "".join(f"{generate_timestamp()} Eintrag {n}.{i}\n" for i in range(rnd.randint(1, 5)))
+            if n % 10 == 9:
+                middle = rnd.randrange(len(text))
+                text = text[:middle] + "geändert " + text[middle:]
+            note.write_text(text, encoding="utf-8")
+            full_copies += note.stat().st_size
+            t0 = time.perf_counter()
+            store_snapshot(note, store / f"Allgemein_{n:04d}.txt.manifest")
+            times.append(time.perf_counter() - t0)
+
+        restored = tmp / "zurück.txt"
+        t0 = time.perf_counter()
+        restore_backup(store / f"Allgemein_{backups - 1:04d}.txt.manifest", restored)
+        restore_s = time.perf_counter() - t0
+        assert restored.read_text(encoding="utf-8") == text
+
+        size = note.stat().st_size
+        used = _disk_usage(store)
+        print(f"{size / 2**20:.1f} MB Notiz, {backups} Backups, Kompression {codec}")
+        print(f"  Vollkopien:       {full_copies / 2**20:10.1f} MB")
+        print(f"  Chunk-Speicher:   {used / 2**20:10.1f} MB ({used / size:.2f}x eine Kopie)")
+        print(f"  Chunks:           {len(list((store / 'chunks').glob('*/*'))):10d}")
+        print(f"  erstes Backup:    {times[0] * 1000:10.1f} ms")
+        print(f"  weitere (Median): {statistics.median(times[1:]) * 1000:10.1f} ms")
+        print(f"  Wiederherstellen: {restore_s * 1000:10.1f} ms")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(float(args[0]) if args else 5.0, int(args[1]) if len(args) > 1 else 100, args[2] if len(args) > 2 else "zlib")
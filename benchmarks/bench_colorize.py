@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Blockerkennung alt (iter_blocks über Zeilenliste) vs. Streaming-Scanner.
+
+Die alte Erkennung ist hier eingefroren (Stand vor dem Streaming-Scanner und dem
+Vorfilter in is_timestamp_line), damit spätere Optimierungen an iter_blocks die
+Vergleichsbasis nicht mitverschieben. Verglichen wird je Gruppe bei gleicher
+Eingabe und gleichen Kosten für Einlesen und Zerlegen:
+
+- Zeilenliste: beide bekommen dieselbe, vorab zerlegte Liste (reiner Scan)
+- Text: beide bekommen denselben str und müssen selbst Zeilen finden
+- Datei: beide öffnen und lesen dieselbe Datei in jedem Lauf
+
+Aufruf aus der Repository-Wurzel:
+    python benchmarks/bench_colorize.py [MB ...]
+"""
+
+from __future__ import annotations
+
+import mmap
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mindpic.colorize import generate_timestamp, iter_block_spans, iter_blocks  # noqa: E402
+
+_WORDS = "notiz termin kunde rückruf ticket meeting idee #incident todo erledigt".split()
+
+# --- eingefrorene Ausgangsversion (mindpic/colorize.py vor dem Scanner) ---
+_LEGACY_TS_PATTERNS = [
+    r"^\s*\d{2}-\d{2}-\d{4}\s+\d{2}:\d{2}(\:\d{2})?\s*",
+    r"^\s*\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}(\:\d{2})?\s*",
+    r"^\s*\d{2}\.\d{2}\.\d{4}\s+\d{2}:\d{2}(\:\d{2})?\s*",
+    r"^\s*\d{2}:\d{2}(\:\d{2})?\s*",
+]
+_LEGACY_TS_RE = re.compile("|".join(f"(?:{p})" for p in _LEGACY_TS_PATTERNS))
+
+
+def _legacy_is_timestamp_line(line: str) -> bool:
+    return bool(_LEGACY_TS_RE.match(line or ""))
+
+
+def _legacy_iter_blocks(lines: Iterable[str]) -> list[tuple[int, int]]:
+    lines = list(lines)
+    starts: list[int] = [i for i, ln in enumerate(lines) if _legacy_is_timestamp_line(ln)]
+
+    if not starts:
+        return [(0, len(lines))] if lines else []
+
+    blocks: list[tuple[int, int]] = []
+    for idx, s in enumerate(starts):
+        e = starts[idx + 1] if idx + 1 < len(starts) else len(lines)
+        blocks.append((s, e))
+    return blocks
+
+
+def make_journal(size_mb: float, seed: int = 1) -> str:
+    rnd = random.Random(seed)
+    parts: list[str] = []
+    size = 0
+    target = int(size_mb * 1024 * 1024)
+    ts = generate_timestamp()
+    while size < target:
+        entry = [f"{ts} {' '.join(rnd.choices(_WORDS, k=6))}"]
+        entry += [" ".join(rnd.choices(_WORDS, k=rnd.randint(4, 14))) for _ in range(rnd.randint(0, 6))]
+        chunk = "\n".join(entry) + "\n"
+        parts.append(chunk)
+        size += len(chunk)
+    return "".join(parts)
+
+
+def _best_of(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _count(spans) -> int:
+    return sum(1 for _ in spans)
+
+
+def _from_file(path: Path, scan) -> int:
+    with open(path, encoding="utf-8", newline="") as f:
+        return _count(scan(f))
+
+
+def _from_mmap(path: Path) -> int:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _count(iter_block_spans(mm))
+
+
+def _report(title: str, rows: list[tuple[str, float]]) -> None:
+    base = rows[0][1]
+    print(f"  {title}")
+    for label, secs in rows:
+        print(f"    {label:30s} {secs * 1000:9.1f} ms  ({base / secs:5.1f}x)")
+
+
+def run(size_mb: float) -> None:
+    text = make_journal(size_mb)
+    lines = text.splitlines(True)
+    blocks = len(_legacy_iter_blocks(lines))
+    assert blocks == len(iter_blocks(lines)) == _count(iter_block_spans(text))
+    print(f"{size_mb:6.1f} MB, {blocks} Blöcke")
+
+    _report(
+        "Zeilenliste (vorab zerlegt)",
+        [
+            ("alt: iter_blocks", _best_of(lambda: _legacy_iter_blocks(lines))),
+            ("neu: iter_blocks", _best_of(lambda: iter_blocks(lines))),
+        ],
+    )
+    _report(
+        "Text (str im Speicher)",
+        [
+            ("alt: splitlines + iter_blocks", _best_of(lambda: _legacy_iter_blocks(text.splitlines(True)))),
+            ("neu: iter_block_spans(str)", _best_of(lambda: _count(iter_block_spans(text)))),
+        ],
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "notiz.txt"
+        path.write_bytes(text.encode("utf-8"))
+        _report(
+            "Datei (je Lauf öffnen und lesen)",
+            [
+                ("alt: iter_blocks(Datei)", _best_of(lambda: _from_file(path, _legacy_iter_blocks))),
+                ("neu: iter_block_spans(Datei)", _best_of(lambda: _from_file(path, iter_block_spans))),
+                ("neu: iter_block_spans(mmap)", _best_of(lambda: _from_mmap(path))),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    sizes = [float(a) for a in sys.argv[1:]] or [1.0, 5.0]
+    for mb in sizes:
+        run(mb)
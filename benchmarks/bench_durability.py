@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Latenz eines Speicherzyklus je Durability-Modus ("durability" in config.json).
+
+Ein Zyklus schreibt wie der Hintergrund-Writer N Themen plus config.json und
+window_geometry.json. Gemessen wird in einem temporären Ordner im aktuellen
+Datenverzeichnis (SAVE_DIR_OVERRIDE bzw. EXE-/Repo-Ordner), damit Netzlaufwerke
+und langsame Platten mitzählen.
+
+- Autosave: Änderung an das Journal anhängen
+- Strg+S/Beenden: Journal in die .txt verdichten (mit Backup)
+- "always ohne group commit": jede Datei und ihr Verzeichnis einzeln gesynct
+
+Aufruf aus der Repository-Wurzel:
+    python benchmarks/bench_durability.py [THEMEN] [KB] [ZYKLEN]
+"""
+
+from __future__ import annotations
+
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from mindpic import settings  # noqa: E402
+from mindpic.colorize import generate_timestamp  # noqa: E402
+from mindpic.paths import get_config_path, get_data_dir, get_geometry_path  # noqa: E402
+from mindpic.persistence import SyncBatch, durable_writes, write_json_if_changed  # noqa: E402
+
+
+def _cycle(journals, texts, n: int, *, full: bool, synced: bool, grouped: bool = True) -> float:
+    """Einen Zyklus schreiben; Sekunden bis alles (ggf. gesynct) auf der Platte ist."""
+    writes = [(journal.compact if full else journal.append, text) for journal, text in zip(journals, texts)]
+    writes.append((lambda data: write_json_if_changed(get_config_path(), data), {"bench": n}))
+    writes.append((lambda data: write_json_if_changed(get_geometry_path(), data), {"x": n, "y": n}))
+    t0 = time.perf_counter()
+    batch = SyncBatch() if synced else None
+    for write, arg in writes:
+        if synced and not grouped:
+            batch = SyncBatch()
+        with durable_writes(batch):
+            write(arg)
+        if synced and not grouped:
+            batch.commit()
+    if synced and grouped:
+        batch.commit()
+    return time.perf_counter() - t0
+
+
+def _fmt(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f"{statistics.median(samples) * 1000:8.2f} ms (p95 {p95 * 1000:7.2f})"
+
+
+def run(topics: int, size_kb: int, cycles: int) -> None:
+    data_dir = get_data_dir()
+    tmp = Path(tempfile.mkdtemp(prefix=".mindpic-bench-", dir=data_dir))
+    settings.SAVE_DIR_OVERRIDE = str(tmp)  # vor dem ersten (gecachten) Pfadzugriff
+    settings.MAX_BACKUPS_PER_NOTE = 3
+    from mindpic.journal import NoteJournal
+
+    try:
+        base = ("x" * 70 + "\n") * (size_kb * 1024 // 71)
+        texts = [base for _ in range(topics)]
+        journals = []
+        for i in range(topics):
+            journal = NoteJournal(f"bench{i}", "")
+            journal.compact(base)
+            journals.append(journal)
+
+        rows = (
+            ("none", False, False, True),
+            ("explicit", False, True, True),
+            ("always", True, True, True),
+            ("always ohne group commit", True, True, False),
+        )
+        print(f"Datenverzeichnis: {data_dir}")
+        print(f"{topics} Themen à {size_kb} KB + config + Geometrie, {cycles} Zyklen")
+        print(f"  {'Modus':26s} {'Autosave (Journal)':>30s} {'Strg+S/Beenden (Verdichten)':>32s}")
+        n = 0
+        for label, sync_autosave, sync_explicit, grouped in rows:
+            autosave, explicit = [], []
+            for _ in range(cycles):
+                n += 1
+                texts = [t + f"{generate_timestamp()} Eintrag {n}\n" for t in texts]
+                autosave.append(_cycle(journals, texts, n, full=False, synced=sync_autosave, grouped=grouped))
+                n += 1
+                texts = [t + f"{generate_timestamp()} Eintrag {n}\n" for t in texts]
+                explicit.append(_cycle(journals, texts, n, full=True, synced=sync_explicit, grouped=grouped))
+            print(f"  {label:26s} {_fmt(autosave):>30s} {_fmt(explicit):>32s}")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    topics, size_kb, cycles = (args + [3, 200, 20][len(args):])[:3]
+    run(topics, size_kb, cycles)
@@ -15,24 +15,64 @@ from __future__ import annotations
 
 import logging
 import os
+import queue
 import sys
+import threading
 import time
 import webbrowser
+from bisect import bisect_left, bisect_right
+from copy import deepcopy
 from dataclasses import asdict
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 
 import tkinter as tk
 from tkinter import simpledialog
 
 from . import settings
 from .config_io import load_config, save_config
-from .persistence import load_content, save_content, load_window_geometry, save_window_geometry, WindowGeometry
+from .persistence import (
+    SidecarIndex,
+    WindowGeometry,
+    load_sidecar_index,
+    load_tag_index,
+    load_window_geometry,
+    save_sidecar_index,
+    save_tag_index,
+    save_window_geometry,
+)
 from .paths import get_data_dir, get_log_path, get_manual_path
 from .note_store import ensure_topics, normalize_topic_name, unique_topic_name
-from .colorize import iter_blocks, pick_color_index, generate_timestamp
+from .colorize import (
+    INLINE_TAGS,
+    BlockIndex,
+    RuleSet,
+    generate_timestamp,
+    inline_spans,
+    set_timestamp_formats,
+    timestamp_of,
+)
+from .navigation import (
+    DateIndex,
+    EntryFilter,
+    EntryOutline,
+    Timeline,
+    blocks_containing,
+    body_line_ranges,
+    hidden_line_ranges,
+    parse_date_query,
+    parse_date_range,
+    preset_range,
+)
+from .hashtags import TagIndex, merged_counts, tag_postings
+from .journal import NoteJournal, load_journaled_content
+from .reminders import Reminder, ReminderIndex, ReminderScheduler
+from .stats import TopicStats, stats_report
+from .tagging import TagApplier, tk_line_pairs
 from .hotkeys import HotkeyManager
 from .tray import TrayCallbacks, TrayController
+from .writer import PersistenceWorker
 from . import ui as ui_mod
 
 logger = logging.getLogger(__name__)
@@ -50,11 +90,24 @@ class MindPicApp:
 
         # --- runtime state
         self.config = load_config()
+        set_timestamp_formats(self.config.get("timestamp_formats"))
         self._visible = True
-        self._last_user_edit_ts = 0.0
+        self._dirty_topics: set[str] = set()  # seit dem letzten Speichern bearbeitet
         self._autosave_job: Optional[str] = None
         self._autohide_job: Optional[str] = None
         self._config_save_job: Optional[str] = None
+        self._geometry_dirty = False  # Fenster verschoben/Größe geändert, noch nicht gespeichert
+        # Plattenzugriffe laufen im Hintergrund (Netzlaufwerk blockiert sonst die UI)
+        # Ergebnisse des Writers: der Worker fasst kein Tk an (root.after aus einem
+        # Thread wartet auf die Hauptschleife, die beim Beenden in stop() hängt)
+        self._write_results: queue.SimpleQueue = queue.SimpleQueue()
+        self._write_poll_job: Optional[str] = None
+        self._writer = PersistenceWorker(self._on_write_done)
+        self._journals: dict[str, NoteJournal] = {}  # nur im Writer-Thread benutzen
+        self._journaled: set[str] = set()  # Journal noch nicht in die .txt verdichtet
+        # Thema -> Backup erzwingen: Verdichtung angefordert, vom Writer noch nicht begonnen
+        self._compact_requests: dict[str, bool] = {}
+        self._compact_lock = threading.Lock()
         self._last_hotkey_toggle_ts = 0.0
         self._topics = ensure_topics(self.config.get("topics"))
         self._current_topic = normalize_topic_name(str(self.config.get("active_topic", self._topics[0])))
@@ -63,6 +116,28 @@ class MindPicApp:
         self.config["topics"] = self._topics
         self.config["active_topic"] = self._current_topic
         self._last_saved_at: float | None = None
+        self._block_indexes: dict[str, BlockIndex] = {}
+        self._rule_set: RuleSet | None = None  # Farbregeln, beim ersten Index kompiliert
+        self._date_indexes: dict[str, DateIndex] = {}
+        self._outlines: dict[str, EntryOutline] = {}
+        self._timeline: Timeline | None = None
+        self._tag_indexes: dict[str, TagIndex] = {}
+        self._tag_results: list[tuple[str, int]] = []
+        # offener Filter des aktuellen Themas; nach Edits nur geänderte Blöcke neu prüfen
+        self._entry_filter: EntryFilter | None = None
+        self._filter_job: Optional[str] = None
+        self._topic_stats: dict[str, TopicStats] = {}
+        self._reminders = ReminderScheduler()
+        self._reminder_indexes: dict[str, ReminderIndex] = {}
+        self._reminder_job: Optional[str] = None
+        self._tag_appliers: dict[str, TagApplier] = {}
+        # Blockindizes ohne Sidecar: nach dem ersten Einfärben im Hintergrund bauen,
+        # fertige Indizes kommen über die Queue zurück (der Thread fasst kein Tk an)
+        self._index_rebuilds: list[tuple[str, str]] = []
+        self._index_results: queue.SimpleQueue = queue.SimpleQueue()
+        self._index_poll_job: Optional[str] = None
+        self._recolor_generation = 0
+        self._recolor_slice_job: Optional[str] = None
 
         # helpers
         self._dragger = ui_mod.BorderlessDragger()
@@ -83,7 +158,7 @@ class MindPicApp:
         self.ui = ui_mod.create_widgets(
             self.root,
             self.config,
-            on_save_clicked=lambda: self.save_current_state(recolorize=False),
+            on_save_clicked=lambda: self.save_current_state(recolorize=False, explicit=True),
             on_timestamp_clicked=self.save_with_timestamp,
         )
 
@@ -109,15 +184,18 @@ class MindPicApp:
         # load topic content into Text widgets
         self._setup_topic_tabs()
         self._recolorize()
+        self._start_index_rebuilds()
 
         # binds
-        self._bind_text_widget(self.ui.text)
-        for text in self.ui.texts.values():
-            if text is not self.ui.text:
-                self._bind_text_widget(text)
+        for topic, text in self.ui.texts.items():
+            self._bind_text_widget(text, topic)
         self.ui.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
-        self.root.bind("<Control-s>", lambda _e: self._return_break(self.save_current_state))
+        self.root.bind("<Control-s>", lambda _e: self._return_break(lambda: self.save_current_state(explicit=True)))
         self.root.bind("<Control-f>", self.find_text)
+        self.root.bind("<Control-g>", self.goto_date)
+        self.root.bind("<Control-F>", self.show_filter_bar)
+        self.root.bind("<Control-T>", self.show_tag_picker)
+        self.root.bind("<Control-period>", self.toggle_fold)
         self.root.bind("<Control-n>", self.add_topic_from_dialog)
         self.root.bind(settings.LOCAL_TOGGLE_KEY, self.toggle_visibility_from_hotkey)
 
@@ -135,6 +213,8 @@ class MindPicApp:
                 toggle_topmost=self.toggle_topmost,
                 toggle_borderless=self._menu_set_borderless,
                 toggle_autohide=self._menu_set_autohide,
+                toggle_outline=self._menu_set_outline,
+                toggle_timeline=self._menu_set_timeline,
                 set_alpha=self._menu_set_alpha,
                 change_text_color=self._menu_set_text_color,
                 change_background_color=self._menu_set_bg_color,
@@ -143,12 +223,25 @@ class MindPicApp:
                 open_manual=self.open_manual,
                 add_topic=lambda: (self.add_topic_from_dialog(), None)[1],
                 find_text=lambda: (self.find_text(), None)[1],
+                goto_date=lambda: (self.goto_date(), None)[1],
+                filter_dates=lambda: (self.filter_dates(), None)[1],
+                show_filter_bar=lambda: (self.show_filter_bar(), None)[1],
+                tag_picker=lambda: (self.show_tag_picker(), None)[1],
+                show_stats=self.show_stats,
+                toggle_fold=lambda: (self.toggle_fold(), None)[1],
+                fold_all=self.fold_all,
+                unfold_all=self.unfold_all,
                 open_data_dir=self.open_data_dir,
                 open_log=self.open_log,
                 quit_app=self.quit_app,
             ),
         )
 
+        if self.config.get("outline_visible"):
+            self._show_outline(True)
+        if self.config.get("timeline_visible"):
+            self._show_timeline(True)
+
         # tray
         if settings.ENABLE_TRAY:
             self._start_tray()
@@ -162,6 +255,8 @@ class MindPicApp:
         # autosave timer
         self._schedule_autosave()
 
+        self._start_reminders()
+
         # window close
         self.root.protocol("WM_DELETE_WINDOW", self.quit_app)
 
@@ -207,41 +302,156 @@ class MindPicApp:
         self._apply_topmost(new_val)
         self._schedule_config_save()
 
-    def save_current_state(self, *, recolorize: bool = False) -> None:
+    def save_current_state(self, *, recolorize: bool = False, compact: bool = True, explicit: bool = False) -> None:
         """
-        Speichert Inhalt, Konfiguration und Fenstergeometrie ohne Seiteneffekte.
+        Speichert Inhalt, Konfiguration und (falls verschoben) Fenstergeometrie ohne Seiteneffekte.
 
         Diese Methode wird für Autosave und Beenden verwendet. Sie fügt bewusst
         keinen Zeitstempel ein; Zeitstempel sind eine explizite Nutzeraktion über
-        den Save-Button.
+        den Save-Button. Mit compact=False (Autosave) wird die Änderung nur an
+        das Journal angehängt; explicit=True (Strg+S, Button) fsynct im Modus "explicit".
         """
-        text = self.ui.text.get("1.0", "end-1c")
-        save_content(text, topic=self._current_topic)
+        durable = self._durable(explicit)
+        pending = self._save_topic(self._current_topic, self.ui.text, compact=compact, durable=durable, explicit=explicit)
         self.config["topics"] = self._topics
         self.config["active_topic"] = self._current_topic
-        save_config(self.config)
-        self._save_geometry()
-        self._mark_saved()
+        self._save_config_now(durable=durable)
+        self._mark_saving(pending)
 
         if recolorize:
             self._recolorize()
 
-    def save_all_topics(self) -> None:
+    def save_all_topics(self, *, explicit: bool = False) -> None:
+        durable = self._durable(explicit)
+        pending = False
         for topic in self._topics:
-            text = self.ui.texts[topic].get("1.0", "end-1c")
-            save_content(text, topic=topic)
+            pending = self._save_topic(topic, self.ui.texts[topic], durable=durable, explicit=explicit) or pending
         self.config["topics"] = self._topics
         self.config["active_topic"] = self._current_topic
-        save_config(self.config)
-        self._save_geometry()
-        self._mark_saved()
+        self._save_config_now(durable=durable)
+        self._mark_saving(pending)
+
+    def _durable(self, explicit: bool) -> bool:
+        """Schreibvorgänge dieses Speicherns fsyncen? (config "durability")"""
+        mode = str(self.config.get("durability", settings.DEFAULT_DURABILITY))
+        if mode not in settings.DURABILITY_MODES:
+            mode = settings.DEFAULT_DURABILITY
+        return mode == "always" or (mode == "explicit" and explicit)
+
+    def _save_topic(
+        self, topic: str, widget: tk.Text, *, compact: bool = True, durable: bool = False, explicit: bool = False
+    ) -> bool:
+        """
+        Text eines Themas nur auslesen, wenn er seit dem letzten Speichern geändert
+        wurde (oder noch im Journal steht und verdichtet werden soll), und dem
+        Hintergrund-Writer übergeben. True, wenn Inhalt ansteht. explicit: beim
+        Verdichten auf jeden Fall ein Backup anlegen (sonst gedrosselt). Der
+        Tag-Index wird nur beim Verdichten geschrieben, nie zu Journal-Anhängen.
+        """
+        tags = self._tag_indexes.get(topic)
+        with self._compact_lock:
+            # ersetzt dieser Auftrag eine wartende Verdichtung, muss er selbst verdichten
+            compact = compact or topic in self._compact_requests
+        flush = topic in self._dirty_topics or (compact and topic in self._journaled)
+        if not flush and not (compact and tags is not None and tags.changed):
+            return False
+        self._dirty_topics.discard(topic)
+        text = widget.get("1.0", "end-1c")
+        if flush:
+            journal = self._journals[topic]
+            if compact:
+                self._journaled.discard(topic)
+                sidecar = self._sidecar_snapshot(topic)
+                tag_state = self._tag_snapshot(topic)
+                with self._compact_lock:
+                    self._compact_requests[topic] = explicit or self._compact_requests.get(topic, False)
+                self._writer.submit(
+                    ("content", topic), self._compact_topic, journal, text, sidecar, tag_state, durable=durable
+                )
+            else:
+                self._journaled.add(topic)
+                self._writer.submit(("content", topic), journal.append, text, durable=durable)
+        else:
+            self._save_tag_index(topic, text)
+        return flush
+
+    def _compact_topic(
+        self,
+        journal: NoteJournal,
+        text: str,
+        sidecar: SidecarIndex | None,
+        tag_state: tuple[dict[str, list[int]], int, bool] | None = None,
+    ) -> None:
+        """Im Writer-Thread: Notiz (mit Backup), passenden Sidecar und Tag-Index schreiben, Journal löschen."""
+        with self._compact_lock:
+            force_backup = self._compact_requests.pop(journal.topic, False)
+        written = journal.compact(text, force_backup=force_backup)
+        if written and sidecar is not None:
+            save_sidecar_index(text, sidecar, journal.topic)
+        if tag_state is not None:
+            postings, count, changed = tag_state
+            # neuer Text braucht einen neuen Hash, sonst reicht die alte Datei
+            if written or changed:
+                save_tag_index(text, postings, count, journal.topic)
+
+    def _on_write_done(self, key: tuple[str, str | None], error: Exception | None) -> None:
+        # läuft im Writer-Thread: nur einreihen, _poll_write_results holt es ab
+        self._write_results.put((key, error))
+
+    def _schedule_write_poll(self) -> None:
+        if self._write_poll_job is None:
+            self._write_poll_job = self.root.after(settings.WRITE_RESULT_POLL_MS, self._poll_write_results)
+
+    def _poll_write_results(self) -> None:
+        """UI-Thread: Ergebnisse des Writers übernehmen, solange noch etwas aussteht."""
+        self._write_poll_job = None
+        while True:
+            try:
+                key, error = self._write_results.get_nowait()
+            except queue.Empty:
+                break
+            self._write_finished(key, error)
+        if self._writer.pending():
+            self._schedule_write_poll()
+
+    def _write_finished(self, key: tuple[str, str | None], error: Exception | None) -> None:
+        kind, topic = key
+        if kind != "content":
+            return
+        if error is not None:
+            # beim nächsten Autosave erneut versuchen
+            self._dirty_topics.add(topic)
+            try:
+                self.ui.status_label.configure(text=f"Speichern fehlgeschlagen: {topic}")
+            except Exception:
+                pass
+        elif not self._writer.pending():
+            self._mark_saved()
+
+    def _mark_saving(self, pending: bool) -> None:
+        if not pending:
+            self._mark_saved()
+            return
+        self._schedule_write_poll()
+        try:
+            self.ui.status_label.configure(text="Speichere…")
+        except Exception:
+            pass
+
+    def _flush_writes(self) -> None:
+        """Beim Beenden: Hintergrund-Writer leeren, aber nicht unbegrenzt warten."""
+        if self._writer.stop(settings.WRITE_FLUSH_TIMEOUT_S):
+            return
+        logger.error("Background writer still busy after %ss, writing the rest directly", settings.WRITE_FLUSH_TIMEOUT_S)
+        for key in self._writer.drain():
+            logger.error("Write %s did not finish before exit", key)
 
     def save_with_timestamp(self) -> None:
         """
         Expliziter Save-Button: Zeitstempel einfügen und danach speichern.
         """
         self._insert_timestamp()
-        self.save_current_state(recolorize=False)
+        self.save_current_state(recolorize=False, explicit=True)
 
     def save_all(self) -> None:
         """
@@ -270,34 +480,89 @@ class MindPicApp:
             ui_mod.apply_font(self.ui, self.config)
 
         for topic, text in self.ui.texts.items():
+            content = load_journaled_content(topic)
+            self._journals[topic] = NoteJournal(topic, content)
             text.delete("1.0", "end")
-            text.insert("1.0", load_content(topic))
+            text.insert("1.0", content)
+            self._restore_block_index(topic, content)
 
         if self._current_topic in self.ui.texts:
             self.ui.notebook.select(self._tab_id_for_topic(self._current_topic))
             self.ui.text = self.ui.texts[self._current_topic]
         self._mark_saved("Bereit")
 
-    def _bind_text_widget(self, text: tk.Text) -> None:
-        text.bind("<<Modified>>", self._on_text_modified)
-        text.bind("<KeyRelease>", lambda _e: self._recolorize_debounced())
+    def _bind_text_widget(self, text: tk.Text, topic: str) -> None:
+        text.bind("<<Modified>>", lambda _e: self._on_text_modified(topic))
+        index = self._block_index(topic)
+        applier = self._tag_appliers.setdefault(topic, TagApplier())
+        scrollbar = self.ui.scrollbars[topic]
+
+        def _on_scroll(first: str, last: str) -> None:
+            scrollbar.set(first, last)
+            self._on_text_scrolled(topic)
+
+        text.configure(yscrollcommand=_on_scroll)
+
+        def _on_edit(first: int, removed: int, added: int) -> None:
+            # <<Modified>> kommt erst über die Ereignisschleife; so ist auch ein
+            # Einfügen direkt vor dem Speichern (Zeitstempel) schon als geändert markiert
+            self._dirty_topics.add(topic)
+            index.apply_edit(first, removed, added, lambda a, b: self._read_lines(text, a, b))
+            applier.shift(first, removed, added)
+            stats = self._topic_stats.get(topic)
+            if stats is not None:
+                stats.note_edit(first)
+            # laufenden Einfärbe-Job abbrechen; der debounced Lauf startet neu
+            self._recolor_generation += 1
+            self._recolorize_debounced()
+
+        # Nur echte Änderungen lösen Recolorize aus (Cursor-Tasten nicht)
+        ui_mod.install_edit_hook(text, _on_edit)
+
+        text.bind("<Control-Up>", lambda _e: self.jump_entry(-1))
+        text.bind("<Control-Down>", lambda _e: self.jump_entry(1))
+
+        # Links: Strg+Klick öffnet im Browser. Am Widget gebunden, denn nur dort
+        # verhindert "break" die Klassenbindung (Cursor setzen/Markieren)
+        text.bind("<Control-Button-1>", lambda e: self._open_link_at(text, e))
+        text.tag_bind("inline_url", "<Enter>", lambda _e: text.configure(cursor="hand2"))
+        text.tag_bind("inline_url", "<Leave>", lambda _e: text.configure(cursor="xterm"))
+
+    @staticmethod
+    def _read_lines(text: tk.Text, start: int, end: int) -> list[str]:
+        """Zeilen [start, end) (0-basiert) ohne Zeilenende."""
+        return text.get(f"{start + 1}.0", f"{end + 1}.0").split("\n")[: end - start]
 
     def _tab_id_for_topic(self, topic: str) -> str:
-        idx = self._topics.index(topic)
-        return self.ui.notebook.tabs()[idx]
+        # Tab-Widget ist der Frame um das Textfeld (die Position verschiebt die Zeitleiste)
+        return str(self.ui.texts[topic].master)
+
+    def _topic_for_tab(self, tab_id: str) -> str | None:
+        """Thema zu einem Notebook-Tab; None für die Zeitleiste."""
+        for topic, text in self.ui.texts.items():
+            if str(text.master) == str(tab_id):
+                return topic
+        return None
 
     def _on_tab_changed(self, _event=None) -> None:
         try:
             self.save_current_state(recolorize=False)
         except Exception as e:
             logger.error("Failed to save before tab switch: %s", e)
-        selected = self.ui.notebook.select()
-        idx = self.ui.notebook.tabs().index(selected)
-        self._current_topic = self._topics[idx]
+        topic = self._topic_for_tab(self.ui.notebook.select())
+        if topic is None:
+            self._refresh_timeline()
+            return
+        self.ui.text.tag_remove("entry_filter", "1.0", "end")
+        self._drop_entry_filter()
+        self._current_topic = topic
         self.ui.text = self.ui.texts[self._current_topic]
         self.config["active_topic"] = self._current_topic
         self._mark_saved(f"Thema: {self._current_topic}")
         self._recolorize()
+        bar = self.ui.filter_bar
+        if bar is not None and bar.frame.winfo_ismapped():
+            self._apply_filter()
 
     def add_topic_from_dialog(self, _event=None) -> str:
         name = simpledialog.askstring("Neues Thema", "Name des Themas:", parent=self.root)
@@ -305,12 +570,15 @@ class MindPicApp:
             return "break"
         topic = unique_topic_name(name, self._topics)
         self._topics.append(topic)
+        self._journals[topic] = NoteJournal(topic, "")
         text, scrollbar = ui_mod.add_topic_tab(self.ui.notebook, topic, self.config)
         self.ui.texts[topic] = text
         self.ui.scrollbars[topic] = scrollbar
-        self._bind_text_widget(text)
+        self._bind_text_widget(text, topic)
         ui_mod.apply_colors(self.ui, self.config)
         ui_mod.apply_font(self.ui, self.config)
+        if self.ui.timeline is not None:
+            self.ui.notebook.insert("end", self.ui.timeline.frame)
         self.ui.notebook.select(self._tab_id_for_topic(topic))
         self.config["topics"] = self._topics
         self._schedule_config_save()
@@ -345,6 +613,436 @@ class MindPicApp:
             self._mark_saved(f"Nicht gefunden: {needle}")
         return "break"
 
+    def goto_date(self, _event=None) -> str:
+        query = simpledialog.askstring(
+            "Gehe zu Datum", "Datum (z.B. 14.03.2025, 03.2025 oder 2025):", parent=self.root
+        )
+        if not query:
+            return "break"
+        span = parse_date_query(query)
+        if span is None:
+            self._mark_saved(f"Unbekanntes Datum: {query}")
+            return "break"
+        topic = self._current_topic
+        index = self._ready_block_index(topic)
+        b_idx = self._date_index(topic).first_at_or_after(span[0])
+        if b_idx is None:
+            self._mark_saved("Keine datierten Einträge")
+            return "break"
+        pos = f"{index.starts[b_idx] + 1}.0"
+        text = self.ui.text
+        text.mark_set("insert", pos)
+        text.yview(pos)
+        when = index.block_time(b_idx)
+        self._mark_saved(f"Eintrag vom {when:%d.%m.%Y %H:%M}" if when else None)
+        return "break"
+
+    def filter_dates(self, _event=None) -> str:
+        """Zeitraum per Dialog in die Filterleiste übernehmen (leere Eingabe = alle zeigen)."""
+        query = simpledialog.askstring(
+            "Zeitraum filtern",
+            "Zeitraum (z.B. 01.03.2025 - 31.03.2025 oder 2024..2025), leer = alle:",
+            parent=self.root,
+        )
+        if query is None:
+            return "break"
+        bar = self._ensure_filter_bar()
+        bar.range_var.set(query.strip() or next(iter(settings.FILTER_RANGE_PRESETS)))
+        return "break"
+
+    def show_filter_bar(self, _event=None) -> str:
+        bar = self._ensure_filter_bar()
+        bar.entry.focus_set()
+        return "break"
+
+    def _ensure_filter_bar(self) -> ui_mod.FilterBar:
+        bar = self.ui.filter_bar
+        if bar is None:
+            bar = self.ui.filter_bar = ui_mod.create_filter_bar(
+                self.ui.main_frame,
+                on_change=self._schedule_filter,
+                on_close=self._close_filter_bar,
+            )
+        if not bar.frame.winfo_ismapped():
+            bar.frame.pack(side="top", fill="x", pady=(0, 6), before=self.ui.notebook)
+        return bar
+
+    def _close_filter_bar(self) -> None:
+        bar = self.ui.filter_bar
+        if bar is None:
+            return
+        bar.text_var.set("")
+        bar.range_var.set(next(iter(settings.FILTER_RANGE_PRESETS)))
+        bar.frame.pack_forget()
+        self.ui.text.focus_set()
+
+    def _schedule_filter(self) -> None:
+        if self._filter_job:
+            try:
+                self.root.after_cancel(self._filter_job)
+            except Exception:
+                pass
+        self._filter_job = self.root.after(settings.FILTER_DEBOUNCE_MS, self._apply_filter)
+
+    def _drop_entry_filter(self) -> None:
+        if self._entry_filter is not None:
+            self._entry_filter.close()
+            self._entry_filter = None
+
+    def _update_filter(self) -> None:
+        """Nach Edits: nur die seitdem geänderten Blöcke neu gegen den offenen Filter prüfen."""
+        entry_filter = self._entry_filter
+        if entry_filter is None:
+            return
+        show, hide = entry_filter.update()
+        text = self.ui.text
+        try:
+            if show:
+                text.tk.call(str(text), "tag", "remove", "entry_filter", *tk_line_pairs(show))
+            if hide:
+                text.tag_add("entry_filter", *tk_line_pairs(hide))
+        except tk.TclError as e:
+            logger.debug("entry filter update failed: %s", e)
+
+    def _apply_filter(self) -> None:
+        """
+        Blendet alle Einträge aus, die nicht zu Text und Zeitraum der Filterleiste
+        passen – per elide-Tag auf den Blockbereichen, der Text bleibt unverändert.
+        Danach führt ein EntryFilter das Ergebnis bei Edits blockweise nach.
+        """
+        self._filter_job = None
+        self._drop_entry_filter()
+        text = self.ui.text
+        text.tag_remove("entry_filter", "1.0", "end")
+        bar = self.ui.filter_bar
+        if bar is None:
+            return
+        needle = bar.text_var.get().strip()
+        range_text = bar.range_var.get().strip()
+        span = None
+        if range_text and range_text in settings.FILTER_RANGE_PRESETS:
+            span = preset_range(range_text)
+        elif range_text:
+            span = parse_date_range(range_text)
+            if span is None:
+                self._mark_saved(f"Unbekannter Zeitraum: {range_text}")
+                return
+        if not needle and span is None:
+            self._mark_saved("Filter aufgehoben")
+            return
+
+        topic = self._current_topic
+        index = self._ready_block_index(topic)
+        if not index.starts:
+            return
+        shown: set[int] = set(range(len(index.starts)))
+        if span is not None:
+            shown &= set(self._date_index(topic).between(*span))
+        # "#tag" sucht exakt über den Tag-Index, der Rest als Teilstring
+        words = needle.split()
+        tags = [w for w in words if len(w) > 1 and w.startswith("#")]
+        for tag in tags:
+            shown &= self._tag_index(topic).blocks(tag)
+        rest = " ".join(w for w in words if len(w) <= 1 or not w.startswith("#"))
+        if rest:
+            shown &= blocks_containing(index, text.get("1.0", "end-1c"), rest)
+        hidden = hidden_line_ranges(index, shown)
+        if hidden:
+            text.tag_add("entry_filter", *tk_line_pairs(hidden))
+        self._entry_filter = EntryFilter(index, self._filter_matcher(topic, span, tags, rest))
+        self._mark_saved(f"Filter: {len(shown)} von {len(index.starts)} Einträgen")
+
+    def _filter_matcher(
+        self, topic: str, span: tuple[datetime, datetime] | None, tags: list[str], rest: str
+    ) -> Callable[[int], bool]:
+        """Prüft einen einzelnen Block gegen den Filter (dieselben Regeln wie _apply_filter)."""
+        index = self._block_index(topic)
+        wanted = {tag.lstrip("#").casefold() for tag in tags}
+        needle = rest.casefold()
+        text = self.ui.texts[topic]
+
+        def matches(b_idx: int) -> bool:
+            if span is not None:
+                when = index.block_time(b_idx)
+                if when is None or not span[0] <= when < span[1]:
+                    return False
+            if wanted and not wanted <= self._tag_index(topic).tags_of(b_idx):
+                return False
+            if needle:
+                end = index.starts[b_idx + 1] if b_idx + 1 < len(index.starts) else index.line_count
+                return needle in "\n".join(self._read_lines(text, index.starts[b_idx], end)).casefold()
+            return True
+
+        return matches
+
+    def show_tag_picker(self, _event=None) -> str:
+        picker = self.ui.tag_picker
+        if picker is not None and picker.exists():
+            picker.reload()
+            picker.window.lift()
+            picker.entry.focus_set()
+            return "break"
+        self.ui.tag_picker = ui_mod.TagPicker(
+            self.root,
+            self.config,
+            list_tags=lambda all_topics: merged_counts(self._tag_indexes_for(all_topics)),
+            on_tag=self._on_tag_picked,
+            result_text=self._tag_result_row,
+            on_result=lambda i: self._goto_topic_block(*self._tag_results[i]),
+        )
+        return "break"
+
+    def _tag_index(self, topic: str) -> TagIndex:
+        tags = self._tag_indexes.get(topic)
+        if tags is None:
+            index = self._ready_block_index(topic)
+            text = self.ui.texts[topic]
+            tags = self._tag_indexes[topic] = TagIndex(index, lambda a, b: self._read_lines(text, a, b))
+            stored = load_tag_index(text.get("1.0", "end-1c"), len(index.starts), topic)
+            if stored is not None:
+                tags.load(stored)
+        return tags
+
+    def _tag_indexes_for(self, all_topics: bool) -> dict[str, TagIndex]:
+        topics = self._topics if all_topics else [self._current_topic]
+        return {topic: self._tag_index(topic) for topic in topics}
+
+    def _on_tag_picked(self, tag: str, all_topics: bool) -> int:
+        """Treffer für die Liste im Tag-Fenster; im aktuellen Thema zusätzlich filtern."""
+        self._tag_results = tag_postings(self._tag_indexes_for(all_topics), tag)
+        if not all_topics:
+            bar = self._ensure_filter_bar()
+            bar.text_var.set(f"#{tag}")
+            self._apply_filter()
+        return len(self._tag_results)
+
+    def _tag_result_row(self, i: int) -> str:
+        topic, b_idx = self._tag_results[i]
+        return f"[{topic}]  {self._outline(topic).title(b_idx)}"
+
+    def _tag_snapshot(self, topic: str) -> tuple[dict[str, list[int]], int, bool] | None:
+        """Postings, Blockzahl und changed-Flag des Tag-Index für die Verdichtung."""
+        tags = self._tag_indexes.get(topic)
+        if tags is None:
+            return None
+        postings = tags.postings()
+        changed, tags.changed = tags.changed, False
+        return postings, len(self._block_index(topic).starts), changed
+
+    def _save_tag_index(self, topic: str, text: str) -> None:
+        tags = self._tag_indexes.get(topic)
+        if tags is None or not tags.changed:
+            return
+        postings = tags.postings()
+        count = len(self._block_index(topic).starts)
+        tags.changed = False
+        self._writer.submit(("tags", topic), save_tag_index, text, postings, count, topic)
+
+    def show_stats(self) -> None:
+        window = self.ui.stats_window
+        if window is not None and window.exists():
+            window.refresh()
+            window.window.lift()
+            return
+        self.ui.stats_window = ui_mod.StatsWindow(self.root, self.config, report=self._stats_report)
+
+    def _stats_report(self) -> str:
+        return stats_report({t: (self._stats(t), self._date_index(t)) for t in self._topics})
+
+    def _stats(self, topic: str) -> TopicStats:
+        stats = self._topic_stats.get(topic)
+        if stats is None:
+            text = self.ui.texts[topic]
+            stats = self._topic_stats[topic] = TopicStats(
+                self._ready_block_index(topic),
+                lambda a, b: self._read_lines(text, a, b),
+            )
+        return stats
+
+    def _update_count_label(self) -> None:
+        """Live-Zähler der Statuszeile; liest nur seit dem letzten Mal geänderte Blöcke."""
+        label = self.ui.count_label
+        if label is None:
+            return
+        stats = self._stats(self._current_topic)
+        chars = f"{stats.chars():,}".replace(",", ".")
+        try:
+            label.configure(text=f"{stats.entries} Einträge · {chars} Zeichen")
+        except Exception:
+            pass
+
+    def toggle_fold(self, _event=None) -> str:
+        """Klappt den Eintrag unter dem Cursor auf seine Kopfzeile zusammen (oder wieder auf)."""
+        index = self._ready_block_index(self._current_topic)
+        text = self.ui.text
+        b_idx = bisect_right(index.starts, self._insert_line()) - 1
+        if b_idx < 0:
+            return "break"
+        bodies = body_line_ranges(index, [b_idx])
+        if not bodies:
+            return "break"
+        first, last = tk_line_pairs(bodies)
+        if text.tag_nextrange("fold", first, last):
+            text.tag_remove("fold", first, last)
+        else:
+            text.mark_set("insert", f"{index.starts[b_idx] + 1}.end")
+            text.tag_add("fold", first, last)
+        return "break"
+
+    def fold_all(self) -> None:
+        index = self._ready_block_index(self._current_topic)
+        bodies = body_line_ranges(index, range(len(index.starts)))
+        if not bodies:
+            return
+        text = self.ui.text
+        b_idx = bisect_right(index.starts, self._insert_line()) - 1
+        if b_idx >= 0:
+            text.mark_set("insert", f"{index.starts[b_idx] + 1}.end")
+        text.tag_add("fold", *tk_line_pairs(bodies))
+
+    def unfold_all(self) -> None:
+        self.ui.text.tag_remove("fold", "1.0", "end")
+
+    def jump_entry(self, direction: int) -> str:
+        """Strg+Hoch/Runter: zum vorherigen bzw. nächsten Eintrag."""
+        topic = self._current_topic
+        index = self._ready_block_index(topic)
+        line = self._insert_line()
+        if direction < 0:
+            b_idx = bisect_left(index.starts, line) - 1
+        else:
+            b_idx = bisect_right(index.starts, line)
+        if 0 <= b_idx < len(index.starts):
+            self._goto_block(b_idx)
+        return "break"
+
+    def _insert_line(self) -> int:
+        """Zeile (0-basiert) des Cursors im aktiven Textfeld."""
+        return int(self.ui.text.index("insert").split(".")[0]) - 1
+
+    def _goto_topic_block(self, topic: str, b_idx: int) -> None:
+        """Zu Block b_idx in topic springen, ggf. nach dem Tabwechsel."""
+        if self._topic_for_tab(self.ui.notebook.select()) != topic:
+            self.ui.notebook.select(self._tab_id_for_topic(topic))
+            # <<NotebookTabChanged>> kommt erst aus der Ereignisschleife
+            self.root.after_idle(lambda: self._goto_topic_block_now(topic, b_idx))
+            return
+        self._goto_topic_block_now(topic, b_idx)
+
+    def _goto_topic_block_now(self, topic: str, b_idx: int) -> None:
+        if topic != self._current_topic:
+            return
+        if b_idx < len(self._block_index(topic).starts):
+            self._goto_block(b_idx)
+        self.ui.text.focus_set()
+
+    def _goto_block(self, b_idx: int) -> None:
+        index = self._block_index(self._current_topic)
+        pos = f"{index.starts[b_idx] + 1}.0"
+        text = self.ui.text
+        text.mark_set("insert", pos)
+        text.see(pos)
+        if self.ui.outline is not None:
+            self.ui.outline.select(b_idx)
+
+    def _outline(self, topic: str) -> EntryOutline:
+        outline = self._outlines.get(topic)
+        if outline is None:
+            text = self.ui.texts[topic]
+            outline = self._outlines[topic] = EntryOutline(
+                self._ready_block_index(topic),
+                lambda a, b: self._read_lines(text, a, b),
+            )
+        return outline
+
+    def _refresh_outline(self) -> None:
+        """Gliederung auf den Stand des Blockindex bringen (nur sichtbare Zeilen werden gelesen)."""
+        panel = self.ui.outline
+        if panel is None or not self.config.get("outline_visible"):
+            return
+        panel.set_count(len(self._outline(self._current_topic)))
+
+    def _on_outline_select(self, b_idx: int) -> None:
+        index = self._block_index(self._current_topic)
+        if b_idx >= len(index.starts):
+            return
+        pos = f"{index.starts[b_idx] + 1}.0"
+        text = self.ui.text
+        text.mark_set("insert", pos)
+        text.yview(pos)
+        text.focus_set()
+
+    def _show_outline(self, visible: bool) -> None:
+        if visible:
+            if self.ui.outline is None:
+                self.ui.outline = ui_mod.VirtualList(
+                    self.ui.main_frame,
+                    self.config,
+                    row_text=lambda i: self._outline(self._current_topic).title(i),
+                    on_select=self._on_outline_select,
+                )
+            self.ui.outline.frame.pack(side="left", fill="y", padx=(0, 6), before=self.ui.notebook)
+            self._refresh_outline()
+        elif self.ui.outline is not None:
+            self.ui.outline.frame.pack_forget()
+
+    def _timeline_model(self) -> Timeline:
+        topics = list(self._topics)
+        timeline = self._timeline
+        if timeline is None or timeline.topics != topics:
+            for topic in topics:
+                self._ready_block_index(topic)
+            timeline = self._timeline = Timeline({t: self._date_index(t) for t in topics})
+        return timeline
+
+    def _timeline_row(self, i: int) -> str:
+        entry = self._timeline_model().entry(i)
+        title = self._outline(entry.topic).title(entry.block)
+        stamp = timestamp_of(title) or ""
+        rest = title[len(stamp):].strip()
+        return f"{entry.when:%d.%m.%Y %H:%M}  [{entry.topic}]  {rest}"
+
+    def _refresh_timeline(self) -> None:
+        panel = self.ui.timeline
+        if panel is None:
+            return
+        timeline = self._timeline_model()
+        panel.set_count(len(timeline))
+        self._mark_saved(f"Zeitleiste: {len(timeline)} Einträge aus {len(self._topics)} Themen")
+
+    def _on_timeline_select(self, i: int) -> None:
+        entry = self._timeline_model().entry(i)
+        self._goto_topic_block(entry.topic, entry.block)
+
+    def _show_timeline(self, visible: bool) -> None:
+        if visible:
+            if self.ui.timeline is None:
+                self.ui.timeline = ui_mod.add_timeline_tab(
+                    self.ui.notebook,
+                    self.config,
+                    row_text=self._timeline_row,
+                    on_select=self._on_timeline_select,
+                )
+        elif self.ui.timeline is not None:
+            if self._topic_for_tab(self.ui.notebook.select()) is None:
+                self.ui.notebook.select(self._tab_id_for_topic(self._current_topic))
+            self.ui.notebook.forget(self.ui.timeline.frame)
+            self.ui.timeline.frame.destroy()
+            self.ui.timeline = None
+            self._timeline = None
+
+    def _ready_block_index(self, topic: str) -> BlockIndex:
+        index = self._block_index(topic)
+        if not index.ready:
+            index.reset(self.ui.texts[topic].get("1.0", "end-1c"))
+        return index
+
+    def _date_index(self, topic: str) -> DateIndex:
+        date_index = self._date_indexes.get(topic)
+        if date_index is None:
+            date_index = self._date_indexes[topic] = DateIndex(self._block_index(topic))
+        return date_index
+
     def open_data_dir(self) -> None:
         p = get_data_dir()
         try:
@@ -390,9 +1088,10 @@ class MindPicApp:
         logger.info("Shutting down MindPicApp")
         # save before exit
         try:
-            self.save_all_topics()
+            self.save_all_topics(explicit=True)
         except Exception as e:
             logger.error(f"Failed to save on exit: {e}")
+        self._flush_writes()
 
         # stop tray + hotkeys
         try:
@@ -427,6 +1126,16 @@ class MindPicApp:
         self.config["auto_hide_on_focus"] = bool(enabled)
         self._schedule_config_save()
 
+    def _menu_set_outline(self, enabled: bool) -> None:
+        self.config["outline_visible"] = bool(enabled)
+        self._schedule_config_save()
+        self._show_outline(bool(enabled))
+
+    def _menu_set_timeline(self, enabled: bool) -> None:
+        self.config["timeline_visible"] = bool(enabled)
+        self._schedule_config_save()
+        self._show_timeline(bool(enabled))
+
     def _menu_set_borderless(self, enabled: bool) -> None:
         self.config["borderless"] = bool(enabled)
         ui_mod.apply_borderless(
@@ -455,7 +1164,7 @@ class MindPicApp:
             colors[idx] = str(color)
             self.config["note_colors"] = colors
             ui_mod.apply_colors(self.ui, self.config)
-            self._recolorize()
+            self._recolorize(full=True)
             self._schedule_config_save()
 
     def _menu_set_font(self, family: str, size: int) -> None:
@@ -498,7 +1207,7 @@ class MindPicApp:
             # fallback size (minsize is already set)
             self.root.geometry("520x320")
 
-    def _save_geometry(self) -> None:
+    def _save_geometry(self, *, durable: bool = False) -> None:
         try:
             g = WindowGeometry(
                 width=self.root.winfo_width(),
@@ -506,7 +1215,7 @@ class MindPicApp:
                 x=self.root.winfo_x(),
                 y=self.root.winfo_y(),
             )
-            save_window_geometry(g)
+            self._writer.submit(("geometry", None), save_window_geometry, g, durable=durable)
         except Exception:
             pass
 
@@ -555,52 +1264,377 @@ class MindPicApp:
                 self.root.after_cancel(self._recolor_job)
             except Exception:
                 pass
-        self._recolor_job = self.root.after(350, self._recolorize)
+        self._recolor_job = self.root.after(350, self._recolorize_edited)
 
-    def _recolorize(self) -> None:
+    def _recolorize_edited(self) -> None:
+        self._recolorize()
+        # neue/geänderte Einträge sofort dem offenen Filter unterwerfen
+        self._update_filter()
+
+    def _recolorize(self, *, full: bool = False) -> None:
         """
         Wendet noteX Tags blockweise an (für Hintergründe).
+
+        Standardmäßig werden nur die seit dem letzten Lauf geänderten Zeilen
+        (BlockIndex.dirty) betrachtet; der TagApplier schickt davon nur die
+        echten Unterschiede gebündelt an Tk. full=True scannt das ganze Thema
+        neu, z.B. nach Farbänderungen.
+
+        Die Arbeit läuft als Job in Zeitscheiben (siehe _recolor_slice); ein
+        neuer Aufruf oder ein Edit bricht einen laufenden Job ab.
         """
+        topic = self._current_topic
+        index = self._block_index(topic)
+        if full or not index.ready:
+            index.reset(self.ui.text.get("1.0", "end-1c"))
+
+        self._refresh_outline()
+        self._update_count_label()
+        self._sync_reminders(topic)
+        self._recolor_generation += 1
+        if self._recolor_slice_job:
+            try:
+                self.root.after_cancel(self._recolor_slice_job)
+            except Exception:
+                pass
+            self._recolor_slice_job = None
+        self._recolor_slice(topic, self._recolor_generation)
+
+    def _recolor_slice(self, topic: str, generation: int) -> None:
+        """
+        Eine Zeitscheibe des Einfärbe-Jobs: bearbeitet dirty Zeilen in Häppchen
+        von höchstens RECOLOR_SLICE_BLOCKS Blöcken, bis das Budget
+        (recolor_slice_ms) verbraucht ist, und plant den Rest per after_idle ein.
+        """
+        self._recolor_slice_job = None
+        if generation != self._recolor_generation or topic != self._current_topic:
+            return
+
         note_colors = list(self.config.get("note_colors", []))
-        if not note_colors:
+        text = self.ui.text
+        index = self._block_indexes[topic]
+        applier = self._tag_appliers.setdefault(topic, TagApplier())
+        if index.ready:
+            self._highlight_inline(text, index)
+        if not note_colors or not index.ready:
+            self._set_recolor_busy(None)
             return
 
-        # remove tags first
-        for i in range(len(note_colors)):
-            self.ui.text.tag_remove(f"note{i}", "1.0", "end")
+        # Ohne Timestamps wird der ganze Text ein Block – außer er ist leer
+        empty = not index.starts and text.compare("end-1c", "==", "1.0")
+        tags = [f"note{i}" for i in range(len(note_colors))]
+        if index.rules:
+            tags += index.rules.tags
+        budget = float(self.config.get("recolor_slice_ms", settings.DEFAULT_RECOLOR_SLICE_MS)) / 1000.0
+        deadline = time.perf_counter() + budget
+
+        for win_lo, win_hi in self._recolor_regions(text, index):
+            while True:
+                pending = index.dirty.intersect(win_lo, win_hi)
+                if not pending:
+                    break
+                lo, hi = pending[0]
+                hi = min(hi, index.line_after_blocks(lo, settings.RECOLOR_SLICE_BLOCKS))
+                windows = index.dirty.take(lo, hi)
+                spans: list[tuple[str, int, int]] = []
+                if not empty:
+                    for b_idx, start, end in index.blocks_between(lo, hi):
+                        tag = tags[index.color_index(b_idx, len(note_colors))]
+                        spans.append((tag, max(start, lo), min(end, hi)))
+                    spans += index.rule_spans(lo, hi)
+                applier.apply(text, windows, spans, tags)
+
+                if time.perf_counter() >= deadline:
+                    remaining = sum(b - a for a, b in index.dirty.intersect(0, index.line_count + 1))
+                    self._set_recolor_busy(remaining)
+                    self._recolor_slice_job = self.root.after_idle(
+                        lambda: self._recolor_slice(topic, generation)
+                    )
+                    return
+        self._set_recolor_busy(None)
+
+    def _highlight_inline(self, text: tk.Text, index: BlockIndex) -> None:
+        """
+        Inline-Tags (Links, Überschriften, Checkboxen) für inline-dirty Zeilen im
+        sichtbaren Bereich neu setzen. Der Rest bleibt dirty, bis er ins Bild scrollt.
+        """
+        if not self.config.get("inline_highlight", settings.DEFAULT_INLINE_HIGHLIGHT):
+            return
+        visible = self._visible_lines(text)
+        if visible is None:
+            return
+        for lo, hi in index.inline_dirty.take(*visible):
+            lines = text.get(f"{lo + 1}.0", f"{hi + 1}.0").split("\n")[: hi - lo]
+            adds: dict[str, list[str]] = {tag: [] for tag in INLINE_TAGS}
+            for tag, line, col_start, col_end in inline_spans(lines, lo):
+                adds[tag] += (f"{line + 1}.{col_start}", f"{line + 1}.{col_end}")
+            for tag, pairs in adds.items():
+                try:
+                    text.tag_remove(tag, f"{lo + 1}.0", f"{hi + 1}.0")
+                    if pairs:
+                        text.tag_add(tag, *pairs)
+                except tk.TclError as e:
+                    logger.debug("inline tag %s failed: %s", tag, e)
+
+    def _open_link_at(self, text: tk.Text, event) -> str | None:
+        """Strg+Klick: Link unter der Maus öffnen; sonst normales Klickverhalten."""
+        try:
+            pos = text.index(f"@{event.x},{event.y}")
+            if "inline_url" not in text.tag_names(pos):
+                return None
+            found = text.tag_prevrange("inline_url", f"{pos}+1c")
+        except tk.TclError:
+            return None
+        if found:
+            url = text.get(*found)
+            if url.startswith("www."):
+                url = "https://" + url
+            try:
+                webbrowser.open(url)
+            except Exception as e:
+                logger.error("Failed to open link %s: %s", url, e)
+        return "break"
+
+    def _block_index(self, topic: str) -> BlockIndex:
+        index = self._block_indexes.get(topic)
+        if index is None:
+            mode = str(self.config.get("color_mode", settings.DEFAULT_COLOR_MODE))
+            index = self._block_indexes[topic] = BlockIndex(
+                cyclic_colors=(mode == "cyclic"),
+                rules=self._color_rules(),
+            )
+        return index
 
-        text = self.ui.text.get("1.0", "end-1c")
-        lines = text.splitlines(True)  # keep line endings
-        blocks = iter_blocks(lines)
+    def _color_rules(self) -> RuleSet:
+        if self._rule_set is None:
+            self._rule_set = RuleSet(self.config.get("color_rules") or [])
+        return self._rule_set
+
+    def _restore_block_index(self, topic: str, content: str) -> None:
+        """
+        Blockindex aus dem Sidecar (notes/<thema>.idx) übernehmen, statt beim
+        ersten Einfärben zu scannen. Fehlt er oder ist er veraltet, wird er
+        vorgemerkt und nach dem ersten Einfärben im Hintergrund neu aufgebaut.
+        """
+        index = self._block_index(topic)
+        if index.rules:
+            return  # Farbregeln brauchen ohnehin den vollen Scan
+        cached = load_sidecar_index(content, topic)
+        if cached is not None:
+            index.load(cached.starts, cached.keys, cached.times, cached.line_count)
+            return
+        self._index_rebuilds.append((topic, content))
 
-        # convert line index to tk index
-        # Tk lines are 1-based, columns 0-based.
-        for b_idx, (start, end) in enumerate(blocks):
-            color_idx = pick_color_index(b_idx, len(note_colors))
-            tag = f"note{color_idx}"
+    def _start_index_rebuilds(self) -> None:
+        """Vorgemerkte Indizes bauen lassen; schon aktuelle (z.B. das aktive Thema) entfallen."""
+        jobs = [(topic, content) for topic, content in self._index_rebuilds if not self._block_index(topic).ready]
+        self._index_rebuilds = []
+        if not jobs:
+            return
+        threading.Thread(target=self._rebuild_block_indexes, args=(jobs,), name="mindpic-index", daemon=True).start()
+        self._schedule_index_poll(len(jobs))
 
-            start_line = start + 1
-            end_line = end + 1
+    def _rebuild_block_indexes(self, jobs: list[tuple[str, str]]) -> None:
+        # Hintergrund-Thread: kein Tk-Zugriff, nur scannen und einreihen
+        for topic, content in jobs:
+            fresh: BlockIndex | None = BlockIndex()
+            try:
+                fresh.reset(content)
+            except Exception as e:
+                logger.error("Failed to build block index for %s: %s", topic, e)
+                fresh = None
+            self._index_results.put((topic, content, fresh))
+
+    def _schedule_index_poll(self, outstanding: int) -> None:
+        self._index_poll_job = self.root.after(
+            settings.WRITE_RESULT_POLL_MS, lambda: self._poll_index_results(outstanding)
+        )
 
-            # start at line start, end at line start of next block
-            start_idx = f"{start_line}.0"
-            end_idx = f"{end_line}.0"
+    def _poll_index_results(self, outstanding: int) -> None:
+        """UI-Thread: fertige Indizes übernehmen, ihren Sidecar an den Writer geben."""
+        self._index_poll_job = None
+        while True:
             try:
-                self.ui.text.tag_add(tag, start_idx, end_idx)
+                topic, content, fresh = self._index_results.get_nowait()
+            except queue.Empty:
+                break
+            outstanding -= 1
+            if fresh is None:
+                continue
+            if self._adopt_block_index(topic, content, fresh):
+                sidecar = SidecarIndex(fresh.starts, fresh.keys, fresh.times, fresh.line_count)
+                self._writer.submit(("sidecar", topic), save_sidecar_index, content, sidecar, topic)
+        if outstanding > 0:
+            self._schedule_index_poll(outstanding)
+
+    def _adopt_block_index(self, topic: str, content: str, fresh: BlockIndex) -> bool:
+        """True, wenn der frische Index unverändert übernommen wurde (sein Sidecar also stimmt)."""
+        index = self._block_indexes.get(topic)
+        text = self.ui.texts.get(topic)
+        if index is None or index.ready or text is None:
+            return False
+        adopted = text.get("1.0", "end-1c") == content
+        if adopted:
+            index.load(fresh.starts, fresh.keys, fresh.times, fresh.line_count)
+        else:
+            self._ready_block_index(topic)  # inzwischen bearbeitet: aktuellen Text scannen
+        self._sync_reminders(topic)
+        if topic == self._current_topic:
+            self._refresh_outline()
+        return adopted
+
+    def _sidecar_snapshot(self, topic: str) -> SidecarIndex | None:
+        """Kopie des inkrementell gepflegten Index für den Sidecar (None, wenn nicht aktuell)."""
+        index = self._block_indexes.get(topic)
+        if index is None or not index.ready or index.rules:
+            return None
+        return SidecarIndex(list(index.starts), list(index.keys), list(index.times), index.line_count)
+
+    # -------------------------------------------------------------------------
+    # Erinnerungen (@due)
+    # -------------------------------------------------------------------------
+
+    def _start_reminders(self) -> None:
+        """
+        Erinnerungen aller Themen einplanen, auch nie geöffneter. Ohne Farbregeln
+        steht der Blockindex aus dem Sidecar schon oder wird im Hintergrund
+        gebaut (_adopt_block_index plant dann ein); mit Farbregeln gibt es keinen
+        Sidecar, also hier voll scannen.
+        """
+        for topic in self._topics:
+            if self._block_index(topic).rules:
+                self._ready_block_index(topic)
+            self._sync_reminders(topic)
+
+    def _sync_reminders(self, topic: str) -> None:
+        """Geänderte Blöcke von topic neu lesen und den after-Job neu stellen."""
+        index = self._block_indexes.get(topic)
+        text = self.ui.texts.get(topic)
+        if index is None or not index.ready or text is None:
+            return
+        reminders = self._reminder_indexes.get(topic)
+        if reminders is None:
+            reminders = self._reminder_indexes[topic] = ReminderIndex(
+                index, lambda a, b: self._read_lines(text, a, b), topic, self._reminders
+            )
+        elif not reminders.pending:
+            return
+        reminders.flush(datetime.now())
+        self._arm_reminder()
+
+    def _arm_reminder(self) -> None:
+        """Genau ein after-Job, gestellt auf die früheste Fälligkeit."""
+        if self._reminder_job:
+            try:
+                self.root.after_cancel(self._reminder_job)
             except Exception:
                 pass
+            self._reminder_job = None
+        due = self._reminders.next_due()
+        if due is None:
+            return
+        delay = int((due - datetime.now()).total_seconds() * 1000)
+        delay = max(0, min(delay, settings.REMINDER_MAX_SLEEP_MS))
+        self._reminder_job = self.root.after(delay, self._fire_reminders)
+
+    def _fire_reminders(self) -> None:
+        self._reminder_job = None
+        for reminder in self._reminders.pop_due(datetime.now()):
+            self._show_reminder(reminder)
+        self._arm_reminder()
+
+    def _show_reminder(self, reminder: Reminder) -> None:
+        logger.info("Reminder due: %s", reminder.text)
+        was_hidden = not self._visible
+        if was_hidden:
+            self.toggle_visibility()
+        self.root.bell()
+        if self._tray is not None:
+            self._tray.notify(reminder.text, f"Erinnerung – {reminder.topic}")
+        # nur springen, wenn das Fenster verborgen war: sonst nicht beim Tippen Tab und Cursor wegreißen
+        index = self._reminder_indexes.get(reminder.topic)
+        b_idx = index.block_of(reminder) if index is not None and was_hidden else None
+        if b_idx is not None:
+            self._goto_topic_block(reminder.topic, b_idx)
+        self._mark_saved(f"Erinnerung: {reminder.text}")
+
+    def _set_recolor_busy(self, remaining_lines: int | None) -> None:
+        label = self.ui.busy_label
+        if label is None:
+            return
+        try:
+            label.configure(text=f"Färbe ein… ({remaining_lines} Zeilen offen)" if remaining_lines else "")
+        except Exception:
+            pass
+
+    def _use_viewport_colorize(self, index: BlockIndex) -> bool:
+        mode = str(self.config.get("colorize_mode", settings.DEFAULT_COLORIZE_MODE))
+        if mode == "viewport":
+            return True
+        if mode == "auto":
+            return index.line_count >= settings.COLORIZE_VIEWPORT_MIN_LINES
+        return False
+
+    def _visible_lines(self, text: tk.Text) -> tuple[int, int] | None:
+        """Sichtbare Zeilen [lo, hi) plus Rand, 0-basiert."""
+        try:
+            top = int(text.index("@0,0").split(".")[0]) - 1
+            bottom = int(text.index(f"@0,{max(1, text.winfo_height())}").split(".")[0])
+        except Exception:
+            return None
+        margin = settings.COLORIZE_VIEWPORT_MARGIN_LINES
+        return max(0, top - margin), bottom + margin
+
+    def _recolor_regions(self, text: tk.Text, index: BlockIndex) -> list[tuple[int, int]]:
+        """
+        Zeilenbereiche in Bearbeitungsreihenfolge: zuerst der sichtbare Bereich.
+
+        Im Viewport-Modus nur dieser; der Rest bleibt dirty und wird beim
+        Scrollen (yscrollcommand) nachgezogen.
+        """
+        everything = (0, index.line_count + 1)
+        visible = self._visible_lines(text)
+        if self._use_viewport_colorize(index):
+            return [visible or everything]
+        return [visible, everything] if visible else [everything]
+
+    def _on_text_scrolled(self, topic: str) -> None:
+        if topic != self._current_topic or getattr(self, "_scroll_recolor_job", None):
+            return
+        index = self._block_indexes.get(topic)
+        if not index or not index.ready:
+            return
+        if index.dirty:
+            action = self._recolorize
+        elif index.inline_dirty:
+            # nur Inline-Hervorhebungen für neu sichtbare Zeilen nachziehen
+            action = lambda: self._highlight_inline(self.ui.texts[topic], index)
+        else:
+            return
+
+        def _run() -> None:
+            self._scroll_recolor_job = None
+            action()
+
+        self._scroll_recolor_job = self.root.after_idle(_run)
 
     # -------------------------------------------------------------------------
     # Internal: events
     # -------------------------------------------------------------------------
 
-    def _on_text_modified(self, _event=None) -> None:
-        # Reset Tk modified flag immediately (sonst feuert es dauernd)
+    def _on_text_modified(self, topic: str) -> None:
+        text = self.ui.texts.get(topic)
+        if text is None:
+            return
+        # Reset Tk modified flag immediately (sonst feuert es dauernd);
+        # das Zurücksetzen selbst löst <<Modified>> erneut aus
         try:
-            self.ui.text.edit_modified(False)
+            if not text.edit_modified():
+                return
+            text.edit_modified(False)
         except Exception:
             pass
-        self._last_user_edit_ts = time.time()
+        self._dirty_topics.add(topic)
         try:
             self.ui.status_label.configure(text="Ungespeicherte Änderung…")
         except Exception:
@@ -630,6 +1664,11 @@ class MindPicApp:
             self.toggle_visibility()
 
     def _on_configure(self, _event=None) -> None:
+        # Geometrie erst speichern, wenn Verschieben/Größenänderung abgeschlossen ist
+        if _event is None or getattr(_event, "widget", self.root) is self.root:
+            self._geometry_dirty = True
+            self._schedule_config_save()
+
         # snap only while visible and not minimized
         if not ENABLE_SNAP:
             return
@@ -700,7 +1739,7 @@ class MindPicApp:
         self._autosave_job = self.root.after(settings.AUTOSAVE_INTERVAL_MS, self._autosave_tick)
 
     def _schedule_config_save(self) -> None:
-        """Debounced config save: saves 2 seconds after last change."""
+        """Debounced config save: saves 2 seconds after last change (or window move/resize)."""
         if self._config_save_job:
             try:
                 self.root.after_cancel(self._config_save_job)
@@ -708,21 +1747,32 @@ class MindPicApp:
                 pass
         self._config_save_job = self.root.after(2000, self._save_config_now)
 
-    def _save_config_now(self) -> None:
-        """Execute the actual config save."""
+    def _save_config_now(self, *, durable: bool = False) -> None:
+        """Config und ggf. Geometrie in einem Zug schreiben; unveränderte Dateien bleiben unberührt."""
+        if self._config_save_job:
+            try:
+                self.root.after_cancel(self._config_save_job)
+            except Exception:
+                pass
         self._config_save_job = None
         try:
-            save_config(self.config)
+            self._writer.submit(("config", None), save_config, deepcopy(self.config), durable=durable)
         except Exception as e:
             logger.error(f"Failed to save config: {e}")
+        if self._geometry_dirty:
+            self._geometry_dirty = False
+            self._save_geometry(durable=durable)
 
     def _autosave_tick(self) -> None:
         self._autosave_job = None
 
-        # Nur speichern wenn kürzlich editiert wurde (reduziert unnötige Writes)
-        if self._last_user_edit_ts and (time.time() - self._last_user_edit_ts) < 5.0:
+        # Nur speichern wenn das aktive Thema geändert wurde (reduziert unnötige Writes);
+        # das Journal wird erst nach einer Ruhepause in die .txt verdichtet
+        topic = self._current_topic
+        idle = time.time() - (self._last_saved_at or 0.0) >= settings.JOURNAL_IDLE_COMPACT_S
+        if topic in self._dirty_topics or (topic in self._journaled and idle):
             try:
-                self.save_current_state()
+                self.save_current_state(compact=topic not in self._dirty_topics)
             except Exception:
                 pass
 
@@ -10,25 +10,196 @@ Hinweis:
 
 from __future__ import annotations
 
+import logging
+import mmap
 import re
-from datetime import datetime
-from typing import Iterable
+import warnings
+import zlib
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from functools import lru_cache
+from typing import IO, Callable, Iterable, Iterator
 
+from . import settings
 
-# Typische Timestamp-Formate (du kannst das erweitern)
-# Beispiel: "19-12-2025 18:44" oder "2025-12-12 18:44" oder "12.12.2025 18:44" oder "18:44"
-_TS_PATTERNS = [
-    r"^\s*\d{2}-\d{2}-\d{4}\s+\d{2}:\d{2}(\:\d{2})?\s*",
-    r"^\s*\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}(\:\d{2})?\s*",
-    r"^\s*\d{2}\.\d{2}\.\d{4}\s+\d{2}:\d{2}(\:\d{2})?\s*",
-    r"^\s*\d{2}:\d{2}(\:\d{2})?\s*",
-]
-_TS_RE = re.compile("|".join(f"(?:{p})" for p in _TS_PATTERNS))
+logger = logging.getLogger(__name__)
+
+
+_DIGIT_DIRECTIVES = {"d": 2, "m": 2, "y": 2, "H": 2, "M": 2, "S": 2, "Y": 4}
+_DIGITS = frozenset("0123456789")
+
+
+@dataclass(frozen=True)
+class TimestampFormat:
+    """Ein Zeitstempel-Format (strftime-Syntax) samt daraus erzeugtem Regex."""
+
+    fmt: str
+    regex: str
+    has_date: bool
+    first_chars: frozenset[str]
+    min_len: int
+
+
+def compile_timestamp_format(fmt: str) -> TimestampFormat:
+    """
+    Übersetzt ein strftime-Format in einen Regex.
+
+    Unterstützt: %d %m %y %Y %H %M %S %%, Leerzeichen (= beliebig viel Whitespace)
+    und Literale. Ohne %S sind Sekunden direkt nach %M optional ("18:44:05").
+    ValueError bei anderen Direktiven.
+    """
+    parts: list[str] = []
+    first: frozenset[str] | None = None
+    min_len = 0
+    i = 0
+    while i < len(fmt):
+        ch = fmt[i]
+        if ch == "%":
+            d = fmt[i + 1 : i + 2]
+            i += 2
+            if d == "%":
+                piece, chars, width = "%", frozenset("%"), 1
+            elif d in _DIGIT_DIRECTIVES:
+                width = _DIGIT_DIRECTIVES[d]
+                piece, chars = r"\d{%d}" % width, _DIGITS
+                if d == "M" and "%S" not in fmt:
+                    piece += r"(?::\d{2})?"
+            else:
+                raise ValueError(f"unsupported directive %{d} in {fmt!r}")
+        elif ch.isspace():
+            while i < len(fmt) and fmt[i].isspace():
+                i += 1
+            piece, chars, width = r"[^\S\n]+", None, 1
+        else:
+            i += 1
+            piece, chars, width = re.escape(ch), frozenset(ch), 1
+        if first is None and chars is None:
+            continue  # führender Whitespace wird ohnehin übersprungen
+        if first is None:
+            first = chars
+        parts.append(piece)
+        min_len += width
+    if first is None:
+        raise ValueError(f"empty timestamp format {fmt!r}")
+    return TimestampFormat(
+        fmt=fmt,
+        regex="".join(parts) + r"[^\S\n]*",
+        has_date=any(f"%{d}" in fmt for d in "dmyY"),
+        first_chars=first,
+        min_len=min_len,
+    )
+
+
+class TimestampRegistry:
+    """
+    Die aktiven Zeitstempel-Formate (config.json: "timestamp_formats").
+
+    Das erste Format wird von generate_timestamp() benutzt. match() prüft vor
+    dem Regex billig erstes Zeichen und Mindestlänge – Textzeilen, also die
+    allermeisten, kosten so keinen Regex-Lauf.
+    """
+
+    def __init__(self, formats: Iterable[str]) -> None:
+        self.formats: list[TimestampFormat] = []
+        for fmt in formats:
+            try:
+                self.formats.append(compile_timestamp_format(str(fmt)))
+            except ValueError as e:
+                logger.warning("Ignoring timestamp format: %s", e)
+        if not self.formats:
+            self.formats = [compile_timestamp_format(f) for f in settings.DEFAULT_TIMESTAMP_FORMATS]
+
+        self.first_chars = frozenset().union(*(f.first_chars for f in self.formats))
+        self.min_len = min(f.min_len for f in self.formats)
+        # Kern ohne führenden Whitespace, auch für RuleSet
+        self.core_src = "|".join("(?:" + f.regex + ")" for f in self.formats)
+        first_src = r"[^\S\n]*(?:" + self.core_src + ")"
+        first_class = "[" + "".join(re.escape(c) for c in sorted(self.first_chars)) + "]"
+        self.line_re = re.compile(first_src)
+        # Für einen einzigen finditer-Lauf über den ganzen Text beginnt der Treffer
+        # beim "\n" vor der Zeile: mit diesem Literal-Präfix springt die re-Engine
+        # direkt von Zeilenende zu Zeilenende statt jede Position zu prüfen.
+        self.first_re = self.line_re
+        self.scan_re = re.compile(r"\n(?=[^\S\n]*" + first_class + ")" + first_src)
+        self.first_re_bytes = re.compile(first_src.encode("utf-8"))
+        if all(c.isascii() for c in self.first_chars):
+            scan_bytes = r"\n(?=[^\S\n]*" + first_class + ")" + first_src
+        else:
+            scan_bytes = r"\n" + first_src
+        self.scan_re_bytes = re.compile(scan_bytes.encode("utf-8"))
+
+    def match(self, line: str) -> str | None:
+        """Zeitstempel am Zeilenanfang (ohne Leerzeichen) oder None."""
+        if len(line) < self.min_len:
+            return None
+        c = line[0]
+        if c not in self.first_chars and c not in " \t":
+            return None
+        m = self.line_re.match(line)
+        return m.group(0).strip() if m else None
+
+
+_registry = TimestampRegistry(settings.DEFAULT_TIMESTAMP_FORMATS)
+
+
+def set_timestamp_formats(formats: Iterable[str] | None) -> TimestampRegistry:
+    """Aktiviert die Formate aus der Config (vor dem Anlegen von BlockIndex/RuleSet)."""
+    global _registry
+    _registry = TimestampRegistry(formats or settings.DEFAULT_TIMESTAMP_FORMATS)
+    _parse_cached.cache_clear()
+    return _registry
+
+
+def timestamp_registry() -> TimestampRegistry:
+    return _registry
 
 
 def is_timestamp_line(line: str) -> bool:
     """True, wenn Zeile wie ein neuer Eintrag/Blockanfang aussieht."""
-    return bool(_TS_RE.match(line or ""))
+    return _registry.match(line or "") is not None
+
+
+def timestamp_of(line: str) -> str | None:
+    """Erkannter Zeitstempel am Zeilenanfang (ohne Leerzeichen) oder None."""
+    return _registry.match(line or "")
+
+
+@lru_cache(maxsize=4096)
+def _parse_cached(stamp: str) -> tuple[datetime, bool] | None:
+    for f in _registry.formats:
+        fmt = " ".join(f.fmt.split())
+        candidates = [fmt]
+        if "%S" not in fmt and "%M" in fmt:
+            candidates.append(fmt.replace("%M", "%M:%S", 1))
+        for candidate in candidates:
+            try:
+                return datetime.strptime(stamp, candidate), f.has_date
+            except ValueError:
+                continue
+    return None
+
+
+def parse_timestamp(stamp: str, base_date: date | None = None) -> datetime | None:
+    """
+    Zeitstempel (z.B. aus timestamp_of) als datetime; None, wenn kein Format passt.
+
+    Reine Uhrzeiten ("18:44") bekommen base_date als Datum – ohne base_date
+    liefert strptime den 01.01.1900.
+    """
+    parsed = _parse_cached(" ".join(stamp.split()))
+    if parsed is None:
+        return None
+    dt, has_date = parsed
+    if not has_date and base_date is not None:
+        return datetime.combine(base_date, dt.time())
+    return dt
+
+
+def timestamp_has_date(stamp: str) -> bool:
+    """False für reine Uhrzeiten ("18:44")."""
+    parsed = _parse_cached(" ".join(stamp.split()))
+    return bool(parsed and parsed[1])
 
 
 def iter_blocks(lines: Iterable[str]) -> list[tuple[int, int]]:
@@ -49,6 +220,741 @@ def iter_blocks(lines: Iterable[str]) -> list[tuple[int, int]]:
     return blocks
 
 
+@dataclass(frozen=True)
+class ColorRule:
+    """Eine Regel aus config.json ("color_rules")."""
+
+    tag: str
+    pattern: str  # regulärer Ausdruck ("regex"); leer bei Stichwort-Regeln
+    scope: str = "entry"  # "entry" = ganzer Eintrag, "line" = nur die Zeile
+    keyword: str = ""  # Stichwort ("match"), casefold
+
+
+class RuleSet:
+    """
+    Benutzerregeln, kompiliert zu zwei kombinierten Mustern.
+
+    Beispiel in config.json:
+        "color_rules": [
+            {"match": "TODO", "background": "#5a1e1e"},
+            {"match": "#incident", "background": "#5a4a1e"},
+            {"regex": "^!.*", "scope": "line", "bold": true}
+        ]
+
+    "match" ist ein Stichwort (ohne Groß-/Kleinschreibung), "regex" ein regulärer
+    Ausdruck. Alle Stichwörter stecken in einem Präfixbaum-Muster (gemeinsame
+    Anfänge nur einmal), das den casefold-Text vorfiltert; die Regexe in einer
+    Alternation mit je einer benannten Gruppe. Nur Zeilen mit Treffer werden
+    Regel für Regel geprüft.
+
+    Regeln wirken zeilenweise und unabhängig voneinander (mehrere Regeln auf
+    einer Zeile verodern sich); ein Treffer reicht nie über das Zeilenende
+    hinaus. Globale Inline-Flags ("(?i)…", stattdessen "(?i:…)"), benannte
+    Gruppen und Rückverweise vertragen sich nicht mit der Alternation; solche
+    und ungültige Regeln werden übersprungen (ihr Tag-Name bleibt reserviert,
+    damit rule<i> zur Config passt).
+    """
+
+    # so viele Regex-Alternationen (ohne schon getroffene Regeln) werden höchstens gemerkt
+    _MAX_PATTERNS = 64
+
+    def __init__(self, rules: Iterable[dict] | None = None) -> None:
+        self.rules: list[ColorRule] = []
+        self._keywords: dict[str, int] = {}  # Stichwort -> Bits der Regeln
+        self._regex_mask = 0
+        self._patterns: dict[int, re.Pattern | None] = {}  # ausgeschlossene Bits -> Alternation
+        self.entry_mask = 0
+        self.line_mask = 0
+        for i, raw in enumerate(rules or []):
+            rule = _parse_rule(i, raw)
+            if rule is None:
+                continue
+            bit = len(self.rules)
+            self.rules.append(rule)
+            if rule.keyword:
+                self._keywords[rule.keyword] = self._keywords.get(rule.keyword, 0) | 1 << bit
+            else:
+                self._regex_mask |= 1 << bit
+            if rule.scope == "line":
+                self.line_mask |= 1 << bit
+            else:
+                self.entry_mask |= 1 << bit
+        self._keyword_re = re.compile(_trie_pattern(self._keywords)) if self._keywords else None
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    @property
+    def tags(self) -> list[str]:
+        return [rule.tag for rule in self.rules]
+
+    def tags_for(self, mask: int) -> list[str]:
+        return [rule.tag for bit, rule in enumerate(self.rules) if mask >> bit & 1]
+
+    def _pattern(self, exclude: int) -> re.Pattern | None:
+        """Alternation aller Regex-Regeln außer den Bits in exclude; None, wenn keine bleibt."""
+        if exclude in self._patterns:
+            return self._patterns[exclude]
+        parts = [
+            f"(?P<r{bit}>{rule.pattern})"
+            for bit, rule in enumerate(self.rules)
+            if self._regex_mask >> bit & 1 and not exclude >> bit & 1
+        ]
+        if len(self._patterns) >= self._MAX_PATTERNS:
+            self._patterns.clear()
+        pattern = self._patterns[exclude] = re.compile("|".join(parts), re.MULTILINE) if parts else None
+        return pattern
+
+    def scan(self, text: str, first_line: int = 0) -> tuple[list[int], list[str], list[int], list[int]]:
+        """
+        (starts, stamps, rule_lines, rule_masks) mit Zeilen ab first_line.
+
+        Zeitstempel: ein Lauf wie iter_timestamp_starts. Regeln: je ein
+        search-Lauf der beiden kombinierten Muster; nur Zeilen mit Treffer
+        werden weiter angesehen.
+        """
+        found = list(iter_timestamp_starts(text))
+        starts = [first_line + line for line, _offset, _stamp in found]
+        stamps = [stamp for _line, _offset, stamp in found]
+
+        hits: dict[int, int] = {}  # Zeile -> Bitmaske
+        if self._keyword_re is not None:
+            # casefold ändert evtl. Längen, aber nie Zeilenumbrüche: Zeilennummern passen
+            low = text.casefold()
+            _add_line_hits(hits, low, self._keyword_hits(low), first_line)
+        if self._regex_mask:
+            _add_line_hits(hits, text, self._regex_hits(text), first_line)
+        rule_lines = sorted(hits)
+        return starts, stamps, rule_lines, [hits[line] for line in rule_lines]
+
+    def _keyword_hits(self, low: str) -> Iterator[tuple[int, int]]:
+        """(Offset des Zeilenanfangs, Bitmaske) je Zeile mit Stichwort, in steigender Folge."""
+        n = len(low)
+        pos = 0
+        while pos <= n:
+            m = self._keyword_re.search(low, pos)
+            if m is None:
+                return
+            line_start = low.rfind("\n", 0, m.start()) + 1
+            line_end = low.find("\n", m.end())
+            if line_end < 0:
+                line_end = n
+            line = low[line_start:line_end]
+            mask = 0
+            for keyword, bits in self._keywords.items():
+                if keyword in line:
+                    mask |= bits
+            yield line_start, mask
+            pos = line_end + 1
+
+    def _regex_hits(self, text: str) -> Iterator[tuple[int, int]]:
+        """
+        Wie _keyword_hits für die Regexe. In einer Trefferzeile wird (auf die Zeile
+        begrenzt) ohne die schon getroffenen Regeln weitergesucht, damit
+        überlappende Regeln nicht von der ersten Alternative verdeckt werden.
+        """
+        n = len(text)
+        combined = self._pattern(0)
+        pos = 0
+        while combined is not None and pos <= n:
+            m = combined.search(text, pos)
+            if m is None:
+                return
+            line_start = text.rfind("\n", 0, m.start()) + 1
+            line_end = text.find("\n", m.start())
+            if line_end < 0:
+                line_end = n
+            mask = 1 << int(m.lastgroup[1:]) if m.end() <= line_end else 0
+            pattern = self._pattern(mask)
+            while pattern is not None:
+                m = pattern.search(text, line_start, line_end)
+                if m is None:
+                    break
+                mask |= 1 << int(m.lastgroup[1:])
+                pattern = self._pattern(mask)
+            if mask:
+                yield line_start, mask
+            pos = line_end + 1
+
+
+def _add_line_hits(hits: dict[int, int], text: str, found: Iterable[tuple[int, int]], first_line: int) -> None:
+    """(Offset, Bitmaske) in steigender Folge als Zeile -> Bitmaske in hits verodern."""
+    line_no = first_line
+    pos = 0
+    for offset, mask in found:
+        line_no += text.count("\n", pos, offset)
+        pos = offset
+        hits[line_no] = hits.get(line_no, 0) | mask
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Alternation der Wörter als Präfixbaum, z.B. "inc(?:ident|ome)" statt "incident|income"."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alts = [re.escape(ch) + build(sub) for ch, sub in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        # endet hier schon ein Wort, ist der Rest optional
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+# Rückverweise (\1, (?P=name)) zeigen in der Alternation auf fremde Gruppen
+_BACKREF_RE = re.compile(r"(?<!\\)(?:\\\\)*\\[1-9]|\(\?P=")
+
+
+def _parse_rule(i: int, raw: dict) -> ColorRule | None:
+    if not isinstance(raw, dict):
+        logger.warning("Ignoring color rule %s: not an object", i)
+        return None
+    scope = "line" if str(raw.get("scope", "entry")) == "line" else "entry"
+    if not raw.get("regex") and raw.get("match"):
+        keyword = str(raw["match"]).casefold()
+        if "\n" in keyword:
+            logger.warning("Ignoring color rule %s: 'match' must not span lines", i)
+            return None
+        return ColorRule(tag=f"rule{i}", pattern="", scope=scope, keyword=keyword)
+    if not raw.get("regex"):
+        logger.warning("Ignoring color rule %s: needs 'match' or 'regex'", i)
+        return None
+    pattern = str(raw["regex"])
+    try:
+        # eingebettet wie in der Alternation: globale Flags sind dort ein Fehler
+        # (vor Python 3.11 nur eine DeprecationWarning)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)
+            compiled = re.compile(f"(?:{pattern})", re.MULTILINE)
+    except (re.error, DeprecationWarning) as e:
+        logger.warning("Ignoring color rule %s: invalid regex %r: %s", i, pattern, e)
+        return None
+    if compiled.groupindex or _BACKREF_RE.search(pattern):
+        logger.warning("Ignoring color rule %s: named groups and backreferences are not supported: %r", i, pattern)
+        return None
+    return ColorRule(tag=f"rule{i}", pattern=pattern, scope=scope)
+
+
+class LineRanges:
+    """
+    Menge disjunkter, sortierter Zeilenbereiche [start, end) (0-basiert).
+
+    Wird für "dirty" Zeilen genutzt: Bereiche verschieben sich mit jedem Edit
+    mit, damit später nur diese Zeilen neu getaggt werden müssen.
+    """
+
+    def __init__(self) -> None:
+        self._ranges: list[tuple[int, int]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._ranges)
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return iter(list(self._ranges))
+
+    def clear(self) -> None:
+        self._ranges.clear()
+
+    def add(self, start: int, end: int) -> None:
+        if end <= start:
+            return
+        ranges = self._ranges
+        i = bisect_left(ranges, (start,))
+        if i > 0 and ranges[i - 1][1] >= start:
+            i -= 1
+        j = i
+        while j < len(ranges) and ranges[j][0] <= end:
+            j += 1
+        if i < j:
+            start = min(start, ranges[i][0])
+            end = max(end, ranges[j - 1][1])
+        ranges[i:j] = [(start, end)]
+
+    def shift(self, first: int, removed: int, added: int) -> None:
+        """Alte Zeilen [first, first+removed] wurden durch [first, first+added] ersetzt."""
+        old_end = first + removed + 1
+        new_end = first + added + 1
+        delta = added - removed
+        ranges = self._ranges
+        i = bisect_left(ranges, (first,))
+        if i > 0 and ranges[i - 1][1] > first:
+            i -= 1
+        if i == len(ranges) or (delta == 0 and ranges[i][0] >= old_end):
+            return
+        shifted: list[tuple[int, int]] = []
+        for a, b in ranges[i:]:
+            if a >= old_end:
+                shifted.append((a + delta, b + delta))
+            else:
+                shifted.append((min(a, first), b + delta if b > old_end else new_end))
+        del ranges[i:]
+        for a, b in shifted:
+            self.add(a, b)
+
+    def intersect(self, start: int, end: int) -> list[tuple[int, int]]:
+        """Schnitt mit [start, end), ohne die Menge zu verändern."""
+        ranges = self._ranges
+        i = bisect_left(ranges, (start,))
+        if i > 0 and ranges[i - 1][1] > start:
+            i -= 1
+        result: list[tuple[int, int]] = []
+        while i < len(ranges) and ranges[i][0] < end:
+            a, b = ranges[i]
+            if b > start:
+                result.append((max(a, start), min(b, end)))
+            i += 1
+        return result
+
+    def take(self, start: int, end: int) -> list[tuple[int, int]]:
+        """Entfernt den Schnitt mit [start, end) aus der Menge und gibt ihn zurück."""
+        return self.replace(start, end, [])
+
+    def replace(self, start: int, end: int, ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        """
+        Ersetzt den Inhalt von [start, end) durch ranges (sortiert, disjunkt, innerhalb
+        von [start, end)) und gibt den bisherigen Schnitt zurück.
+        """
+        if end <= start:
+            return []
+        taken = self.intersect(start, end)
+        own = self._ranges
+        i = bisect_left(own, (start,))
+        if i > 0 and own[i - 1][1] > start:
+            i -= 1
+        j = i
+        while j < len(own) and own[j][0] < end:
+            j += 1
+        keep: list[tuple[int, int]] = []
+        if i < j:
+            if own[i][0] < start:
+                keep.append((own[i][0], start))
+            if own[j - 1][1] > end:
+                keep.append((end, own[j - 1][1]))
+        own[i:j] = keep
+        for a, b in ranges:
+            self.add(a, b)
+        return taken
+
+
+class BlockIndex:
+    """
+    Inkrementeller Blockindex eines Themas.
+
+    - hält die Startzeilen (0-basiert) aller Timestamp-Blöcke
+    - wird über apply_edit() mit jeder Textänderung nachgeführt; gescannt werden
+      nur die geänderten Zeilen, der Rest wird nur verschoben
+    - sammelt Zeilenbereiche, deren Einfärbung neu gesetzt werden muss
+    - hält je Block einen stabilen Farbschlüssel (aus dem Zeitstempel), damit
+      Blöcke im Modus "stable" ihre Farbe behalten, wenn davor etwas eingefügt wird
+    - hält je Block den Zeitpunkt; geparst wird erst bei Bedarf (block_time)
+    """
+
+    def __init__(self, *, cyclic_colors: bool = True, rules: RuleSet | None = None) -> None:
+        self.starts: list[int] = []
+        self.keys: list[int] = []
+        # je Block: Zeitstempel-Text (noch nicht geparst), (datetime, hat_datum) oder None
+        self.times: list[str | tuple[datetime, bool] | None] = []
+        # zählt hoch, wenn sich Blöcke/Zeitstempel ändern (nicht bei reinem Verschieben)
+        self.version = 0
+        # listener(first_block, removed, added): Blöcke [first, first+removed) wurden
+        # durch [first, first+added) ersetzt bzw. ihr Anfang hat sich geändert
+        self.listeners: list[Callable[[int, int, int], None]] = []
+        self.line_count = 0
+        self.dirty = LineRanges()
+        self.ready = False
+        self.cyclic_colors = cyclic_colors
+        # Farbanzahl der letzten color_index()-Abfrage (Nachfolger-Ketten im Modus "stable")
+        self._color_count = 0
+        self.rules = rules if rules else None
+        # Zeilen mit Regel-Treffern (sortiert) + Bitmaske der getroffenen Regeln
+        self.rule_lines: list[int] = []
+        self.rule_masks: list[int] = []
+        # Zeilen, deren Inline-Hervorhebungen (INLINE_TAGS) neu berechnet werden müssen
+        self.inline_dirty = LineRanges()
+
+    def reset(self, text: str) -> None:
+        """Kompletter Scan (Laden, Themenwechsel); alles wird als dirty markiert."""
+        old_count = len(self.starts)
+        if self.rules:
+            self.starts, stamps, self.rule_lines, self.rule_masks = self.rules.scan(text)
+        else:
+            found = list(iter_timestamp_starts(text))
+            self.starts = [line for line, _offset, _stamp in found]
+            stamps = [stamp for _line, _offset, stamp in found]
+        self.keys = [stable_color_key(stamp) for stamp in stamps]
+        self.times = list(stamps)
+        self._mark_loaded(text.count("\n") + 1, old_count)
+
+    def load(
+        self,
+        starts: list[int],
+        keys: list[int],
+        times: list[tuple[datetime, bool] | None],
+        line_count: int,
+    ) -> None:
+        """Übernimmt einen gespeicherten Index (Sidecar) statt zu scannen; nur ohne Farbregeln."""
+        old_count = len(self.starts)
+        self.starts = list(starts)
+        self.keys = list(keys)
+        self.times = list(times)
+        self.rule_lines = []
+        self.rule_masks = []
+        self._mark_loaded(line_count, old_count)
+
+    def _mark_loaded(self, line_count: int, old_count: int) -> None:
+        self.version += 1
+        self._notify(0, old_count, len(self.starts))
+        self.line_count = line_count
+        self.dirty.clear()
+        self.dirty.add(0, self.line_count)
+        self.inline_dirty.clear()
+        self.inline_dirty.add(0, self.line_count)
+        self.ready = True
+
+    def apply_edit(
+        self,
+        first: int,
+        removed: int,
+        added: int,
+        read_lines: Callable[[int, int], list[str]],
+    ) -> None:
+        """
+        Alte Zeilen [first, first+removed] wurden durch [first, first+added] ersetzt.
+
+        read_lines(a, b) liefert die aktuellen Zeilen [a, b) ohne Zeilenende.
+        """
+        if not self.ready:
+            return
+        delta = added - removed
+        had_blocks = bool(self.starts)
+        lo = bisect_left(self.starts, first)
+        hi = bisect_right(self.starts, first + removed)
+        # Block vor der Änderung: dessen Kopf bzw. erste Zeile danach kann sich ändern
+        touched = min(lo, max(0, bisect_right(self.starts, first - 1) - 1))
+
+        new_lines = read_lines(first, first + added + 1)
+        if self.rules:
+            found, found_stamps, new_rule_lines, new_rule_masks = self.rules.scan("\n".join(new_lines), first)
+            r_lo = bisect_left(self.rule_lines, first)
+            r_hi = bisect_right(self.rule_lines, first + removed)
+            rule_tail = self.rule_lines[r_hi:]
+            if delta:
+                rule_tail = [ln + delta for ln in rule_tail]
+            self.rule_lines[r_lo:] = new_rule_lines + rule_tail
+            self.rule_masks[r_lo:r_hi] = new_rule_masks
+        else:
+            found = []
+            found_stamps = []
+            for i, ln in enumerate(new_lines):
+                stamp = timestamp_of(ln)
+                if stamp is not None:
+                    found.append(first + i)
+                    found_stamps.append(stamp)
+        tail = self.starts[hi:]
+        if delta:
+            tail = [s + delta for s in tail]
+        self.starts[lo:] = found + tail
+        found_keys = [stable_color_key(stamp) for stamp in found_stamps]
+        if found_keys != self.keys[lo:hi]:
+            self.version += 1
+        self.keys[lo:hi] = found_keys
+        self.times[lo:hi] = found_stamps
+        if self.listeners and (self.starts or had_blocks):
+            self._notify(touched, hi - touched, lo - touched + len(found))
+        self.line_count = max(1, self.line_count + delta)
+
+        self.dirty.shift(first, removed, added)
+        self.inline_dirty.shift(first, removed, added)
+        self.inline_dirty.add(first, min(self.line_count, first + added + 1))
+        if had_blocks != bool(self.starts):
+            # Wechsel zwischen "ganzer Text ein Block" und echten Blöcken
+            self.dirty.add(0, self.line_count)
+            return
+        nxt = lo + len(found)
+        if (self.cyclic_colors or self._color_count <= 2) and len(found) != hi - lo:
+            # Blockanzahl geändert: zyklische Farben aller folgenden Blöcke verschieben sich
+            # (auch "stable" mit höchstens zwei Farben färbt reihum)
+            end = self.line_count
+        else:
+            if not self.cyclic_colors and self._color_count > 2:
+                nxt = self._stable_run_end(nxt)
+            end = self.starts[nxt] if nxt < len(self.starts) else self.line_count
+        begin = first
+        if self.rules and self.rules.entry_mask:
+            # Eintragsregeln färben den ganzen Block: der Block vor der Edit-Stelle
+            # (bzw. der ganze Text ohne Zeitstempel) wird neu bewertet
+            if lo > 0:
+                begin = self.starts[lo - 1]
+            elif not self.starts:
+                begin = 0
+        self.dirty.add(begin, min(self.line_count, max(end, first + added + 1)))
+
+    def _notify(self, first: int, removed: int, added: int) -> None:
+        for listener in self.listeners:
+            try:
+                listener(first, removed, added)
+            except Exception as e:
+                logger.error("Block listener failed: %s", e)
+
+    def _parsed(self, b_idx: int) -> tuple[datetime, bool] | None:
+        value = self.times[b_idx]
+        if isinstance(value, str):
+            parsed = parse_timestamp(value)
+            value = self.times[b_idx] = (parsed, timestamp_has_date(value)) if parsed else None
+        return value
+
+    def block_time(self, b_idx: int) -> datetime | None:
+        """
+        Zeitpunkt von Block b_idx. Reine Uhrzeiten erhalten das Datum des
+        vorherigen datierten Blocks (ohne einen solchen: None).
+        """
+        parsed = self._parsed(b_idx)
+        if parsed is None:
+            return None
+        dt, has_date = parsed
+        if has_date:
+            return dt
+        for prev in range(b_idx - 1, -1, -1):
+            before = self._parsed(prev)
+            if before is not None and before[1]:
+                return datetime.combine(before[0].date(), dt.time())
+        return None
+
+    def block_times(self) -> list[datetime | None]:
+        """block_time() für alle Blöcke in einem Durchlauf."""
+        result: list[datetime | None] = []
+        day: date | None = None
+        for b_idx in range(len(self.starts)):
+            parsed = self._parsed(b_idx)
+            if parsed is None:
+                result.append(None)
+            elif parsed[1]:
+                day = parsed[0].date()
+                result.append(parsed[0])
+            else:
+                result.append(datetime.combine(day, parsed[0].time()) if day else None)
+        return result
+
+    def rule_spans(self, start: int, end: int) -> list[tuple[str, int, int]]:
+        """(tag, start, end) der Regel-Tags für Zeilen in [start, end)."""
+        rules = self.rules
+        if not rules:
+            return []
+        spans: list[tuple[str, int, int]] = []
+        lines, masks = self.rule_lines, self.rule_masks
+        if rules.line_mask:
+            i = bisect_left(lines, start)
+            while i < len(lines) and lines[i] < end:
+                for tag in rules.tags_for(masks[i] & rules.line_mask):
+                    spans.append((tag, lines[i], lines[i] + 1))
+                i += 1
+        if rules.entry_mask:
+            for _b, b_start, b_end in self.blocks_between(start, end):
+                mask = 0
+                i = bisect_left(lines, b_start)
+                while i < len(lines) and lines[i] < b_end:
+                    mask |= masks[i]
+                    i += 1
+                for tag in rules.tags_for(mask & rules.entry_mask):
+                    spans.append((tag, max(b_start, start), min(b_end, end)))
+        return spans
+
+    def color_index(self, block_index: int, color_count: int) -> int:
+        """
+        Farbindex eines Blocks: zyklisch nach Position oder stabil nach Zeitstempel.
+
+        Stabil: Farbe aus dem Schlüssel des Blocks; hat der Vorgängerblock dieselbe
+        Farbe, die nächste. Bei höchstens zwei Farben bleibt nur der Wechsel reihum.
+        """
+        if not self.cyclic_colors:
+            self._color_count = color_count
+        if self.cyclic_colors or color_count <= 2 or block_index >= len(self.keys):
+            return pick_color_index(block_index, color_count)
+        first = block_index
+        while first > 0 and self._may_shift(first, color_count):
+            first -= 1
+        color = pick_stable_color_index(self.keys[first], color_count)
+        for key in self.keys[first + 1:block_index + 1]:
+            base = pick_stable_color_index(key, color_count)
+            color = base if base != color else (base + 1) % color_count
+        return color
+
+    def _may_shift(self, block_index: int, color_count: int) -> bool:
+        """Kann der Vorgänger (Farbe = seine oder die nächste) die Farbe des Blocks verdrängen?"""
+        base = pick_stable_color_index(self.keys[block_index], color_count)
+        prev = pick_stable_color_index(self.keys[block_index - 1], color_count)
+        return prev == base or (prev + 1) % color_count == base
+
+    def _stable_run_end(self, block_index: int) -> int:
+        """
+        Erster Block nach block_index, dessen Farbe nicht vom Block davor abhängt.
+
+        block_index ist der erste Block hinter einer Änderung: sein Vorgänger ist
+        neu, weg oder hat einen anderen Zeitstempel, er selbst ist also immer betroffen.
+        """
+        count = self._color_count
+        if block_index >= len(self.keys):
+            return block_index
+        block_index += 1
+        while block_index < len(self.keys) and self._may_shift(block_index, count):
+            block_index += 1
+        return block_index
+
+    def line_after_blocks(self, line: int, count: int) -> int:
+        """Ende eines Bereichs ab line, der höchstens count Blöcke berührt."""
+        i = bisect_right(self.starts, line) + max(1, count) - 1
+        return self.starts[i] if i < len(self.starts) else self.line_count + 1
+
+    def blocks_between(self, start: int, end: int) -> list[tuple[int, int, int]]:
+        """
+        (block_index, start_line, end_line) aller Blöcke, die [start, end) schneiden.
+        Ohne Timestamps gilt (wie bei iter_blocks) der ganze Text als ein Block.
+        """
+        if not self.starts:
+            return [(0, 0, self.line_count)] if self.line_count else []
+        i = max(0, bisect_right(self.starts, start) - 1)
+        result: list[tuple[int, int, int]] = []
+        while i < len(self.starts) and self.starts[i] < end:
+            s = self.starts[i]
+            e = self.starts[i + 1] if i + 1 < len(self.starts) else self.line_count
+            if e > start:
+                result.append((i, s, e))
+            i += 1
+        return result
+
+
+def iter_timestamp_starts(
+    source: str | bytes | bytearray | mmap.mmap | IO[str],
+) -> Iterator[tuple[int, int, str]]:
+    """
+    Liefert lazy (zeile, offset, stempel) aller Timestamp-Zeilen, 0-basiert.
+
+    stempel ist der erkannte Zeitstempel ohne umgebende Leerzeichen.
+
+    - str: ein finditer-Lauf über den ganzen Text, offset = Zeichenposition
+    - bytes/bytearray/mmap: wie str, offset = Byteposition
+    - Textdatei-Objekt: zeilenweises Streaming, offset = Zeichenposition
+    """
+    reg = _registry
+    if isinstance(source, str):
+        yield from _scan_starts(source, reg.first_re, reg.scan_re, "\n", source.count)
+    elif isinstance(source, (bytes, bytearray)):
+        yield from _scan_starts(source, reg.first_re_bytes, reg.scan_re_bytes, b"\n", source.count)
+    elif isinstance(source, mmap.mmap):
+        yield from _scan_starts(
+            source, reg.first_re_bytes, reg.scan_re_bytes, b"\n", lambda nl, a, b: source[a:b].count(nl)
+        )
+    else:
+        offset = 0
+        for line_no, line in enumerate(source):
+            stamp = timestamp_of(line)
+            if stamp is not None:
+                yield line_no, offset, stamp
+            offset += len(line)
+
+
+def _scan_starts(data, first: re.Pattern, scan: re.Pattern, newline, count) -> Iterator[tuple[int, int, str]]:
+    m = first.match(data)
+    if m:
+        yield 0, 0, _stamp_text(m.group(0))
+    line_no = 0
+    pos = 0
+    for m in scan.finditer(data):
+        start = m.start() + 1
+        line_no += count(newline, pos, start)
+        pos = start
+        yield line_no, start, _stamp_text(m.group(0))
+
+
+def _stamp_text(raw: str | bytes) -> str:
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8", "replace")
+    return raw.strip()
+
+
+def count_lines(source: str | bytes | bytearray | mmap.mmap) -> int:
+    """Zeilenzahl wie bei splitlines() (ein abschließendes \\n erzeugt keine Leerzeile)."""
+    if not len(source):
+        return 0
+    if isinstance(source, mmap.mmap):
+        n = sum(chunk.count(b"\n") for chunk in _iter_chunks(source))
+        last = source[-1:]
+    else:
+        newline = "\n" if isinstance(source, str) else b"\n"
+        n = source.count(newline)
+        last = source[-1:]
+    return n + (0 if last in ("\n", b"\n") else 1)
+
+
+def _iter_chunks(data: mmap.mmap, size: int = 1 << 20) -> Iterator[bytes]:
+    for pos in range(0, len(data), size):
+        yield data[pos:pos + size]
+
+
+def iter_block_spans(
+    source: str | bytes | bytearray | mmap.mmap | IO[str],
+) -> Iterator[tuple[int, int, int]]:
+    """
+    Streaming-Variante von iter_blocks: liefert lazy (start_line, end_line, offset).
+
+    Es wird keine Zeilenliste aufgebaut; bei str/bytes/mmap läuft die Erkennung
+    in einem einzigen finditer-Lauf. Semantik wie iter_blocks: ohne Timestamps
+    ist der ganze Text ein Block, Zeilen vor dem ersten Timestamp gehören zu
+    keinem Block.
+    """
+    prev: tuple[int, int] | None = None
+    if isinstance(source, (str, bytes, bytearray, mmap.mmap)):
+        for line, offset, _stamp in iter_timestamp_starts(source):
+            if prev is not None:
+                yield prev[0], line, prev[1]
+            prev = (line, offset)
+        total = count_lines(source)
+    else:
+        total = 0
+        offset = 0
+        for line in source:
+            if is_timestamp_line(line):
+                if prev is not None:
+                    yield prev[0], total, prev[1]
+                prev = (total, offset)
+            total += 1
+            offset += len(line)
+
+    if prev is not None:
+        yield prev[0], total, prev[1]
+    elif total:
+        yield 0, total, 0
+
+
+# Inline-Hervorhebungen innerhalb von Zeilen (Links, Überschriften, Checkboxen)
+INLINE_TAGS = ("inline_url", "inline_heading", "inline_todo", "inline_done")
+_INLINE_RE = re.compile(
+    r"(?P<inline_url>(?:https?://|www\.)[^\s<>\"']*[^\s<>\"'.,;:!?)\]])"
+    r"|(?P<inline_heading>^[^\S\n]*#{1,6}[^\S\n]+\S.*$)"
+    r"|(?P<inline_todo>\[ \])"
+    r"|(?P<inline_done>\[[xX]\])",
+    re.MULTILINE,
+)
+
+
+def inline_spans(lines: list[str], first_line: int = 0) -> Iterator[tuple[str, int, int, int]]:
+    """
+    Inline-Treffer als (tag, zeile, start_spalte, end_spalte) für die gegebenen Zeilen.
+
+    Überschriften sind "# Titel" (1–6 #, danach Leerzeichen), damit #hashtags
+    keine Überschriften werden.
+    """
+    for i, line in enumerate(lines):
+        for m in _INLINE_RE.finditer(line):
+            yield m.lastgroup, first_line + i, m.start(), m.end()
+
+
 def pick_color_index(block_index: int, color_count: int) -> int:
     """Deterministisch zyklisch."""
     if color_count <= 0:
@@ -56,8 +962,20 @@ def pick_color_index(block_index: int, color_count: int) -> int:
     return block_index % color_count
 
 
+def stable_color_key(stamp: str) -> int:
+    """Prozessübergreifend stabiler Schlüssel (hash() ist pro Lauf gesalzen)."""
+    return zlib.crc32(" ".join(stamp.split()).encode("utf-8"))
+
+
+def pick_stable_color_index(key: int, color_count: int) -> int:
+    """Farbe aus dem Blockschlüssel – unabhängig von der Position des Blocks."""
+    if color_count <= 0:
+        return 0
+    return key % color_count
+
+
 def generate_timestamp() -> str:
     """
-    Generiert einen Zeitstempel im Format 'DD-MM-YYYY HH:MM'.
+    Generiert einen Zeitstempel im ersten konfigurierten Format (Standard 'DD-MM-YYYY HH:MM').
     """
-    return datetime.now().strftime("%d-%m-%Y %H:%M")
+    return datetime.now().strftime(_registry.formats[0].fmt)
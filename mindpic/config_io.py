@@ -17,7 +17,7 @@ from typing import Any
 
 from . import settings
 from .paths import ensure_dir, get_config_path
-from .persistence import atomic_write_json
+from .persistence import write_json_if_changed
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +64,7 @@ def load_config() -> dict[str, Any]:
 
 def save_config(config: dict[str, Any]) -> None:
     """
-    Speichert config.json pretty-printed.
+    Speichert config.json pretty-printed (nicht, wenn sich nichts geändert hat).
     """
     cfg_path: Path = get_config_path()
 
@@ -77,7 +77,7 @@ def save_config(config: dict[str, Any]) -> None:
             if k in config:
                 out[k] = config[k]
 
-        atomic_write_json(cfg_path, out)
-        logger.debug(f"Saved config to {cfg_path}")
+        if write_json_if_changed(cfg_path, out):
+            logger.debug(f"Saved config to {cfg_path}")
     except (OSError, IOError) as e:
         logger.error(f"Failed to save config to {cfg_path}: {e}")
@@ -0,0 +1,174 @@
+# File: mindpic/hashtags.py
+# -*- coding: utf-8 -*-
+"""
+MindPic – Hashtags (#kunde-x, #inc-4711) je Eintrag.
+
+- tags_in: Hashtags eines Textes (klein geschrieben, ohne "#")
+- TagIndex: invertierter Index Tag -> Blöcke eines Themas, hängt als Listener
+  am BlockIndex und liest geänderte Blöcke erst bei der nächsten Abfrage neu
+- tag_postings / merged_counts: Abfragen über mehrere Themen
+
+Gespeichert wird der Index neben der Notiz (persistence.save_tag_index).
+"""
+
+from __future__ import annotations
+
+import re
+from bisect import bisect_left, insort
+from typing import Callable
+
+from .colorize import BlockIndex
+
+# "#" am Zeilenanfang oder nach Leerraum; "# Überschrift" und URL-Anker zählen nicht
+TAG_RE = re.compile(r"(?<!\S)#([^\W_][\w-]*)")
+
+# ab so vielen offenen Blöcken wird der ganze Text einmal gelesen statt blockweise
+_BULK_READ_BLOCKS = 64
+
+
+def tags_in(text: str) -> set[str]:
+    """Hashtags in text; reine Zahlen (#3) sind keine Tags."""
+    tags = set()
+    for m in TAG_RE.finditer(text):
+        tag = m.group(1).rstrip("-").casefold()
+        if tag and not tag.isdigit():
+            tags.add(tag)
+    return tags
+
+
+class TagIndex:
+    """
+    Tag -> Blöcke eines Themas.
+
+    Änderungen am BlockIndex verschieben die Postings (sortierte Listen, nur
+    ab der Änderung per bisect) und markieren die betroffenen Blöcke als offen;
+    gelesen wird erst bei der nächsten Abfrage. changed wird erst gesetzt, wenn
+    sich dabei die Tags eines Blocks oder die Nummern getaggter Blöcke ändern.
+    read_lines(a, b) liefert die Zeilen [a, b) des Textes.
+    """
+
+    def __init__(self, blocks: BlockIndex, read_lines: Callable[[int, int], list[str]]) -> None:
+        self._blocks = blocks
+        self._read_lines = read_lines
+        count = len(blocks.starts)
+        self._block_tags: list[frozenset[str] | None] = [None] * count
+        self._postings: dict[str, list[int]] = {}
+        self._pending: set[int] = set(range(count))
+        # gespeicherte Tags offener Blöcke, solange changed noch nicht gesetzt ist
+        self._saved_tags: dict[int, frozenset[str]] = {}
+        self.changed = True  # seit dem letzten Speichern
+        blocks.listeners.append(self._on_blocks_changed)
+
+    def close(self) -> None:
+        if self._on_blocks_changed in self._blocks.listeners:
+            self._blocks.listeners.remove(self._on_blocks_changed)
+
+    def load(self, postings: dict[str, list[int]]) -> None:
+        """Gespeicherte Postings übernehmen (passend zum aktuellen BlockIndex)."""
+        count = len(self._blocks.starts)
+        per_block: list[set[str]] = [set() for _ in range(count)]
+        self._postings = {}
+        for tag, ids in postings.items():
+            valid = sorted({b for b in ids if 0 <= b < count})
+            if valid:
+                self._postings[tag] = valid
+                for b in valid:
+                    per_block[b].add(tag)
+        self._block_tags = [frozenset(tags) for tags in per_block]
+        self._pending = set()
+        self._saved_tags = {}
+        self.changed = False
+
+    def _on_blocks_changed(self, first: int, removed: int, added: int) -> None:
+        end = first + removed
+        delta = added - removed
+        if not self.changed:
+            self._note_saved_tags(first, end, delta)
+        postings = self._postings
+        for b in range(first, end):
+            for tag in self._block_tags[b] or ():
+                ids = postings[tag]
+                del ids[bisect_left(ids, b)]
+                if not ids:
+                    del postings[tag]
+        pending = {b for b in self._pending if not first <= b < end}
+        if delta:
+            # nur bei neuen/entfernten Einträgen verschieben sich die Blocknummern
+            for ids in postings.values():
+                i = bisect_left(ids, end)
+                ids[i:] = [b + delta for b in ids[i:]]
+            pending = {b + delta if b >= end else b for b in pending}
+        pending.update(range(first, first + added))
+        self._pending = pending
+        self._block_tags[first:end] = [None] * added
+
+    def _note_saved_tags(self, first: int, end: int, delta: int) -> None:
+        # vor dem Überschreiben merken, was gespeichert ist; _flush vergleicht damit
+        saved = self._saved_tags
+        new_end = end + delta
+        old = {b: saved[b] if b in saved else self._block_tags[b] or frozenset() for b in range(first, end)}
+        if any(old[b] for b in range(new_end, end)) or (
+            delta
+            and (
+                any(ids[-1] >= end for ids in self._postings.values())
+                or any(tags for b, tags in saved.items() if b >= end)
+            )
+        ):
+            self.changed = True  # getaggte Blöcke fallen weg oder verschieben sich
+            self._saved_tags = {}
+            return
+        kept = {b: tags for b, tags in saved.items() if b < first or (b >= end and not delta)}
+        kept.update((b, old.get(b, frozenset())) for b in range(first, new_end))
+        self._saved_tags = kept
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        starts = self._blocks.starts
+        line_count = self._blocks.line_count
+        all_lines = self._read_lines(0, line_count) if len(self._pending) > _BULK_READ_BLOCKS else None
+        for b in sorted(self._pending):
+            start = starts[b]
+            end = starts[b + 1] if b + 1 < len(starts) else line_count
+            lines = all_lines[start:end] if all_lines is not None else self._read_lines(start, end)
+            tags = frozenset(tags_in("\n".join(lines)))
+            self._block_tags[b] = tags
+            for tag in tags:
+                insort(self._postings.setdefault(tag, []), b)
+            if not self.changed and tags != self._saved_tags.get(b, frozenset()):
+                self.changed = True
+        self._pending = set()
+        self._saved_tags = {}
+
+    def counts(self) -> dict[str, int]:
+        """Tag -> Anzahl Einträge."""
+        self._flush()
+        return {tag: len(ids) for tag, ids in self._postings.items()}
+
+    def tags_of(self, b_idx: int) -> frozenset[str]:
+        """Tags von Block b_idx."""
+        self._flush()
+        return self._block_tags[b_idx] or frozenset()
+
+    def blocks(self, tag: str) -> set[int]:
+        self._flush()
+        return set(self._postings.get(tag.lstrip("#").casefold(), ()))
+
+    def postings(self) -> dict[str, list[int]]:
+        """Tag -> sortierte Blöcke (zum Speichern)."""
+        self._flush()
+        return {tag: list(ids) for tag, ids in self._postings.items()}
+
+
+def tag_postings(indexes: dict[str, TagIndex], tag: str) -> list[tuple[str, int]]:
+    """(Thema, Block) aller Einträge mit tag, Themen in der Reihenfolge von indexes."""
+    return [(topic, b) for topic, index in indexes.items() for b in sorted(index.blocks(tag))]
+
+
+def merged_counts(indexes: dict[str, TagIndex]) -> dict[str, int]:
+    """Tag -> Anzahl Einträge über alle Themen."""
+    counts: dict[str, int] = {}
+    for index in indexes.values():
+        for tag, n in index.counts().items():
+            counts[tag] = counts.get(tag, 0) + n
+    return counts
@@ -0,0 +1,204 @@
+# File: mindpic/journal.py
+# -*- coding: utf-8 -*-
+"""
+MindPic – Änderungsjournal je Notiz (notes/<thema>.journal).
+
+Autosave schreibt nicht die ganze Notiz neu, sondern hängt nur die Änderung
+seit dem letzten Stand an das Journal an. Erst beim Verdichten (Leerlauf,
+Tabwechsel, Beenden, Journal zu groß) wird die .txt-Datei geschrieben und das
+Journal gelöscht. Bleibt nach einem Absturz ein Journal liegen, spielt
+load_journaled_content() es beim Start nach.
+
+Format (UTF-8, eine JSON-Zeile je Eintrag):
+- Kopf: {"v": 1, "base": <Hash der .txt, auf die sich das Journal bezieht>}
+- Änderung: [start, end, text] – Zeichen start..end des vorigen Stands durch text ersetzen
+
+Eine abgeschnittene letzte Zeile (Absturz beim Schreiben) wird ignoriert.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from . import settings
+from .paths import ensure_dir, get_backups_dir
+from .persistence import content_digest, current_sync_batch, get_journal_path, load_content, write_content
+
+logger = logging.getLogger(__name__)
+
+_JOURNAL_VERSION = 1
+_CHUNK = 4096
+
+
+def _common_prefix(a: str, b: str, limit: int) -> int:
+    # blockweise vergleichen, im ersten abweichenden Block halbieren
+    lo = 0
+    while lo < limit:
+        hi = min(lo + _CHUNK, limit)
+        if a[lo:hi] != b[lo:hi]:
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if a[lo:mid] == b[lo:mid]:
+                    lo = mid
+                else:
+                    hi = mid
+            return lo
+        lo = hi
+    return limit
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    la, lb = len(a), len(b)
+    n = 0
+    while n < limit:
+        m = min(n + _CHUNK, limit)
+        if a[la - m:la - n] != b[lb - m:lb - n]:
+            while m - n > 1:
+                mid = (n + m) // 2
+                if a[la - mid:la - n] == b[lb - mid:lb - n]:
+                    n = mid
+                else:
+                    m = mid
+            return n
+        n = m
+    return limit
+
+
+def text_delta(old: str, new: str) -> tuple[int, int, str]:
+    """(start, end, text) mit new == old[:start] + text + old[end:], möglichst klein."""
+    limit = min(len(old), len(new))
+    start = _common_prefix(old, new, limit)
+    suffix = _common_suffix(old, new, limit - start)
+    return start, len(old) - suffix, new[start:len(new) - suffix]
+
+
+def replay_journal(path: Path, base: str) -> str | None:
+    """Journal auf base anwenden. None, wenn es nicht zu base gehört."""
+    with open(path, encoding="utf-8", newline="") as f:
+        lines = f.read().split("\n")
+    try:
+        header = json.loads(lines[0])
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or header.get("v") != _JOURNAL_VERSION:
+        return None
+    if header.get("base") != content_digest(base).hex():
+        return None
+    text = base
+    for line in lines[1:]:
+        if not line:
+            continue
+        try:
+            start, end, insert = json.loads(line)
+        except ValueError:
+            break  # abgeschnittene letzte Zeile
+        if not (isinstance(start, int) and isinstance(end, int) and isinstance(insert, str)):
+            break
+        if not 0 <= start <= end <= len(text):
+            break
+        text = text[:start] + insert + text[end:]
+    return text
+
+
+def load_journaled_content(topic: str) -> str:
+    """
+    Notiz laden und ein liegengebliebenes Journal nachspielen. Das Ergebnis
+    wird gleich in die .txt geschrieben (mit Backup) und das Journal gelöscht.
+    """
+    text = load_content(topic)
+    path = get_journal_path(topic)
+    if not path.exists():
+        return text
+    try:
+        recovered = replay_journal(path, text)
+    except OSError as e:
+        logger.error("Failed to replay journal %s: %s", path, e)
+        return text
+    if recovered is None:
+        # gehört nicht zu dieser .txt (z.B. von außen ersetzt): aufheben, nicht anwenden
+        _keep_journal(path, "does not match %s" % topic)
+        return text
+    try:
+        if recovered != text:
+            write_content(recovered, topic=topic, force_backup=True)
+            logger.info("Recovered %s chars of unsaved edits for %s from %s", len(recovered) - len(text), topic, path)
+        path.unlink()
+    except OSError as e:
+        # das nächste Autosave legt das Journal neu an ("wb"): vorher aufheben; der
+        # wiederhergestellte Text geht an den Editor und wird beim Verdichten geschrieben
+        logger.error("Failed to save recovered edits of %s: %s", topic, e)
+        _keep_journal(path, "could not be applied to %s" % topic)
+    return recovered
+
+
+def _keep_journal(path: Path, reason: str) -> None:
+    """Journal nach backups/ verschieben statt es zu überschreiben."""
+    keep = get_backups_dir() / f"{path.stem}_{time.strftime('%Y%m%d_%H%M%S')}.journal"
+    try:
+        ensure_dir(keep.parent)
+        os.replace(path, keep)
+    except OSError as e:
+        logger.error("Failed to keep journal %s: %s", path, e)
+        return
+    logger.warning("Journal %s %s, moved to %s", path, reason, keep)
+
+
+class NoteJournal:
+    """
+    Journal einer Notiz. Nur aus dem Writer-Thread benutzen (der UI-Thread
+    legt es an, bevor der erste Auftrag kommt).
+
+    text ist der Stand der .txt-Datei beim Anlegen.
+    """
+
+    def __init__(self, topic: str, text: str) -> None:
+        self.topic = topic
+        self._path = get_journal_path(topic)
+        self._text = text  # Stand nach allen Journal-Einträgen
+        self._size = 0  # Bytes im Journal; 0 = kein Journal
+        self._broken = False  # letzter Append fehlgeschlagen -> Journal nicht mehr vertrauen
+
+    def append(self, text: str) -> bool:
+        """Änderung seit dem letzten Stand anhängen. True, wenn etwas geschrieben wurde."""
+        if self._broken or self._size >= settings.JOURNAL_COMPACT_BYTES:
+            return self.compact(text)
+        if text == self._text:
+            return False
+        start, end, insert = text_delta(self._text, text)
+        data = json.dumps([start, end, insert], ensure_ascii=False) + "\n"
+        if not self._size:
+            header = {"v": _JOURNAL_VERSION, "base": content_digest(self._text).hex()}
+            data = json.dumps(header) + "\n" + data
+        raw = data.encode("utf-8")
+        try:
+            ensure_dir(self._path.parent)
+            with open(self._path, "ab" if self._size else "wb") as f:
+                f.write(raw)
+        except OSError:
+            self._broken = True
+            raise
+        batch = current_sync_batch()
+        if batch is not None:
+            # mehrere Anhänge im selben Zyklus teilen sich einen fsync
+            batch.files.add(self._path)
+            if not self._size:
+                batch.dirs.add(self._path.parent)
+        self._size += len(raw)
+        self._text = text
+        return True
+
+    def compact(self, text: str, *, force_backup: bool = False) -> bool:
+        """text als .txt schreiben und das Journal löschen. True, wenn die .txt geschrieben wurde."""
+        written = write_content(text, topic=self.topic, force_backup=force_backup)
+        try:
+            self._path.unlink()
+        except FileNotFoundError:
+            pass
+        self._text = text
+        self._size = 0
+        self._broken = False
+        return written
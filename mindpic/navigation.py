@@ -0,0 +1,399 @@
+# File: mindpic/navigation.py
+# -*- coding: utf-8 -*-
+"""
+MindPic – Navigation (Datum, Gliederung).
+
+- DateIndex: Blöcke eines Themas nach Zeitpunkt sortiert, Suche per bisect
+- EntryOutline: Titel je Eintrag für die Gliederung, inkrementell nachgeführt
+- parse_date_query / parse_date_range: Eingaben aus den Dialogen in Zeiträume übersetzen
+- blocks_containing / hidden_line_ranges: Grundlage für Filter und Falten (elide-Tags)
+- Timeline: Einträge aller Themen zeitlich gemischt (heapq.merge), seitenweise gelesen
+
+Die Zeitpunkte kommen aus dem BlockIndex (colorize); neu sortiert wird nur,
+wenn sich dort Blöcke oder Zeitstempel geändert haben (BlockIndex.version).
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from . import settings
+from .colorize import BlockIndex, timestamp_of, timestamp_registry
+
+# Eingabeformate für Datumsabfragen, jeweils mit der Länge des gemeinten Zeitraums
+_QUERY_FORMATS = [
+    ("%d.%m.%Y", "day"),
+    ("%d-%m-%Y", "day"),
+    ("%Y-%m-%d", "day"),
+    ("%d.%m.%y", "day"),
+    ("%m.%Y", "month"),
+    ("%m/%Y", "month"),
+    ("%Y-%m", "month"),
+    ("%Y", "year"),
+]
+_RANGE_SEP_RE = re.compile(r"\s+(?:-|–|bis)\s+|\s*(?:\.\.|–)\s*")
+
+
+class DateIndex:
+    """
+    Nach Zeitpunkt sortierte Blöcke eines BlockIndex.
+
+    Einträge ohne erkennbares Datum fehlen. Bei gleichen Zeitpunkten bleibt
+    die Reihenfolge im Text erhalten.
+    """
+
+    def __init__(self, blocks: BlockIndex) -> None:
+        self._blocks = blocks
+        self._version = -1
+        self._times: list[datetime] = []
+        self._order: list[int] = []
+
+    def _refresh(self) -> None:
+        if self._version == self._blocks.version:
+            return
+        pairs = sorted(
+            ((t, b) for b, t in enumerate(self._blocks.block_times()) if t is not None),
+            key=lambda pair: pair[0],
+        )
+        self._times = [t for t, _b in pairs]
+        self._order = [b for _t, b in pairs]
+        self._version = self._blocks.version
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._times)
+
+    @property
+    def version(self) -> int:
+        """BlockIndex.version, auf dem die Sortierung beruht."""
+        self._refresh()
+        return self._version
+
+    def entries(self, start: int = 0) -> Iterator[tuple[datetime, int]]:
+        """(Zeitpunkt, Block) in zeitlicher Reihenfolge, ab dem start-ten Eintrag."""
+        self._refresh()
+        return zip(islice(self._times, start, None), islice(self._order, start, None))
+
+    def first_at_or_after(self, when: datetime) -> int | None:
+        """Block des ersten Eintrags ab when; sonst der letzte davor (None ohne Einträge)."""
+        self._refresh()
+        if not self._order:
+            return None
+        i = bisect_left(self._times, when)
+        return self._order[min(i, len(self._order) - 1)]
+
+    def count_between(self, start: datetime, end: datetime) -> int:
+        self._refresh()
+        return bisect_left(self._times, end) - bisect_left(self._times, start)
+
+    def between(self, start: datetime, end: datetime) -> list[int]:
+        """Blöcke mit start <= Zeitpunkt < end, zeitlich sortiert."""
+        self._refresh()
+        lo = bisect_left(self._times, start)
+        hi = bisect_left(self._times, end)
+        return self._order[lo:hi]
+
+
+class EntryOutline:
+    """
+    Titel ("<Zeitstempel>  <erste Worte>") je Block eines BlockIndex.
+
+    Hängt als Listener am BlockIndex: geänderte Blöcke werden nur als
+    ungelesen markiert; gelesen wird erst, wenn eine Zeile angezeigt wird.
+    read_lines(a, b) liefert die Zeilen [a, b) des Textes.
+    """
+
+    def __init__(self, blocks: BlockIndex, read_lines: Callable[[int, int], list[str]]) -> None:
+        self._blocks = blocks
+        self._read_lines = read_lines
+        self._titles: list[str | None] = [None] * len(blocks.starts)
+        blocks.listeners.append(self._on_blocks_changed)
+
+    def close(self) -> None:
+        if self._on_blocks_changed in self._blocks.listeners:
+            self._blocks.listeners.remove(self._on_blocks_changed)
+
+    def _on_blocks_changed(self, first: int, removed: int, added: int) -> None:
+        self._titles[first : first + removed] = [None] * added
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def title(self, b_idx: int) -> str:
+        title = self._titles[b_idx]
+        if title is None:
+            title = self._titles[b_idx] = self._read_title(b_idx)
+        return title
+
+    def _read_title(self, b_idx: int) -> str:
+        starts = self._blocks.starts
+        start = starts[b_idx]
+        end = starts[b_idx + 1] if b_idx + 1 < len(starts) else self._blocks.line_count
+        lines = self._read_lines(start, min(end, start + 2))
+        if not lines:
+            return ""
+        header = lines[0].strip()
+        stamp = timestamp_of(lines[0]) or ""
+        rest = header[len(stamp):].strip()
+        if not rest and len(lines) > 1:
+            rest = lines[1].strip()
+        title = f"{stamp}  {rest}" if rest else stamp
+        limit = settings.OUTLINE_TITLE_CHARS
+        return title if len(title) <= limit else title[: limit - 1] + "…"
+
+
+def _add_months(d: date, months: int) -> date:
+    month = d.month - 1 + months
+    return date(d.year + month // 12, month % 12 + 1, 1)
+
+
+def parse_date_query(query: str) -> tuple[datetime, datetime] | None:
+    """
+    "14.03.2025", "2025-03", "03.2025", "2025" oder ein Zeitstempel im
+    konfigurierten Format → (start, end) des gemeinten Zeitraums.
+    """
+    query = " ".join(query.split())
+    if not query:
+        return None
+    for fmt, span in _QUERY_FORMATS:
+        try:
+            day = datetime.strptime(query, fmt)
+        except ValueError:
+            continue
+        if span == "day":
+            return day, day + timedelta(days=1)
+        if span == "month":
+            return day, datetime.combine(_add_months(day.date(), 1), day.time())
+        return day, day.replace(year=day.year + 1)
+    for f in timestamp_registry().formats:
+        if not f.has_date:
+            continue
+        try:
+            when = datetime.strptime(query, " ".join(f.fmt.split()))
+        except ValueError:
+            continue
+        return when, when + timedelta(minutes=1)
+    return None
+
+
+def parse_date_range(query: str) -> tuple[datetime, datetime] | None:
+    """
+    "01.03.2025 - 31.03.2025", "2024..2025", "03.2025 bis 05.2025" oder ein
+    einzelner Zeitraum wie bei parse_date_query. Das Ende ist inklusive gemeint.
+    """
+    parts = [p for p in _RANGE_SEP_RE.split(query.strip(), maxsplit=1) if p]
+    if len(parts) == 1:
+        return parse_date_query(parts[0])
+    if len(parts) != 2:
+        return None
+    first = parse_date_query(parts[0])
+    last = parse_date_query(parts[1])
+    if first is None or last is None:
+        return None
+    start, end = min(first[0], last[0]), max(first[1], last[1])
+    return start, end
+
+
+def preset_range(label: str, now: datetime | None = None) -> tuple[datetime, datetime] | None:
+    """Zeitraum zu einem Eintrag aus settings.FILTER_RANGE_PRESETS (None = alle)."""
+    now = now or datetime.now()
+    today = datetime.combine(now.date(), datetime.min.time())
+    days = settings.FILTER_RANGE_PRESETS.get(label)
+    if days is None:
+        return None
+    if days == 0:
+        return today, datetime.max
+    if days < 0:
+        return today.replace(month=1, day=1), datetime.max
+    return today - timedelta(days=days - 1), datetime.max
+
+
+def blocks_containing(blocks: BlockIndex, content: str, needle: str) -> set[int]:
+    """Blöcke, deren Text needle enthält (ohne Groß-/Kleinschreibung)."""
+    needle = needle.casefold()
+    if not needle or not blocks.starts:
+        return set()
+    haystack = content.casefold()
+    if len(haystack) != len(content):
+        # casefold kann Längen ändern (ß -> ss); dann zeilenweise zuordnen
+        return {
+            b
+            for line_no, line in enumerate(content.split("\n"))
+            if needle in line.casefold()
+            for b in (bisect_right(blocks.starts, line_no) - 1,)
+            if b >= 0
+        }
+    found: set[int] = set()
+    starts = blocks.starts
+    pos = haystack.find(needle)
+    line_no = 0
+    counted = 0
+    while pos != -1:
+        line_no += haystack.count("\n", counted, pos)
+        counted = pos
+        b_idx = bisect_right(starts, line_no) - 1
+        if b_idx >= 0:
+            found.add(b_idx)
+        pos = haystack.find(needle, pos + 1)
+    return found
+
+
+def hidden_line_ranges(blocks: BlockIndex, shown: Iterable[int]) -> list[tuple[int, int]]:
+    """Zeilenbereiche [a, b), die ausgeblendet werden, damit nur die Blöcke in shown bleiben."""
+    hidden: list[tuple[int, int]] = []
+    starts = blocks.starts
+    line = 0
+    for b_idx in sorted(shown):
+        start = starts[b_idx]
+        if start > line:
+            hidden.append((line, start))
+        line = starts[b_idx + 1] if b_idx + 1 < len(starts) else blocks.line_count
+    if line < blocks.line_count:
+        hidden.append((line, blocks.line_count))
+    return hidden
+
+
+class EntryFilter:
+    """
+    Ergebnis der Filterleiste für ein Thema, nachgeführt mit dem BlockIndex.
+
+    Nach dem vollen Lauf merkt sich der Filter nur, welche Blöcke seitdem
+    geändert wurden (Listener wie TagIndex); update() prüft genau diese mit
+    matches(b_idx) neu und liefert ihre Zeilenbereiche zum Ein-/Ausblenden.
+    """
+
+    def __init__(self, blocks: BlockIndex, matches: Callable[[int], bool]) -> None:
+        self._blocks = blocks
+        self._matches = matches
+        self._pending: set[int] = set()
+        blocks.listeners.append(self._on_blocks_changed)
+
+    def close(self) -> None:
+        if self._on_blocks_changed in self._blocks.listeners:
+            self._blocks.listeners.remove(self._on_blocks_changed)
+
+    def _on_blocks_changed(self, first: int, removed: int, added: int) -> None:
+        end = first + removed
+        delta = added - removed
+        pending = {b + delta if b >= end else b for b in self._pending if not first <= b < end}
+        pending.update(range(first, first + added))
+        self._pending = pending
+
+    def update(self) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+        """(einblenden, ausblenden): Zeilenbereiche der seit dem letzten Lauf geänderten Blöcke."""
+        blocks = self._blocks
+        starts = blocks.starts
+        pending, self._pending = sorted(self._pending), set()
+        if not starts:
+            # ohne Zeitstempel filtert die Leiste nichts (wie beim vollen Lauf)
+            return ([(0, blocks.line_count)] if pending else []), []
+        show: list[tuple[int, int]] = []
+        hide: list[tuple[int, int]] = []
+        if pending and pending[0] == 0 and starts[0] > 0:
+            hide.append((0, starts[0]))  # Vorspann vor dem ersten Eintrag
+        for b_idx in pending:
+            if b_idx >= len(starts):
+                continue
+            end = starts[b_idx + 1] if b_idx + 1 < len(starts) else blocks.line_count
+            (show if self._matches(b_idx) else hide).append((starts[b_idx], end))
+        return show, hide
+
+
+def body_line_ranges(blocks: BlockIndex, block_ids: Iterable[int]) -> list[tuple[int, int]]:
+    """Zeilen unter dem Kopf der Blöcke (das, was beim Falten verschwindet)."""
+    starts = blocks.starts
+    bodies: list[tuple[int, int]] = []
+    for b_idx in sorted(block_ids):
+        end = starts[b_idx + 1] if b_idx + 1 < len(starts) else blocks.line_count
+        if end > starts[b_idx] + 1:
+            bodies.append((starts[b_idx] + 1, end))
+    return bodies
+
+
+@dataclass(frozen=True)
+class TimelineEntry:
+    when: datetime
+    topic: str
+    block: int
+
+
+def _timeline_stream(rank: int, dates: DateIndex, start: int) -> Iterator[tuple[datetime, int, int]]:
+    # rank hält bei gleichen Zeitpunkten die Themenreihenfolge stabil
+    for when, b_idx in dates.entries(start):
+        yield when, rank, b_idx
+
+
+class Timeline:
+    """
+    Datierte Einträge aller Themen in zeitlicher Reihenfolge.
+
+    Die Themen sind je für sich schon sortiert (DateIndex); heapq.merge hält
+    davon nur den jeweils nächsten Eintrag. Gemerkt werden die zuletzt gelesene
+    Seite und je gelesenem Seitenanfang die Position in jedem Thema – vorwärts
+    wird weitergelesen, rückwärts ab dem nächstgelegenen Seitenanfang gemischt.
+    """
+
+    def __init__(self, sources: dict[str, DateIndex], page_size: int | None = None) -> None:
+        self._topics = list(sources)
+        self._dates = list(sources.values())
+        self._page_size = max(1, page_size or settings.TIMELINE_PAGE_SIZE)
+        self._versions: tuple[int, ...] | None = None
+        self._count = 0
+        self._merged: Iterator[tuple[datetime, int, int]] | None = None
+        self._pos = 0
+        self._consumed: list[int] = []  # je Thema: bis _pos gelesene Einträge
+        self._cursors: dict[int, tuple[int, ...]] = {}  # Seitenanfang -> _consumed
+        self._page_start = 0
+        self._page: list[TimelineEntry] = []
+
+    def _check(self) -> None:
+        versions = tuple(d.version for d in self._dates)
+        if versions != self._versions:
+            self._versions = versions
+            self._count = sum(len(d) for d in self._dates)
+            self._merged = None
+            self._pos = 0
+            self._cursors = {}
+            self._page = []
+
+    @property
+    def topics(self) -> list[str]:
+        return list(self._topics)
+
+    def __len__(self) -> int:
+        self._check()
+        return self._count
+
+    def entry(self, i: int) -> TimelineEntry:
+        self._check()
+        if not self._page_start <= i < self._page_start + len(self._page):
+            self._load_page(i - i % self._page_size)
+        return self._page[i - self._page_start]
+
+    def _load_page(self, start: int) -> None:
+        resume = max((s for s in self._cursors if s <= start), default=0)
+        if self._merged is None or start < self._pos or resume > self._pos:
+            cursor = self._cursors.get(resume, (0,) * len(self._dates))
+            self._merged = heapq.merge(*(_timeline_stream(r, d, cursor[r]) for r, d in enumerate(self._dates)))
+            self._consumed = list(cursor)
+            self._pos = resume
+        page: list[TimelineEntry] = []
+        for when, rank, b_idx in self._merged:
+            if self._pos % self._page_size == 0:
+                self._cursors[self._pos] = tuple(self._consumed)
+            self._consumed[rank] += 1
+            self._pos += 1
+            if self._pos > start:
+                page.append(TimelineEntry(when, self._topics[rank], b_idx))
+                if len(page) == self._page_size:
+                    break
+        self._page_start = start
+        self._page = page
+        if not self._page:
+            raise IndexError(start)
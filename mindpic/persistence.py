@@ -6,28 +6,115 @@ MindPic – Persistenz für Notizinhalte, Backups und Fenstergeometrie.
 
 from __future__ import annotations
 
+import glob
+import hashlib
 import json
 import logging
+import lzma
 import os
-import shutil
+import re
+import struct
+import sys
+import threading
 import time
+import zlib
+from array import array
+from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator, TypeVar
 
 from . import settings
+from .colorize import parse_timestamp, timestamp_has_date, timestamp_registry
 from .note_store import get_topic_path, normalize_topic_name
 from .paths import ensure_dir, get_backups_dir, get_content_path, get_geometry_path, get_notes_dir
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-def atomic_write_text(path: Path, text: str) -> None:
-    """Write text atomically by replacing the target with a temporary file."""
+
+# =============================================================================
+# Dauerhaftigkeit (fsync)
+# =============================================================================
+
+class SyncBatch:
+    """
+    fsyncs eines Schreibzyklus (group commit).
+
+    Ersetzte Dateien werden vor dem os.replace einzeln gesynct (sonst kann nach
+    einem Absturz eine leere Datei übrig bleiben); die Verzeichnisse dazu und
+    angehängte Dateien (Journal) werden gesammelt und in commit() je einmal gesynct.
+    """
+
+    def __init__(self) -> None:
+        self.files: set[Path] = set()
+        self.dirs: set[Path] = set()
+
+    def commit(self) -> None:
+        for path in sorted(self.files):
+            fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        for directory in sorted(self.dirs):
+            _fsync_dir(directory)
+        self.files.clear()
+        self.dirs.clear()
+
+
+def _fsync_dir(directory: Path) -> None:
+    if sys.platform.startswith("win"):
+        return  # Verzeichnisse lassen sich unter Windows nicht öffnen; NTFS journalt Renames selbst
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+_SYNC = threading.local()
+
+
+@contextmanager
+def durable_writes(batch: SyncBatch | None) -> Iterator[None]:
+    """Schreibvorgänge dieses Threads in batch syncen (None: nicht syncen)."""
+    previous = getattr(_SYNC, "batch", None)
+    _SYNC.batch = batch
+    try:
+        yield
+    finally:
+        _SYNC.batch = previous
+
+
+def current_sync_batch() -> SyncBatch | None:
+    return getattr(_SYNC, "batch", None)
+
+
+def _atomic_write(path: Path, data: str | bytes) -> None:
     ensure_dir(path.parent)
     tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
-    tmp.write_text(text, encoding="utf-8")
+    batch = current_sync_batch()
+    with (open(tmp, "wb") if isinstance(data, bytes) else open(tmp, "w", encoding="utf-8")) as f:
+        f.write(data)
+        if batch is not None:
+            f.flush()
+            os.fsync(f.fileno())
     os.replace(tmp, path)
+    if batch is not None:
+        batch.dirs.add(path.parent)
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """Write text atomically by replacing the target with a temporary file (fsync inside durable_writes)."""
+    _atomic_write(path, text)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Like atomic_write_text, for binary files."""
+    _atomic_write(path, data)
 
 
 def atomic_write_json(path: Path, data: dict[str, Any]) -> None:
@@ -41,21 +128,59 @@ def _backup_stem(path: Path, topic: str | None = None) -> str:
     return path.stem
 
 
-def create_backup(path: Path, *, topic: str | None = None) -> Path | None:
-    """Create a timestamped backup of an existing file."""
+_BACKUP_STAMP = "%Y%m%d_%H%M%S"
+# (Backup-Ordner, Stamm) -> Zeitpunkt des letzten Backups; fehlt er, wird einmal der Ordner gelesen
+_LAST_BACKUP: dict[tuple[Path, str], float] = {}
+_LAST_BACKUP_LOCK = threading.Lock()
+
+
+def _backup_times(stem: str, suffix: str) -> list[tuple[float, Path]]:
+    """(Zeitpunkt laut Dateiname, Pfad) aller Backups zu stem (Manifeste und alte Vollkopien)."""
+    name_re = re.compile(
+        rf"{re.escape(stem)}_(\d{{8}}_\d{{6}})(?:_(\d+))?{re.escape(suffix)}(?:{re.escape(_MANIFEST_SUFFIX)})?"
+    )
+    found = []
+    for p in get_backups_dir().glob(f"{glob.escape(stem)}_*{suffix}*"):
+        m = name_re.fullmatch(p.name)
+        if m is None:
+            continue
+        try:
+            when = time.mktime(time.strptime(m.group(1), _BACKUP_STAMP))
+        except (ValueError, OverflowError):
+            continue
+        # _2, _3, ... entstehen in derselben Sekunde nach dem Backup ohne Zähler
+        found.append((when + int(m.group(2) or 1) / 1000, p))
+    return found
+
+
+def create_backup(path: Path, *, topic: str | None = None, force: bool = False) -> Path | None:
+    """
+    Create a timestamped backup of an existing file, at most one per
+    BACKUP_MIN_INTERVAL_S and note unless force (explicit save, exit).
+    """
     if not path.exists():
         return None
+    stem, suffix = _backup_stem(path, topic), path.suffix or ".txt"
     try:
+        key = (get_backups_dir(), stem)
+        now = time.time()
+        with _LAST_BACKUP_LOCK:
+            last = _LAST_BACKUP.get(key)
+        if last is None and get_backups_dir().exists():
+            last = max((when for when, _p in _backup_times(stem, suffix)), default=None)
+        if not force and last is not None and now - last < settings.BACKUP_MIN_INTERVAL_S:
+            return None
         ensure_dir(get_backups_dir())
-        stamp = time.strftime("%Y%m%d_%H%M%S")
-        backup_name = f"{_backup_stem(path, topic)}_{stamp}{path.suffix or '.txt'}"
-        backup_path = get_backups_dir() / backup_name
+        stamp = time.strftime(_BACKUP_STAMP, time.localtime(now))
+        backup_path = get_backups_dir() / f"{stem}_{stamp}{suffix}{_MANIFEST_SUFFIX}"
         counter = 2
         while backup_path.exists():
-            backup_path = get_backups_dir() / f"{_backup_stem(path, topic)}_{stamp}_{counter}{path.suffix or '.txt'}"
+            backup_path = get_backups_dir() / f"{stem}_{stamp}_{counter}{suffix}{_MANIFEST_SUFFIX}"
             counter += 1
-        shutil.copy2(path, backup_path)
-        _rotate_backups(_backup_stem(path, topic), path.suffix or ".txt")
+        store_snapshot(path, backup_path)
+        with _LAST_BACKUP_LOCK:
+            _LAST_BACKUP[key] = now
+        _rotate_backups(stem, suffix)
         logger.debug("Created backup %s", backup_path)
         return backup_path
     except OSError as e:
@@ -63,21 +188,232 @@ def create_backup(path: Path, *, topic: str | None = None) -> Path | None:
         return None
 
 
-def _rotate_backups(stem: str, suffix: str) -> None:
+def retained_backups(backups: list[tuple[float, T]], now: float) -> list[T]:
+    """
+    Gestaffelte Aufbewahrung, neueste zuerst: im ersten Tag das neueste Backup
+    je Stunde, im ersten Monat je Tag, danach je Woche; höchstens
+    MAX_BACKUPS_PER_NOTE (<= 0: alles behalten).
+    """
+    ordered = sorted(backups, key=lambda b: b[0], reverse=True)
     max_count = int(settings.MAX_BACKUPS_PER_NOTE)
     if max_count <= 0:
-        return
-    backups = sorted(
-        get_backups_dir().glob(f"{stem}_*{suffix}"),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-    for old in backups[max_count:]:
+        return [item for _when, item in ordered]
+    seen: set[tuple[Any, ...]] = set()
+    keep = []
+    for when, item in ordered:
+        age = now - when
+        local = datetime.fromtimestamp(when)
+        if age < settings.BACKUP_HOURLY_FOR_S:
+            bucket: tuple[Any, ...] = ("h", local.date(), local.hour)
+        elif age < settings.BACKUP_DAILY_FOR_S:
+            bucket = ("d", local.date())
+        else:
+            bucket = ("w",) + tuple(local.isocalendar()[:2])
+        if bucket not in seen:
+            seen.add(bucket)
+            keep.append(item)
+    return keep[:max_count]
+
+
+def _rotate_backups(stem: str, suffix: str) -> None:
+    backups = _backup_times(stem, suffix)
+    keep = set(retained_backups(backups, time.time()))
+    removed_manifest = False
+    for _when, old in backups:
+        if old in keep:
+            continue
         try:
             old.unlink()
+            removed_manifest = removed_manifest or old.name.endswith(_MANIFEST_SUFFIX)
             logger.debug("Removed old backup %s", old)
         except OSError as e:
             logger.warning("Could not remove old backup %s: %s", old, e)
+    if removed_manifest:
+        collect_backup_garbage(get_backups_dir())
+
+
+# =============================================================================
+# Backup-Speicher (backups/chunks/, backups/<stamm>_<zeit>.txt.manifest)
+# =============================================================================
+# Ein Backup ist ein kleines Manifest mit der Liste seiner Chunks. Geschnitten
+# wird an inhaltsabhängigen Zeilenenden: zwei Stände, die sich nur am Ende oder
+# an einer Stelle unterscheiden, teilen sich alle übrigen Chunks. Jeder Chunk
+# liegt einmal unter seinem Hash in chunks/<xx>/, komprimiert; das erste Byte
+# der Datei nennt das Verfahren.
+
+_MANIFEST_SUFFIX = ".manifest"
+_MANIFEST_VERSION = 1
+_CHUNKS_DIR_NAME = "chunks"
+_CODECS: dict[bytes, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    b"n": (bytes, bytes),
+    b"z": (zlib.compress, zlib.decompress),
+    b"x": (lzma.compress, lzma.decompress),
+}
+_CODEC_TAGS = {"none": b"n", "zlib": b"z", "lzma": b"x"}
+# Chunks/Manifeste schreiben vs. unreferenzierte Chunks löschen
+_STORE_LOCK = threading.RLock()
+
+
+def _chunk_id(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def iter_chunks(data: bytes) -> Iterator[bytes]:
+    """
+    data in Chunks zerlegen. Geschnitten wird hinter einer Zeile, deren CRC unter
+    einer zur Zeilenlänge proportionalen Schwelle liegt (im Mittel alle
+    BACKUP_CHUNK_AVG_BYTES), frühestens nach BACKUP_CHUNK_MIN_BYTES; ohne
+    Zeilenumbruch hart nach BACKUP_CHUNK_MAX_BYTES.
+    """
+    lo = settings.BACKUP_CHUNK_MIN_BYTES
+    hi = max(lo + 1, settings.BACKUP_CHUNK_MAX_BYTES)
+    per_byte = (1 << 32) // max(1, settings.BACKUP_CHUNK_AVG_BYTES - lo)
+    view = memoryview(data)
+    n = len(data)
+    start = pos = 0
+    while pos < n:
+        nl = data.find(b"\n", pos, start + hi)
+        if nl < 0:
+            end = min(n, start + hi)
+            yield data[start:end]
+            start = pos = end
+            continue
+        end = nl + 1
+        if end - start >= lo and zlib.crc32(view[pos:end]) < (end - pos) * per_byte:
+            yield data[start:end]
+            start = end
+        pos = end
+    if start < n:
+        yield data[start:]
+
+
+def _chunk_path(chunks_dir: Path, chunk_id: str) -> Path:
+    return chunks_dir / chunk_id[:2] / chunk_id
+
+
+def _store_chunk(chunks_dir: Path, chunk: bytes) -> str:
+    chunk_id = _chunk_id(chunk)
+    path = _chunk_path(chunks_dir, chunk_id)
+    if not path.exists():
+        tag = _CODEC_TAGS.get(settings.BACKUP_COMPRESSION, b"z")
+        packed = _CODECS[tag][0](chunk)
+        if len(packed) >= len(chunk):
+            tag, packed = b"n", chunk
+        atomic_write_bytes(path, tag + packed)
+    return chunk_id
+
+
+def store_snapshot(source: Path, manifest_path: Path) -> None:
+    """source als Backup ablegen: fehlende Chunks speichern, danach das Manifest."""
+    data = source.read_bytes()
+    chunks_dir = manifest_path.parent / _CHUNKS_DIR_NAME
+    with _STORE_LOCK:
+        chunks = [_store_chunk(chunks_dir, chunk) for chunk in iter_chunks(data)]
+        manifest = {
+            "v": _MANIFEST_VERSION,
+            "name": source.name,
+            "size": len(data),
+            "hash": _chunk_id(data),
+            "mtime": source.stat().st_mtime,
+            "chunks": chunks,
+        }
+        atomic_write_text(manifest_path, json.dumps(manifest, separators=(",", ":")))
+
+
+def load_manifest(path: Path) -> dict[str, Any]:
+    """Manifest lesen und prüfen. ValueError, wenn es kein gültiges Manifest ist."""
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(manifest, dict) or manifest.get("v") != _MANIFEST_VERSION:
+        raise ValueError(f"{path.name} is not a backup manifest")
+    chunks = manifest.get("chunks")
+    if not isinstance(chunks, list) or not all(isinstance(c, str) for c in chunks):
+        raise ValueError(f"{path.name} has no chunk list")
+    if not isinstance(manifest.get("size"), int) or not isinstance(manifest.get("hash"), str):
+        raise ValueError(f"{path.name} has no size/hash")
+    return manifest
+
+
+def iter_backup(backup: Path) -> Iterator[bytes]:
+    """
+    Inhalt eines Backups stückweise: Manifeste Chunk für Chunk (jeder und das
+    Ganze gegen seinen Hash geprüft, sonst ValueError), alte Vollkopien direkt.
+    """
+    if not backup.name.endswith(_MANIFEST_SUFFIX):
+        with open(backup, "rb") as f:
+            while True:
+                block = f.read(1 << 20)
+                if not block:
+                    return
+                yield block
+    manifest = load_manifest(backup)
+    chunks_dir = backup.parent / _CHUNKS_DIR_NAME
+    whole = hashlib.blake2b(digest_size=16)
+    size = 0
+    for chunk_id in manifest["chunks"]:
+        raw = _chunk_path(chunks_dir, chunk_id).read_bytes()
+        codec = _CODECS.get(raw[:1])
+        if codec is None:
+            raise ValueError(f"Chunk {chunk_id} has unknown compression {raw[:1]!r}")
+        try:
+            chunk = codec[1](raw[1:])
+        except (zlib.error, lzma.LZMAError) as e:
+            raise ValueError(f"Chunk {chunk_id} is corrupt: {e}") from e
+        if _chunk_id(chunk) != chunk_id:
+            raise ValueError(f"Chunk {chunk_id} is corrupt")
+        whole.update(chunk)
+        size += len(chunk)
+        yield chunk
+    if size != manifest["size"] or whole.hexdigest() != manifest["hash"]:
+        raise ValueError(f"{backup.name} does not reassemble to the saved file")
+
+
+def restore_backup(backup: Path, target: Path) -> None:
+    """Backup nach target schreiben (gestreamt, erst nach vollständiger Prüfung ersetzt)."""
+    ensure_dir(target.parent)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            for block in iter_backup(backup):
+                f.write(block)
+        os.replace(tmp, target)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+def collect_backup_garbage(backups_dir: Path) -> int:
+    """Chunks löschen, auf die kein Manifest mehr zeigt. Gibt die Anzahl zurück."""
+    chunks_dir = backups_dir / _CHUNKS_DIR_NAME
+    if not chunks_dir.is_dir():
+        return 0
+    removed = 0
+    with _STORE_LOCK:
+        used: set[str] = set()
+        for manifest in backups_dir.glob(f"*{_MANIFEST_SUFFIX}"):
+            try:
+                used.update(load_manifest(manifest)["chunks"])
+            except (OSError, ValueError) as e:
+                # lieber Chunks behalten als ein Backup unbrauchbar machen
+                logger.warning("Backup manifest %s unreadable, keeping all chunks: %s", manifest, e)
+                return 0
+        for path in chunks_dir.glob("*/*"):
+            if path.name in used or path.name.startswith("."):
+                continue
+            try:
+                path.unlink()
+                removed += 1
+            except OSError as e:
+                logger.warning("Could not remove backup chunk %s: %s", path, e)
+                continue
+            try:
+                path.parent.rmdir()  # nur wenn leer
+            except OSError:
+                pass
+    logger.debug("Removed %s unused backup chunks", removed)
+    return removed
 
 
 def _path_for_topic(topic: str | None = None) -> Path:
@@ -86,6 +422,63 @@ def _path_for_topic(topic: str | None = None) -> Path:
     return get_content_path()
 
 
+@dataclass(frozen=True)
+class _FileState:
+    """Zuletzt geschriebener/gelesener Stand einer Notizdatei."""
+
+    size: int
+    mtime_ns: int
+    digest: bytes
+
+
+# Pfad -> Stand; spart beim Speichern das Zurücklesen der alten Datei
+_CONTENT_STATE: dict[Path, _FileState] = {}
+_CONTENT_STATE_LOCK = threading.Lock()
+
+
+def _remember_content(p: Path, text: str) -> None:
+    try:
+        st = p.stat()
+    except OSError:
+        return
+    with _CONTENT_STATE_LOCK:
+        _CONTENT_STATE[p] = _FileState(st.st_size, st.st_mtime_ns, content_digest(text))
+
+
+def _content_unchanged(p: Path, text: str) -> bool:
+    """
+    True, wenn p schon genau text enthält. Stimmen Größe und mtime mit dem
+    gemerkten Stand überein, reicht der Hash-Vergleich; sonst (unbekannt oder
+    von außen geändert) wird die Datei einmal gelesen.
+    """
+    try:
+        st = p.stat()
+    except FileNotFoundError:
+        return False
+    with _CONTENT_STATE_LOCK:
+        state = _CONTENT_STATE.get(p)
+    if state is not None and (state.size, state.mtime_ns) == (st.st_size, st.st_mtime_ns):
+        return state.digest == content_digest(text)
+    try:
+        if p.read_text(encoding="utf-8") != text:
+            return False
+    except UnicodeDecodeError:
+        return False
+    with _CONTENT_STATE_LOCK:
+        _CONTENT_STATE[p] = _FileState(st.st_size, st.st_mtime_ns, content_digest(text))
+    return True
+
+
+def write_json_if_changed(path: Path, data: dict[str, Any]) -> bool:
+    """Wie atomic_write_json, lässt identische Inhalte aber aus. True, wenn geschrieben wurde."""
+    text = json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True)
+    if _content_unchanged(path, text):
+        return False
+    atomic_write_text(path, text)
+    _remember_content(path, text)
+    return True
+
+
 def load_content(topic: str | None = None) -> str:
     """Load saved text. For the default topic, migrates legacy content.txt on first use."""
     p = _path_for_topic(topic)
@@ -98,6 +491,7 @@ def load_content(topic: str | None = None) -> str:
         return ""
     try:
         content = p.read_text(encoding="utf-8")
+        _remember_content(p, content)
         logger.debug("Loaded content (%s chars) from %s", len(content), p)
         return content
     except (OSError, UnicodeDecodeError) as e:
@@ -105,20 +499,237 @@ def load_content(topic: str | None = None) -> str:
         return ""
 
 
-def save_content(text: str, topic: str | None = None) -> None:
-    """Save text atomically and keep a short backup rotation."""
+def write_content(text: str, topic: str | None = None, *, force_backup: bool = False) -> bool:
+    """Like save_content, but raises OSError instead of logging it (for the background writer)."""
     p = _path_for_topic(topic)
+    ensure_dir(p.parent)
+    new_text = text or ""
+    if _content_unchanged(p, new_text):
+        return False
+    create_backup(p, topic=topic, force=force_backup)
+    atomic_write_text(p, new_text)
+    _remember_content(p, new_text)
+    logger.debug("Saved content (%s chars) to %s", len(new_text), p)
+    return True
+
+
+def save_content(text: str, topic: str | None = None) -> bool:
+    """Save text atomically and keep a short backup rotation. Returns True if the file was written."""
     try:
-        ensure_dir(p.parent)
-        old_text = p.read_text(encoding="utf-8") if p.exists() else None
-        new_text = text or ""
-        if old_text == new_text:
-            return
-        create_backup(p, topic=topic)
-        atomic_write_text(p, new_text)
-        logger.debug("Saved content (%s chars) to %s", len(new_text), p)
+        return write_content(text, topic)
     except OSError as e:
-        logger.error("Failed to save content to %s: %s", p, e)
+        logger.error("Failed to save content to %s: %s", _path_for_topic(topic), e)
+        return False
+
+
+# =============================================================================
+# Sidecar-Index (notes/<thema>.idx)
+# =============================================================================
+
+# magic, version, reserved, formats_key, file size, mtime_ns, digest, line_count, block_count
+_SIDECAR_HEADER = struct.Struct("<4sHHIQq16sII")
+_SIDECAR_MAGIC = b"MPIX"
+_SIDECAR_VERSION = 1
+_U32 = "I" if array("I").itemsize == 4 else "L"
+_EPOCH = datetime(1970, 1, 1)
+_DAY_START = datetime(1900, 1, 1)
+# Art je Block: kein/ungültiger Zeitstempel, mit Datum, nur Uhrzeit
+_TIME_NONE, _TIME_DATED, _TIME_ONLY = 0, 1, 2
+_SIDECAR_LOCK = threading.Lock()
+
+
+@dataclass
+class SidecarIndex:
+    """Blockstarts, Farbschlüssel und Zeitpunkte eines Themas (siehe BlockIndex)."""
+
+    starts: list[int]
+    keys: list[int]
+    times: list[tuple[datetime, bool] | None]
+    line_count: int
+
+
+def get_sidecar_path(topic: str | None = None) -> Path:
+    return _path_for_topic(topic).with_suffix(".idx")
+
+
+def content_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _formats_key() -> int:
+    return zlib.crc32("\n".join(f.fmt for f in timestamp_registry().formats).encode("utf-8"))
+
+
+def _le(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def save_sidecar_index(text: str, index: SidecarIndex, topic: str | None = None) -> None:
+    """
+    Schreibt den Index für den gespeicherten Stand von text (Größe/mtime der
+    Notizdatei + Inhalts-Hash). Unbekannte Zeitstempel-Texte in index.times
+    werden hier geparst, damit das im Hintergrund-Thread passieren kann.
+    """
+    p = _path_for_topic(topic)
+    if not p.exists():
+        return
+    kinds = array("B")
+    seconds = array("d")
+    for value in index.times:
+        if isinstance(value, str):
+            parsed = parse_timestamp(value)
+            value = (parsed, timestamp_has_date(value)) if parsed else None
+        if value is None:
+            kinds.append(_TIME_NONE)
+            seconds.append(0.0)
+        elif value[1]:
+            kinds.append(_TIME_DATED)
+            seconds.append((value[0] - _EPOCH).total_seconds())
+        else:
+            kinds.append(_TIME_ONLY)
+            seconds.append((value[0] - _DAY_START).total_seconds())
+    with _SIDECAR_LOCK:
+        try:
+            st = p.stat()
+            header = _SIDECAR_HEADER.pack(
+                _SIDECAR_MAGIC,
+                _SIDECAR_VERSION,
+                0,
+                _formats_key(),
+                st.st_size,
+                st.st_mtime_ns,
+                content_digest(text),
+                index.line_count,
+                len(index.starts),
+            )
+            body = b"".join(
+                (
+                    _le(array(_U32, index.starts)),
+                    _le(array(_U32, index.keys)),
+                    _le(seconds),
+                    kinds.tobytes(),
+                )
+            )
+            atomic_write_bytes(get_sidecar_path(topic), header + body)
+            logger.debug("Saved sidecar index (%s blocks) for %s", len(index.starts), p)
+        except (OSError, OverflowError, struct.error) as e:
+            logger.error("Failed to save sidecar index for %s: %s", p, e)
+
+
+def load_sidecar_index(text: str, topic: str | None = None) -> SidecarIndex | None:
+    """
+    Liest den Index, wenn er zum aktuellen Dateistand passt (Größe, mtime,
+    Hash von text, Zeitstempel-Formate), sonst None.
+    """
+    p = _path_for_topic(topic)
+    idx_path = get_sidecar_path(topic)
+    try:
+        if not idx_path.exists() or not p.exists():
+            return None
+        st = p.stat()
+        data = idx_path.read_bytes()
+    except OSError as e:
+        logger.warning("Could not read sidecar index %s: %s", idx_path, e)
+        return None
+    if len(data) < _SIDECAR_HEADER.size:
+        return None
+    magic, version, _reserved, formats_key, size, mtime_ns, digest, line_count, count = (
+        _SIDECAR_HEADER.unpack_from(data)
+    )
+    if (
+        magic != _SIDECAR_MAGIC
+        or version != _SIDECAR_VERSION
+        or formats_key != _formats_key()
+        or size != st.st_size
+        or mtime_ns != st.st_mtime_ns
+        or len(data) != _SIDECAR_HEADER.size + count * (4 + 4 + 8 + 1)
+        or digest != content_digest(text)
+    ):
+        logger.debug("Sidecar index %s is stale", idx_path)
+        return None
+
+    pos = _SIDECAR_HEADER.size
+    starts = _from_le(_U32, data[pos : pos + 4 * count])
+    pos += 4 * count
+    keys = _from_le(_U32, data[pos : pos + 4 * count])
+    pos += 4 * count
+    seconds = _from_le("d", data[pos : pos + 8 * count])
+    pos += 8 * count
+    kinds = data[pos : pos + count]
+    times: list[tuple[datetime, bool] | None] = []
+    for kind, secs in zip(kinds, seconds):
+        if kind == _TIME_DATED:
+            times.append((_EPOCH + timedelta(seconds=secs), True))
+        elif kind == _TIME_ONLY:
+            times.append((_DAY_START + timedelta(seconds=secs), False))
+        else:
+            times.append(None)
+    return SidecarIndex(starts=starts.tolist(), keys=keys.tolist(), times=times, line_count=line_count)
+
+
+_TAGS_VERSION = 1
+
+
+def get_tags_path(topic: str | None = None) -> Path:
+    return _path_for_topic(topic).with_suffix(".tags.json")
+
+
+def get_journal_path(topic: str | None = None) -> Path:
+    return _path_for_topic(topic).with_suffix(".journal")
+
+
+def save_tag_index(text: str, postings: dict[str, list[int]], block_count: int, topic: str | None = None) -> None:
+    """Hashtag-Index (Tag -> Blöcke) zum Stand von text neben die Notizdatei schreiben."""
+    data = {
+        "version": _TAGS_VERSION,
+        "formats": _formats_key(),
+        "digest": content_digest(text).hex(),
+        "blocks": block_count,
+        "tags": postings,
+    }
+    path = get_tags_path(topic)
+    with _SIDECAR_LOCK:
+        try:
+            atomic_write_json(path, data)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error("Failed to save tag index %s: %s", path, e)
+
+
+def load_tag_index(text: str, block_count: int, topic: str | None = None) -> dict[str, list[int]] | None:
+    """Gespeicherte Postings, wenn sie zu text und block_count passen, sonst None."""
+    path = get_tags_path(topic)
+    try:
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read tag index %s: %s", path, e)
+        return None
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != _TAGS_VERSION
+        or data.get("formats") != _formats_key()
+        or data.get("blocks") != block_count
+        or data.get("digest") != content_digest(text).hex()
+        or not isinstance(data.get("tags"), dict)
+    ):
+        logger.debug("Tag index %s is stale", path)
+        return None
+    postings: dict[str, list[int]] = {}
+    for tag, blocks in data["tags"].items():
+        if isinstance(blocks, list):
+            postings[str(tag)] = [b for b in blocks if isinstance(b, int) and 0 <= b < block_count]
+    return postings
 
 
 @dataclass
@@ -176,7 +787,7 @@ def load_window_geometry() -> WindowGeometry:
 def save_window_geometry(geom: WindowGeometry) -> None:
     p = get_geometry_path()
     try:
-        atomic_write_json(p, geom.to_dict())
-        logger.debug("Saved geometry to %s: %s", p, geom)
+        if write_json_if_changed(p, geom.to_dict()):
+            logger.debug("Saved geometry to %s: %s", p, geom)
     except OSError as e:
         logger.error("Failed to save geometry to %s: %s", p, e)
@@ -0,0 +1,186 @@
+# File: mindpic/reminders.py
+# -*- coding: utf-8 -*-
+"""
+MindPic – Erinnerungen über "@due <Zeitstempel>" in Einträgen.
+
+- reminders_in: Marker in Zeilen finden (Zeitstempel in einem der konfigurierten Formate, mit Datum)
+- ReminderScheduler: min-Heap nach Fälligkeit; entfernte Erinnerungen bleiben
+  im Heap liegen und werden beim Herausnehmen übersprungen
+- ReminderIndex: Erinnerungen je Block eines Themas, hängt als Listener am
+  BlockIndex und meldet Änderungen an den Scheduler
+
+app.py stellt für die nächste Fälligkeit genau einen after-Job.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from . import settings
+from .colorize import BlockIndex, parse_timestamp, timestamp_has_date, timestamp_of
+
+_MARKER_RE = re.compile(rf"(?<!\S){re.escape(settings.REMINDER_MARKER)}\s+")
+
+# ab so vielen offenen Blöcken wird der ganze Text einmal gelesen statt blockweise
+_BULK_READ_BLOCKS = 64
+
+
+@dataclass(frozen=True)
+class Reminder:
+    due: datetime
+    topic: str
+    text: str  # Zeile mit dem Marker
+
+
+def reminders_in(lines: list[str], topic: str) -> list[Reminder]:
+    found = []
+    for line in lines:
+        if settings.REMINDER_MARKER not in line:
+            continue
+        for m in _MARKER_RE.finditer(line):
+            stamp = timestamp_of(line[m.end():])
+            if stamp is None or not timestamp_has_date(stamp):
+                continue
+            due = parse_timestamp(stamp)
+            if due is not None:
+                found.append(Reminder(due, topic, line.strip()))
+    return found
+
+
+class ReminderScheduler:
+    """Ausstehende Erinnerungen, die früheste oben."""
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[datetime, int, Reminder]] = []
+        self._live: dict[Reminder, int] = {}
+        self._count = 0
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, reminder: Reminder) -> None:
+        heapq.heappush(self._heap, (reminder.due, next(self._seq), reminder))
+        self._live[reminder] = self._live.get(reminder, 0) + 1
+        self._count += 1
+
+    def _take(self, reminder: Reminder) -> bool:
+        count = self._live.get(reminder, 0)
+        if not count:
+            return False
+        if count > 1:
+            self._live[reminder] = count - 1
+        else:
+            del self._live[reminder]
+        self._count -= 1
+        return True
+
+    def discard(self, reminder: Reminder) -> None:
+        self._take(reminder)
+        # der Heap-Eintrag bleibt liegen; zu viele tote Einträge -> neu aufbauen
+        if len(self._heap) > 64 and len(self._heap) > 2 * self._count:
+            self._heap = [item for item in self._heap if item[2] in self._live]
+            heapq.heapify(self._heap)
+
+    def next_due(self) -> datetime | None:
+        while self._heap and self._heap[0][2] not in self._live:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> list[Reminder]:
+        """Alle bis now fälligen Erinnerungen (früheste zuerst) herausnehmen."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _when, _seq, reminder = heapq.heappop(self._heap)
+            if self._take(reminder):
+                due.append(reminder)
+        return due
+
+
+class ReminderIndex:
+    """
+    Erinnerungen je Block eines Themas.
+
+    Geänderte Blöcke werden aus dem Scheduler genommen und als offen markiert;
+    flush(now) liest sie neu und plant, was noch in der Zukunft liegt.
+    """
+
+    def __init__(
+        self,
+        blocks: BlockIndex,
+        read_lines: Callable[[int, int], list[str]],
+        topic: str,
+        scheduler: ReminderScheduler,
+    ) -> None:
+        self._blocks = blocks
+        self._read_lines = read_lines
+        self._topic = topic
+        self._scheduler = scheduler
+        count = len(blocks.starts)
+        self._block_reminders: list[tuple[Reminder, ...]] = [()] * count
+        self._pending: set[int] = set(range(count))
+        blocks.listeners.append(self._on_blocks_changed)
+
+    def close(self) -> None:
+        if self._on_blocks_changed in self._blocks.listeners:
+            self._blocks.listeners.remove(self._on_blocks_changed)
+        for reminders in self._block_reminders:
+            for reminder in reminders:
+                self._scheduler.discard(reminder)
+        self._block_reminders = []
+        self._pending = set()
+
+    def _on_blocks_changed(self, first: int, removed: int, added: int) -> None:
+        end = first + removed
+        for reminders in self._block_reminders[first:end]:
+            for reminder in reminders:
+                self._scheduler.discard(reminder)
+        delta = added - removed
+        pending = {b for b in self._pending if not first <= b < end}
+        if delta:
+            pending = {b + delta if b >= end else b for b in pending}
+        pending.update(range(first, first + added))
+        self._pending = pending
+        self._block_reminders[first:end] = [()] * added
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._pending)
+
+    def flush(self, now: datetime) -> None:
+        """Offene Blöcke lesen; nur künftige Erinnerungen kommen in den Scheduler."""
+        if not self._pending:
+            return
+        starts = self._blocks.starts
+        line_count = self._blocks.line_count
+        if len(self._pending) > _BULK_READ_BLOCKS:
+            lines = self._read_lines(0, line_count)
+            per_block: dict[int, list[str]] = {}
+            for line_no, line in enumerate(lines):
+                if settings.REMINDER_MARKER in line:
+                    b = bisect_right(starts, line_no) - 1
+                    if b in self._pending:
+                        per_block.setdefault(b, []).append(line)
+        else:
+            per_block = {}
+            for b in self._pending:
+                end = starts[b + 1] if b + 1 < len(starts) else line_count
+                per_block[b] = self._read_lines(starts[b], end)
+        for b, block_lines in per_block.items():
+            reminders = tuple(r for r in reminders_in(block_lines, self._topic) if r.due > now)
+            for reminder in reminders:
+                self._scheduler.add(reminder)
+            self._block_reminders[b] = reminders
+        self._pending = set()
+
+    def block_of(self, reminder: Reminder) -> int | None:
+        for b, reminders in enumerate(self._block_reminders):
+            if reminder in reminders:
+                return b
+        return None
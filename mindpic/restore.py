@@ -0,0 +1,66 @@
+# File: mindpic/restore.py
+# -*- coding: utf-8 -*-
+"""
+MindPic – Backups auflisten und wiederherstellen (Kommandozeile).
+
+    python -m mindpic.restore                  alle Backups auflisten
+    python -m mindpic.restore THEMA            Backups eines Themas auflisten
+    python -m mindpic.restore BACKUP [ZIEL]    Backup nach ZIEL schreiben
+
+BACKUP ist ein Dateiname aus backups/ (oder ein Pfad). Ohne ZIEL landet es
+unter seinem Namen ohne ".manifest" im aktuellen Ordner. Soll eine Notiz
+direkt ersetzt werden, MindPic vorher schließen.
+"""
+
+from __future__ import annotations
+
+import glob
+import sys
+from pathlib import Path
+
+from .note_store import get_topic_path
+from .paths import get_backups_dir
+from .persistence import load_manifest, restore_backup
+
+_MANIFEST = ".manifest"
+
+
+def _list(topic: str | None) -> int:
+    pattern = f"{glob.escape(get_topic_path(topic).stem)}_*" if topic else "*"
+    for path in sorted(p for p in get_backups_dir().glob(pattern) if p.is_file()):
+        if path.name.endswith(_MANIFEST):
+            try:
+                size = load_manifest(path)["size"]
+            except (OSError, ValueError) as e:
+                print(f"{path.name}  (unlesbar: {e})")
+                continue
+        else:
+            size = path.stat().st_size
+        print(f"{path.name}  {size} Bytes")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) > 2 or args[:1] in (["-h"], ["--help"]):
+        print(__doc__)
+        return 2
+    backup = Path(args[0]) if args else None
+    if backup is not None and not backup.is_file():
+        backup = get_backups_dir() / args[0]
+    if backup is None or not backup.is_file():
+        return _list(args[0] if args else None)
+
+    name = backup.name[:-len(_MANIFEST)] if backup.name.endswith(_MANIFEST) else backup.name
+    target = Path(args[1]) if len(args) > 1 else Path.cwd() / name
+    try:
+        restore_backup(backup, target)
+    except (OSError, ValueError) as e:
+        print(f"Wiederherstellen fehlgeschlagen: {e}", file=sys.stderr)
+        return 1
+    print(f"{backup.name} -> {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -64,11 +64,64 @@ DEFAULT_NOTE_COLORS: list[str] = [
     "#1f2b2b",
 ]
 
+# Zeitstempel-Formate (strftime-Syntax), die einen neuen Eintrag beginnen.
+# Das erste Format wird beim Speichern eingefügt. Erlaubt: %d %m %y %Y %H %M %S
+DEFAULT_TIMESTAMP_FORMATS: list[str] = [
+    "%d-%m-%Y %H:%M",  # 19-12-2025 18:44
+    "%Y-%m-%d %H:%M",  # 2025-12-12 18:44
+    "%d.%m.%Y %H:%M",  # 12.12.2025 18:44
+    "%H:%M",  # 18:44
+]
+
+# Blockfarben: "cyclic" = reihum nach Position, "stable" = Farbe aus dem Zeitstempel
+# des Eintrags (Einfügen ändert höchstens die Farbe direkt folgender Einträge)
+DEFAULT_COLOR_MODE: str = "cyclic"
+
+# Farbregeln (Stichwort/Regex -> Stil), siehe colorize.RuleSet, z.B.
+# [{"match": "TODO", "background": "#5a1e1e"}, {"regex": "^!.*", "scope": "line", "bold": true}]
+DEFAULT_COLOR_RULES: list[dict] = []
+
+# Inline-Hervorhebung: Links (Strg+Klick öffnet im Browser), "# Überschriften", [ ] / [x]
+DEFAULT_INLINE_HIGHLIGHT: bool = True
+INLINE_URL_FG: str = "#6cb6ff"
+INLINE_TODO_FG: str = "#e5c07b"
+INLINE_DONE_FG: str = "#7f8c8d"
+INLINE_HEADING_SIZE_DELTA: int = 2
+
+# Einfärben großer Themen
+# "full": alle Blöcke taggen, "viewport": nur sichtbare Zeilen (+Rand), Rest beim Scrollen,
+# "auto": viewport ab COLORIZE_VIEWPORT_MIN_LINES Zeilen
+DEFAULT_COLORIZE_MODE: str = "auto"
+COLORIZE_VIEWPORT_MIN_LINES: int = 5000
+COLORIZE_VIEWPORT_MARGIN_LINES: int = 150
+# Einfärben läuft in Zeitscheiben (after_idle), damit Eingaben nie blockieren
+DEFAULT_RECOLOR_SLICE_MS: int = 8
+RECOLOR_SLICE_BLOCKS: int = 300
+
 # Autosave / Daten-Sicherheit
 AUTOSAVE_INTERVAL_MS: int = 1500  # Inhalt/State regelmäßig speichern
 BACKUP_DIR_NAME: str = "backups"
 NOTES_DIR_NAME: str = "notes"
-MAX_BACKUPS_PER_NOTE: int = 20
+# Backups: höchstens eins je Thema und Intervall (Strg+S/Beenden immer), gestaffelt aufbewahrt:
+# stündlich für einen Tag, täglich für einen Monat, danach wöchentlich
+BACKUP_MIN_INTERVAL_S: float = 600.0
+BACKUP_HOURLY_FOR_S: float = 24 * 3600
+BACKUP_DAILY_FOR_S: float = 31 * 24 * 3600
+MAX_BACKUPS_PER_NOTE: int = 120  # Obergrenze über alle Stufen (<= 0: nichts löschen)
+# Backups liegen als Manifest + Chunks (backups/chunks/) vor; gleiche Chunks nur einmal.
+# Schnitt an inhaltsabhängigen Zeilenenden, im Mittel alle BACKUP_CHUNK_AVG_BYTES
+BACKUP_CHUNK_MIN_BYTES: int = 8 * 1024
+BACKUP_CHUNK_AVG_BYTES: int = 32 * 1024
+BACKUP_CHUNK_MAX_BYTES: int = 128 * 1024  # Zeilen ohne Umbruch werden hier hart geteilt
+BACKUP_COMPRESSION: str = "zlib"  # "lzma" (kleiner, langsamer) oder "none"
+# Autosave hängt nur Änderungen an notes/<thema>.journal an; verdichtet wird in die .txt
+JOURNAL_COMPACT_BYTES: int = 256 * 1024  # spätestens ab dieser Journalgröße
+JOURNAL_IDLE_COMPACT_S: float = 30.0  # oder nach so viel Ruhe (außerdem bei Tabwechsel/Beenden)
+# fsync: "none" (nie), "explicit" (Strg+S, Speichern-Button, Beenden), "always" (auch Autosave/Tabwechsel)
+DURABILITY_MODES: tuple[str, ...] = ("none", "explicit", "always")
+DEFAULT_DURABILITY: str = "explicit"
+WRITE_FLUSH_TIMEOUT_S: float = 10.0  # beim Beenden höchstens so lange auf den Hintergrund-Writer warten
+WRITE_RESULT_POLL_MS: int = 50  # so oft holt die UI Ergebnisse des Writers ab, solange etwas aussteht
 
 # Themen/Tabs
 DEFAULT_ACTIVE_TOPIC: str = "Allgemein"
@@ -121,6 +174,40 @@ CONFIG_FILE_NAME: str = "config.json"
 CONTENT_FILE_NAME: str = "content.txt"
 GEOMETRY_FILE_NAME: str = "window_geometry.json"
 
+# =============================================================================
+# Filter / Gliederung / Zeitleiste / Erinnerungen / Statistik
+# =============================================================================
+
+# Filterleiste: Zeitraum-Vorgaben (Tage zurück inkl. heute; 0 = heute, -1 = dieses Jahr, None = alle)
+FILTER_RANGE_PRESETS: dict[str, int | None] = {
+    "Alle": None,
+    "Heute": 0,
+    "Letzte 7 Tage": 7,
+    "Letzte 30 Tage": 30,
+    "Dieses Jahr": -1,
+}
+FILTER_DEBOUNCE_MS: int = 250
+
+# Gliederung (Seitenleiste mit allen Einträgen des aktiven Themas)
+DEFAULT_OUTLINE_VISIBLE: bool = False
+OUTLINE_WIDTH_CHARS: int = 28
+OUTLINE_TITLE_CHARS: int = 80
+
+# Zeitleiste (Tab mit den Einträgen aller Themen in zeitlicher Reihenfolge)
+DEFAULT_TIMELINE_VISIBLE: bool = False
+TIMELINE_TAB_TITLE: str = "Zeitleiste"
+TIMELINE_PAGE_SIZE: int = 200
+
+# Erinnerungen: "@due 24-10-2026 09:00" in einem Eintrag (Zeitstempel in einem der Formate oben)
+REMINDER_MARKER: str = "@due"
+REMINDER_MAX_SLEEP_MS: int = 3_600_000  # spätestens stündlich neu stellen (Uhrumstellung, Standby)
+
+# Statistik (Fenster "Statistik…")
+STATS_DAYS: int = 14
+STATS_WEEKS: int = 8
+STATS_GAPS: int = 5
+STATS_LARGE_TOPIC_CHARS: int = 2_000_000  # ab hier wird das Laden spürbar
+
 # =============================================================================
 # DEFAULT CONFIG (wird in config.json gespeichert/geladen)
 # =============================================================================
@@ -137,6 +224,15 @@ DEFAULT_CONFIG: dict = {
     "font_family": DEFAULT_FONT_FAMILY,
     "font_size": DEFAULT_FONT_SIZE,
     "note_colors": DEFAULT_NOTE_COLORS,
+    "timestamp_formats": DEFAULT_TIMESTAMP_FORMATS,
+    "color_mode": DEFAULT_COLOR_MODE,
+    "color_rules": DEFAULT_COLOR_RULES,
+    "inline_highlight": DEFAULT_INLINE_HIGHLIGHT,
+    "outline_visible": DEFAULT_OUTLINE_VISIBLE,
+    "timeline_visible": DEFAULT_TIMELINE_VISIBLE,
+    "colorize_mode": DEFAULT_COLORIZE_MODE,
+    "recolor_slice_ms": DEFAULT_RECOLOR_SLICE_MS,
+    "durability": DEFAULT_DURABILITY,
     "auto_hide_on_focus": DEFAULT_AUTO_HIDE_ON_FOCUS_LOST,
     "topics": DEFAULT_TOPICS,
     "active_topic": DEFAULT_ACTIVE_TOPIC,
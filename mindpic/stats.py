@@ -0,0 +1,191 @@
+# File: mindpic/stats.py
+# -*- coding: utf-8 -*-
+"""
+MindPic – Statistik über Themen und Einträge.
+
+- TopicStats: Einträge/Zeilen/Zeichen eines Themas, über die Block-Listener
+  des BlockIndex nachgeführt (gelesen werden nur geänderte Blöcke)
+- entries_per_day / entries_per_week / longest_gaps: aus den DateIndex der Themen
+- stats_report: Text für das Statistikfenster
+"""
+
+from __future__ import annotations
+
+import heapq
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+from . import settings
+from .colorize import BlockIndex
+from .navigation import DateIndex
+
+
+_WEEKDAYS = ("Mo", "Di", "Mi", "Do", "Fr", "Sa", "So")
+
+
+def _fmt_int(n: int) -> str:
+    return f"{n:,}".replace(",", ".")
+
+
+class TopicStats:
+    """
+    Zeichen je Block eines Themas, laufend summiert.
+
+    Geänderte Blöcke (und der Vorspann vor dem ersten Eintrag) werden nur als
+    offen markiert und bei der nächsten Abfrage gelesen. Änderungen am Vorspann
+    sieht der Block-Listener nicht; dafür ruft die App nach jedem Edit note_edit() auf.
+    """
+
+    def __init__(self, blocks: BlockIndex, read_lines: Callable[[int, int], list[str]]) -> None:
+        self._blocks = blocks
+        self._read_lines = read_lines
+        self._sizes: list[int | None] = [None] * len(blocks.starts)
+        self._pending: set[int] = set(range(len(blocks.starts)))
+        self._known = 0  # Summe der bekannten Blockgrößen
+        self._preamble: int | None = None
+        blocks.listeners.append(self._on_blocks_changed)
+
+    def close(self) -> None:
+        if self._on_blocks_changed in self._blocks.listeners:
+            self._blocks.listeners.remove(self._on_blocks_changed)
+
+    def _on_blocks_changed(self, first: int, removed: int, added: int) -> None:
+        end = first + removed
+        if first == 0 and removed == len(self._sizes):
+            self._preamble = None  # neu eingelesen (reset/load)
+        for size in self._sizes[first:end]:
+            if size is not None:
+                self._known -= size
+        delta = added - removed
+        pending = {b for b in self._pending if not first <= b < end}
+        if delta:
+            pending = {b + delta if b >= end else b for b in pending}
+        pending.update(range(first, first + added))
+        self._pending = pending
+        self._sizes[first:end] = [None] * added
+
+    def note_edit(self, first: int) -> None:
+        """Nach BlockIndex.apply_edit: betrifft die Änderung ab Zeile first den Vorspann?"""
+        starts = self._blocks.starts
+        if not starts or first <= starts[0]:
+            self._preamble = None
+
+    @staticmethod
+    def _chars(lines: list[str]) -> int:
+        # je Zeile ihr Inhalt plus Zeilenende
+        return sum(len(line) for line in lines) + len(lines)
+
+    def _flush(self) -> None:
+        starts = self._blocks.starts
+        line_count = self._blocks.line_count
+        if self._preamble is None:
+            self._preamble = self._chars(self._read_lines(0, starts[0] if starts else line_count))
+        for b in self._pending:
+            end = starts[b + 1] if b + 1 < len(starts) else line_count
+            size = self._sizes[b] = self._chars(self._read_lines(starts[b], end))
+            self._known += size
+        self._pending = set()
+
+    @property
+    def entries(self) -> int:
+        return len(self._blocks.starts)
+
+    @property
+    def lines(self) -> int:
+        return self._blocks.line_count
+
+    def chars(self) -> int:
+        """Zeichen im Text (wie len(text); die letzte Zeile hat kein Zeilenende)."""
+        self._flush()
+        return max(0, (self._preamble or 0) + self._known - 1)
+
+
+def _day_start(d: date) -> datetime:
+    return datetime.combine(d, datetime.min.time())
+
+
+def entries_per_day(dates: list[DateIndex], days: int, today: date) -> list[tuple[date, int]]:
+    """Einträge je Tag für die letzten days Tage (bis einschließlich today)."""
+    result = []
+    for offset in range(days - 1, -1, -1):
+        day = today - timedelta(days=offset)
+        start = _day_start(day)
+        result.append((day, sum(d.count_between(start, start + timedelta(days=1)) for d in dates)))
+    return result
+
+
+def entries_per_week(dates: list[DateIndex], weeks: int, today: date) -> list[tuple[date, int]]:
+    """Einträge je Kalenderwoche (Montag) für die letzten weeks Wochen."""
+    monday = today - timedelta(days=today.weekday())
+    result = []
+    for offset in range(weeks - 1, -1, -1):
+        week = monday - timedelta(weeks=offset)
+        start = _day_start(week)
+        result.append((week, sum(d.count_between(start, start + timedelta(weeks=1)) for d in dates)))
+    return result
+
+
+def longest_gaps(dates: list[DateIndex], count: int) -> list[tuple[datetime, datetime]]:
+    """Die count größten Abstände zwischen aufeinanderfolgenden Einträgen aller Themen."""
+    gaps: list[tuple[timedelta, datetime, datetime]] = []
+    previous: datetime | None = None
+    for when, _b in heapq.merge(*(d.entries() for d in dates), key=lambda pair: pair[0]):
+        if previous is not None and when > previous:
+            gap = (when - previous, previous, when)
+            if len(gaps) < count:
+                heapq.heappush(gaps, gap)
+            elif gap > gaps[0]:
+                heapq.heapreplace(gaps, gap)
+        previous = when
+    return [(start, end) for _gap, start, end in sorted(gaps, reverse=True)]
+
+
+def size_hints(stats: TopicStats) -> list[str]:
+    """Warum ein Thema Laden/Einfärben bremst (leer, wenn unauffällig)."""
+    hints = []
+    if stats.lines >= settings.COLORIZE_VIEWPORT_MIN_LINES:
+        hints.append("Einfärben nur sichtbar")
+    if stats.chars() >= settings.STATS_LARGE_TOPIC_CHARS:
+        hints.append("Laden langsam")
+    return hints
+
+
+def stats_report(topics: dict[str, tuple[TopicStats, DateIndex]], today: date | None = None) -> str:
+    """Text für das Statistikfenster."""
+    today = today or date.today()
+    dates = [d for _s, d in topics.values()]
+    out = []
+
+    out.append("Themen (größte zuerst)")
+    by_size = sorted(topics.items(), key=lambda item: item[1][0].chars(), reverse=True)
+    for topic, (stats, _d) in by_size:
+        hints = size_hints(stats)
+        line = (
+            f"  {topic:<20} {_fmt_int(stats.entries):>7} Einträge "
+            f"{_fmt_int(stats.lines):>9} Zeilen {_fmt_int(stats.chars()):>11} Zeichen"
+        )
+        out.append(line + (f"  ⚠ {', '.join(hints)}" if hints else ""))
+    total_entries = sum(s.entries for s, _d in topics.values())
+    total_chars = sum(s.chars() for s, _d in topics.values())
+    out.append(f"  {'Gesamt':<20} {_fmt_int(total_entries):>7} Einträge {'':>16} {_fmt_int(total_chars):>11} Zeichen")
+
+    out.append("")
+    out.append(f"Einträge pro Tag (letzte {settings.STATS_DAYS} Tage)")
+    for day, n in entries_per_day(dates, settings.STATS_DAYS, today):
+        out.append(f"  {_WEEKDAYS[day.weekday()]} {day:%d.%m.}  {n:>4}  {'█' * min(n, 40)}")
+
+    out.append("")
+    out.append(f"Einträge pro Woche (letzte {settings.STATS_WEEKS} Wochen)")
+    for week, n in entries_per_week(dates, settings.STATS_WEEKS, today):
+        out.append(f"  KW {week.isocalendar()[1]:>2} ab {week:%d.%m.%Y}  {n:>4}  {'█' * min(n, 40)}")
+
+    out.append("")
+    out.append("Längste Lücken zwischen Einträgen")
+    gaps = longest_gaps(dates, settings.STATS_GAPS)
+    if not gaps:
+        out.append("  –")
+    for start, end in gaps:
+        span = end - start
+        hours = span.seconds // 3600
+        out.append(f"  {span.days:>4} Tage {hours:>2} Std.  {start:%d.%m.%Y %H:%M} → {end:%d.%m.%Y %H:%M}")
+    return "\n".join(out)
@@ -0,0 +1,151 @@
+# File: mindpic/tagging.py
+# -*- coding: utf-8 -*-
+"""
+MindPic – Tag-Anwendung mit Differenzbildung.
+
+- merkt sich je Text-Widget, welche Zeilenbereiche zuletzt mit welchem Tag belegt wurden
+- berechnet pro Lauf nur die nötigen Hinzufügungen/Entfernungen
+- sendet sie gebündelt: ein "tag add"/"tag remove" pro Tag mit vielen Indexpaaren
+"""
+
+from __future__ import annotations
+
+import logging
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Iterable
+
+import tkinter as tk
+
+from .colorize import LineRanges
+
+logger = logging.getLogger(__name__)
+
+
+def _subtract(a: list[tuple[int, int]], b: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """a ohne b; beide sortiert und disjunkt."""
+    result: list[tuple[int, int]] = []
+    j = 0
+    for start, end in a:
+        while j < len(b) and b[j][1] <= start:
+            j += 1
+        k = j
+        while k < len(b) and b[k][0] < end:
+            if b[k][0] > start:
+                result.append((start, b[k][0]))
+            start = max(start, b[k][1])
+            k += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def _merge(spans: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    result: list[tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if end <= start:
+            continue
+        if result and start <= result[-1][1]:
+            result[-1] = (result[-1][0], max(result[-1][1], end))
+        else:
+            result.append((start, end))
+    return result
+
+
+def tk_line_pairs(spans: list[tuple[int, int]]) -> list[str]:
+    """Zeilenbereiche [start, end) (0-basiert) als Tk-Indexpaare für tag add/remove."""
+    # Tk lines are 1-based, columns 0-based.
+    pairs: list[str] = []
+    for start, end in spans:
+        pairs.append(f"{start + 1}.0")
+        pairs.append(f"{end + 1}.0")
+    return pairs
+
+
+class TagApplier:
+    """
+    Zuletzt angewendete zeilenweise Tags eines Text-Widgets.
+
+    Tk verschiebt Tags bei Edits selbst; shift() zieht den gemerkten Zustand
+    genauso nach. Die editierten Zeilen selbst gelten danach als "unbekannt"
+    (eingefügter Text erbt Tags nur, wenn beide Nachbarn sie tragen) und werden
+    beim nächsten apply() vollständig neu gesetzt.
+    """
+
+    def __init__(self) -> None:
+        self._applied: dict[str, LineRanges] = {}
+        self._unknown = LineRanges()
+
+    def shift(self, first: int, removed: int, added: int) -> None:
+        for ranges in self._applied.values():
+            ranges.shift(first, removed, added)
+            ranges.take(first, first + added + 1)
+        self._unknown.shift(first, removed, added)
+        self._unknown.add(first, first + added + 1)
+
+    def invalidate(self, start: int, end: int) -> None:
+        """Zustand in [start, end) vergessen, z.B. wenn Tags außerhalb gesetzt wurden."""
+        for ranges in self._applied.values():
+            ranges.take(start, end)
+        self._unknown.add(start, end)
+
+    def diff(
+        self,
+        windows: list[tuple[int, int]],
+        spans: Iterable[tuple[str, int, int]],
+        tags: Iterable[str],
+    ) -> tuple[dict[str, list[tuple[int, int]]], dict[str, list[tuple[int, int]]]]:
+        """
+        Vergleicht die gewünschten (tag, start, end)-Bereiche innerhalb der Fenster
+        mit dem gemerkten Zustand und übernimmt sie als neuen Zustand.
+
+        Gibt (removes, adds) je Tag zurück.
+        """
+        windows = sorted(windows)
+        window_starts = [lo for lo, _hi in windows]
+        desired: dict[tuple[int, str], list[tuple[int, int]]] = defaultdict(list)
+        for tag, start, end in spans:
+            w = max(0, bisect_right(window_starts, start) - 1)
+            desired[(w, tag)].append((start, end))
+        all_tags = set(tags) | {tag for _w, tag in desired} | set(self._applied)
+
+        removes: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        adds: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for w, (lo, hi) in enumerate(windows):
+            unknown = self._unknown.intersect(lo, hi)
+            for tag in all_tags:
+                ranges = self._applied.setdefault(tag, LineRanges())
+                want = _merge((max(a, lo), min(b, hi)) for a, b in desired.get((w, tag), ()))
+                have = ranges.intersect(lo, hi)
+                removes[tag] += _subtract(_merge(have + unknown), want)
+                adds[tag] += _subtract(want, _subtract(have, unknown))
+                ranges.replace(lo, hi, want)
+            self._unknown.take(lo, hi)
+        return (
+            {t: r for t, r in removes.items() if r},
+            {t: a for t, a in adds.items() if a},
+        )
+
+    def apply(
+        self,
+        text: tk.Text,
+        windows: list[tuple[int, int]],
+        spans: Iterable[tuple[str, int, int]],
+        tags: Iterable[str],
+    ) -> int:
+        """Wendet diff() auf das Widget an. Gibt die Anzahl der Tk-Aufrufe zurück."""
+        removes, adds = self.diff(windows, spans, tags)
+        calls = 0
+        for tag, ranges in removes.items():
+            try:
+                text.tk.call(str(text), "tag", "remove", tag, *tk_line_pairs(ranges))
+                calls += 1
+            except tk.TclError as e:
+                logger.debug("tag remove %s failed: %s", tag, e)
+        for tag, ranges in adds.items():
+            try:
+                text.tag_add(tag, *tk_line_pairs(ranges))
+                calls += 1
+            except tk.TclError as e:
+                logger.debug("tag add %s failed: %s", tag, e)
+        return calls
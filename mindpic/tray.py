@@ -88,6 +88,16 @@ class TrayController:
             pass
         self._icon = None
 
+    def notify(self, message: str, title: str = "MindPic") -> bool:
+        """Benachrichtigung am Tray-Icon (nicht jedes Backend kann das)."""
+        try:
+            if self._icon and getattr(self._icon, "HAS_NOTIFICATION", True):
+                self._icon.notify(message, title)
+                return True
+        except Exception:
+            pass
+        return False
+
     # -------------------------------------------------------------------------
 
     def _load_image_fallback(self):
@@ -14,6 +14,7 @@ App-Logik (Speichern, Tray, Hotkeys, Persistenz) kommt in app.py.
 
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 from typing import Callable, Optional
 
@@ -24,6 +25,8 @@ import tkinter.font as tkfont
 from .paths import get_app_icon_path
 from . import settings
 
+logger = logging.getLogger(__name__)
+
 # =============================================================================
 # Module-level cache
 # =============================================================================
@@ -65,6 +68,15 @@ class UIRefs:
     autohide_var: tk.BooleanVar | None = None
     borderless_var: tk.BooleanVar | None = None
     resize_grip: tk.Widget | None = None
+    busy_label: ttk.Label | None = None
+    count_label: ttk.Label | None = None
+    outline: VirtualList | None = None
+    timeline: VirtualList | None = None
+    filter_bar: FilterBar | None = None
+    tag_picker: TagPicker | None = None
+    stats_window: StatsWindow | None = None
+    outline_var: tk.BooleanVar | None = None
+    timeline_var: tk.BooleanVar | None = None
 
     # keep references alive
     _app_icon_image: tk.PhotoImage | None = None
@@ -179,6 +191,10 @@ def create_widgets(
     status_label = ttk.Label(button_frame, text="Bereit", style="Toolbar.TLabel")
     status_label.pack(side="left")
 
+    # Fortschritt länger laufender Hintergrundarbeit (z.B. Einfärben großer Themen)
+    busy_label = ttk.Label(button_frame, text="", style="Toolbar.TLabel")
+    busy_label.pack(side="left", padx=(8, 0))
+
     save_button = ttk.Button(
         button_frame,
         text="Speichern",
@@ -195,6 +211,10 @@ def create_widgets(
     )
     timestamp_button.pack(side="right", padx=(0, 6))
 
+    # Einträge/Zeichen des aktiven Themas
+    count_label = ttk.Label(button_frame, text="", style="Toolbar.TLabel")
+    count_label.pack(side="right", padx=(0, 10))
+
     # Resize-Grip (wird nur im Borderless-Mode eingeblendet)
     resize_grip = tk.Label(
         root,
@@ -220,6 +240,8 @@ def create_widgets(
         texts=texts,
         scrollbars=scrollbars,
         resize_grip=resize_grip,
+        busy_label=busy_label,
+        count_label=count_label,
     )
     return ui
 
@@ -247,6 +269,365 @@ def add_topic_tab(notebook: ttk.Notebook, topic: str, config: dict) -> tuple[tk.
     return text, scrollbar
 
 
+def add_timeline_tab(
+    notebook: ttk.Notebook,
+    config: dict,
+    row_text: Callable[[int], str],
+    on_select: Callable[[int], None],
+) -> VirtualList:
+    """Schreibgeschützter Tab "Zeitleiste" (immer hinter den Themen-Tabs)."""
+    timeline = VirtualList(notebook, config, row_text=row_text, on_select=on_select, width=1)
+    notebook.add(timeline.frame, text=settings.TIMELINE_TAB_TITLE)
+    return timeline
+
+
+class VirtualList:
+    """
+    Virtualisierte Liste: die Listbox enthält nur die gerade sichtbaren Zeilen.
+
+    row_text(i) liefert den Text von Zeile i (0..count-1), on_select(i) wird
+    beim Klick aufgerufen. Nach Änderungen set_count()/refresh() aufrufen.
+    """
+
+    def __init__(
+        self,
+        parent: tk.Widget,
+        config: dict,
+        row_text: Callable[[int], str],
+        on_select: Callable[[int], None],
+        width: int = settings.OUTLINE_WIDTH_CHARS,
+    ) -> None:
+        self.frame = ttk.Frame(parent, style="TFrame")
+        self.listbox = tk.Listbox(
+            self.frame,
+            width=width,
+            activestyle="none",
+            exportselection=False,
+            bd=0,
+            highlightthickness=0,
+        )
+        self.scrollbar = ttk.Scrollbar(
+            self.frame,
+            orient="vertical",
+            command=self._on_scrollbar,
+            style="Custom.Vertical.TScrollbar",
+        )
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self._row_text = row_text
+        self._on_select = on_select
+        self._count = 0
+        self._top = 0
+        self._selected: int | None = None
+        self.apply_colors(config)
+
+        self.listbox.bind("<Configure>", lambda _e: self.refresh())
+        self.listbox.bind("<ButtonRelease-1>", self._on_click)
+        self.listbox.bind("<MouseWheel>", lambda e: self._scroll(-1 if e.delta > 0 else 1, "units"))
+        self.listbox.bind("<Button-4>", lambda _e: self._scroll(-1, "units"))
+        self.listbox.bind("<Button-5>", lambda _e: self._scroll(1, "units"))
+
+    def apply_colors(self, config: dict) -> None:
+        fg = str(config.get("text_fg", "#ffffff"))
+        bg = str(config.get("text_bg", "#111111"))
+        fam = str(config.get("font_family", "Segoe UI"))
+        size = int(config.get("font_size", 10))
+        self.listbox.configure(fg=fg, bg=bg, selectforeground=bg, selectbackground=fg, font=(fam, max(6, size - 1)))
+
+    def _rows(self) -> int:
+        try:
+            line = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1
+            return max(1, self.listbox.winfo_height() // max(1, line))
+        except tk.TclError:
+            return 1
+
+    def set_count(self, count: int) -> None:
+        self._count = max(0, count)
+        if self._selected is not None and self._selected >= self._count:
+            self._selected = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        rows = self._rows()
+        self._top = max(0, min(self._top, self._count - rows))
+        end = min(self._count, self._top + rows)
+        self.listbox.delete(0, "end")
+        if end > self._top:
+            self.listbox.insert("end", *(self._row_text(i) for i in range(self._top, end)))
+        if self._selected is not None and self._top <= self._selected < end:
+            self.listbox.selection_set(self._selected - self._top)
+        if self._count:
+            self.scrollbar.set(self._top / self._count, end / self._count)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def select(self, index: int | None) -> None:
+        """Markiert Zeile index und scrollt sie ins Bild."""
+        self._selected = index
+        if index is not None:
+            rows = self._rows()
+            if index < self._top or index >= self._top + rows:
+                self._top = max(0, index - rows // 2)
+        self.refresh()
+
+    def _scroll(self, amount: int, what: str) -> str:
+        step = self._rows() if what.startswith("page") else 3
+        self._top = max(0, self._top + amount * step)
+        self.refresh()
+        return "break"
+
+    def _on_scrollbar(self, *args) -> None:
+        if args and args[0] == "moveto":
+            self._top = int(float(args[1]) * self._count)
+            self.refresh()
+        elif len(args) >= 3 and args[0] == "scroll":
+            self._scroll(int(args[1]), str(args[2]))
+
+    def _on_click(self, event: tk.Event) -> None:
+        if not self._count:
+            return
+        row = self.listbox.nearest(int(getattr(event, "y", 0)))
+        index = self._top + row
+        if index < self._count:
+            self._selected = index
+            self._on_select(index)
+
+
+class TagPicker:
+    """
+    Fenster "Tags": Tag wählen, Treffer im aktuellen Thema oder in allen Themen.
+
+    list_tags(alle_themen) liefert Tag -> Anzahl, on_tag(tag, alle_themen) wählt
+    einen Tag aus und gibt die Zahl der Treffer zurück; die Trefferliste liest
+    ihre Zeilen über result_text(i), Klick ruft on_result(i).
+    """
+
+    SCOPES = ("Dieses Thema", "Alle Themen")
+
+    def __init__(
+        self,
+        root: tk.Tk,
+        config: dict,
+        list_tags: Callable[[bool], dict[str, int]],
+        on_tag: Callable[[str, bool], int],
+        result_text: Callable[[int], str],
+        on_result: Callable[[int], None],
+    ) -> None:
+        self._list_tags = list_tags
+        self._on_tag = on_tag
+        self._tags: list[str] = []
+        self._picked: str | None = None
+        self.window = tk.Toplevel(root)
+        self.window.title("Tags")
+        self.window.transient(root)
+        self.window.geometry("420x360")
+
+        top = ttk.Frame(self.window, style="Toolbar.TFrame")
+        top.pack(side="top", fill="x", padx=6, pady=6)
+        self.search_var = tk.StringVar(value="")
+        self.entry = ttk.Entry(top, textvariable=self.search_var, width=20)
+        self.entry.pack(side="left", fill="x", expand=True)
+        self.scope_var = tk.StringVar(value=self.SCOPES[0])
+        scope = ttk.Combobox(top, textvariable=self.scope_var, values=self.SCOPES, width=14, state="readonly")
+        scope.pack(side="left", padx=(6, 0))
+
+        self.listbox = tk.Listbox(self.window, height=8, activestyle="none", exportselection=False, bd=0)
+        self.listbox.pack(side="top", fill="x", padx=6)
+        self.results = VirtualList(self.window, config, row_text=result_text, on_select=on_result, width=1)
+        self.results.frame.pack(side="top", fill="both", expand=True, padx=6, pady=6)
+        self.apply_colors(config)
+
+        self.search_var.trace_add("write", lambda *_a: self.reload())
+        self.scope_var.trace_add("write", lambda *_a: (self.reload(), self._pick()))
+        self.listbox.bind("<<ListboxSelect>>", lambda _e: self._pick())
+        self.entry.bind("<Return>", lambda _e: self._pick_first())
+        self.window.bind("<Escape>", lambda _e: self.close())
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.reload()
+        self.entry.focus_set()
+
+    def apply_colors(self, config: dict) -> None:
+        fg = str(config.get("text_fg", "#ffffff"))
+        bg = str(config.get("text_bg", "#111111"))
+        self.window.configure(bg=bg)
+        self.listbox.configure(fg=fg, bg=bg, selectforeground=bg, selectbackground=fg)
+        self.results.apply_colors(config)
+
+    def all_topics(self) -> bool:
+        return self.scope_var.get() == self.SCOPES[1]
+
+    def exists(self) -> bool:
+        try:
+            return bool(self.window.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def reload(self) -> None:
+        """Tagliste neu füllen (Suchtext als Teilstring, häufigste zuerst)."""
+        needle = self.search_var.get().strip().lstrip("#").casefold()
+        counts = self._list_tags(self.all_topics())
+        self._tags = sorted((t for t in counts if needle in t), key=lambda t: (-counts[t], t))
+        self.listbox.delete(0, "end")
+        if self._tags:
+            self.listbox.insert("end", *(f"#{t}  ({counts[t]})" for t in self._tags))
+        if self._picked in self._tags:
+            self.listbox.selection_set(self._tags.index(self._picked))
+
+    def _pick(self) -> None:
+        selection = self.listbox.curselection()
+        if not selection or selection[0] >= len(self._tags):
+            self.results.set_count(0)
+            return
+        self._picked = self._tags[selection[0]]
+        self.results.set_count(self._on_tag(self._picked, self.all_topics()))
+
+    def _pick_first(self) -> str:
+        if self._tags:
+            self.listbox.selection_clear(0, "end")
+            self.listbox.selection_set(0)
+            self._pick()
+        return "break"
+
+    def close(self) -> None:
+        try:
+            self.window.destroy()
+        except tk.TclError:
+            pass
+
+
+class StatsWindow:
+    """Fenster "Statistik": schreibgeschützter Text, neu berechnet über report()."""
+
+    def __init__(self, root: tk.Tk, config: dict, report: Callable[[], str]) -> None:
+        self._report = report
+        self.window = tk.Toplevel(root)
+        self.window.title("Statistik")
+        self.window.transient(root)
+        self.window.geometry("620x520")
+        bar = ttk.Frame(self.window, style="Toolbar.TFrame")
+        bar.pack(side="bottom", fill="x", padx=6, pady=6)
+        ttk.Button(bar, text="Aktualisieren", command=self.refresh, style="Toolbar.TButton").pack(side="right")
+        self.text = tk.Text(self.window, wrap="none", bd=0, highlightthickness=0, padx=8, pady=6)
+        self.text.pack(side="top", fill="both", expand=True)
+        self.apply_colors(config)
+        self.window.bind("<Escape>", lambda _e: self.close())
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+        self.refresh()
+
+    def apply_colors(self, config: dict) -> None:
+        fg = str(config.get("text_fg", "#ffffff"))
+        bg = str(config.get("text_bg", "#111111"))
+        size = int(config.get("font_size", 10))
+        self.window.configure(bg=bg)
+        # Festbreitenschrift, damit die Spalten stehen
+        self.text.configure(fg=fg, bg=bg, insertbackground=fg, font=("Consolas", max(6, size - 2)))
+
+    def exists(self) -> bool:
+        try:
+            return bool(self.window.winfo_exists())
+        except tk.TclError:
+            return False
+
+    def refresh(self) -> None:
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", self._report())
+        self.text.configure(state="disabled")
+
+    def close(self) -> None:
+        try:
+            self.window.destroy()
+        except tk.TclError:
+            pass
+
+
+@dataclass
+class FilterBar:
+    frame: ttk.Frame
+    entry: ttk.Entry
+    text_var: tk.StringVar
+    range_var: tk.StringVar
+
+
+def create_filter_bar(
+    parent: tk.Widget,
+    on_change: Callable[[], None],
+    on_close: Callable[[], None],
+) -> FilterBar:
+    """Leiste "nur Einträge mit Text X / aus Zeitraum Y" (wird von app.py ein-/ausgeblendet)."""
+    frame = ttk.Frame(parent, style="Toolbar.TFrame")
+    ttk.Label(frame, text="Filter:", style="Toolbar.TLabel").pack(side="left")
+    text_var = tk.StringVar(value="")
+    entry = ttk.Entry(frame, textvariable=text_var, width=20)
+    entry.pack(side="left", fill="x", expand=True, padx=(4, 6))
+    presets = list(settings.FILTER_RANGE_PRESETS)
+    range_var = tk.StringVar(value=presets[0])
+    # editierbar: auch freie Eingaben wie "03.2025" oder "01.03.2025 - 31.03.2025"
+    combo = ttk.Combobox(frame, textvariable=range_var, values=presets, width=18)
+    combo.pack(side="left")
+    ttk.Button(frame, text="✕", width=2, command=on_close, style="Toolbar.TButton").pack(side="left", padx=(6, 0))
+
+    text_var.trace_add("write", lambda *_a: on_change())
+    range_var.trace_add("write", lambda *_a: on_change())
+    for widget in (entry, combo):
+        widget.bind("<Escape>", lambda _e: (on_close(), "break")[1])
+    return FilterBar(frame=frame, entry=entry, text_var=text_var, range_var=range_var)
+
+
+_EDIT_OPS = ("insert", "delete", "replace")
+
+
+def install_edit_hook(text: tk.Text, on_edit: Callable[[int, int, int], None]) -> None:
+    """
+    Meldet jede Textänderung als (erste Zeile, entfernte Zeilen, eingefügte Zeilen).
+
+    Zeilen sind 0-basiert: die alten Zeilen [first, first+removed] wurden durch
+    [first, first+added] ersetzt. Wie bei idlelib.redirector wird das Tcl-Kommando
+    des Widgets umbenannt und durch einen Proxy ersetzt; so laufen auch Einfügen,
+    Undo/Redo und Tk-interne Bindings durch den Hook, reine Cursor-Tasten nicht.
+    """
+    widget = str(text)
+    orig = f"{widget}_orig"
+    tk_ = text.tk
+    tk_.call("rename", widget, orig)
+
+    def _line(index) -> int:
+        return int(str(tk_.call(orig, "index", index)).split(".")[0]) - 1
+
+    def _span(op: str, args: tuple) -> tuple[int, int]:
+        if op == "insert":
+            idx = args[0]
+            if tk_.getboolean(tk_.call(orig, "compare", idx, ">=", "end")):
+                idx = "end-1c"
+            line = _line(idx)
+            return line, line
+        indices = list(args[:2] if op == "replace" else args)
+        if len(indices) == 1:
+            indices.append(f"{indices[0]}+1c")
+        lines = [_line(i) for i in indices]
+        return min(lines), max(lines)
+
+    def _proxy(*args):
+        op = args[0] if args else ""
+        if op not in _EDIT_OPS or len(args) < 2:
+            return tk_.call((orig,) + args)
+        try:
+            first, last = _span(op, args[1:])
+            lines_before = _line("end")
+        except tk.TclError:
+            return tk_.call((orig,) + args)
+        result = tk_.call((orig,) + args)
+        removed = last - first
+        added = removed + (_line("end") - lines_before)
+        try:
+            on_edit(first, removed, max(0, added))
+        except Exception as e:
+            logger.error("Edit hook failed: %s", e)
+        return result
+
+    tk_.createcommand(widget, _proxy)
+
+
 def apply_colors(ui: UIRefs, config: dict) -> None:
     """
     Farben aus Config auf Textfeld + Tags anwenden.
@@ -264,12 +645,71 @@ def apply_colors(ui: UIRefs, config: dict) -> None:
         )
         for i, color in enumerate(note_colors):
             text.tag_configure(f"note{i}", background=str(color))
+        _configure_rule_tags(text, config)
+        _configure_inline_tags(text, config)
+        # Falten/Filtern blenden Zeilen über elide aus; der Inhalt bleibt vollständig
+        text.tag_configure("fold", elide=True)
+        text.tag_configure("entry_filter", elide=True)
+    for panel in (ui.outline, ui.timeline):
+        if panel is not None:
+            panel.apply_colors(config)
+    for window in (ui.tag_picker, ui.stats_window):
+        if window is not None and window.exists():
+            window.apply_colors(config)
+
 
 def apply_font(ui: UIRefs, config: dict) -> None:
     fam = str(config.get("font_family", "Segoe UI"))
     size = int(config.get("font_size", 10))
     for text in ui.texts.values():
         text.configure(font=(fam, size))
+        _configure_rule_tags(text, config)
+        _configure_inline_tags(text, config)
+    for panel in (ui.outline, ui.timeline):
+        if panel is not None:
+            panel.apply_colors(config)
+
+
+def _configure_rule_tags(text: tk.Text, config: dict) -> None:
+    """
+    Tags rule<i> für config["color_rules"] konfigurieren (über den note-Tags).
+    """
+    fam = str(config.get("font_family", "Segoe UI"))
+    size = int(config.get("font_size", 10))
+    for i, rule in enumerate(config.get("color_rules") or []):
+        if not isinstance(rule, dict):
+            continue
+        tag = f"rule{i}"
+        opts: dict = {}
+        if rule.get("background"):
+            opts["background"] = str(rule["background"])
+        if rule.get("foreground"):
+            opts["foreground"] = str(rule["foreground"])
+        if rule.get("underline"):
+            opts["underline"] = True
+        style = " ".join(s for s in ("bold", "italic") if rule.get(s))
+        if style:
+            opts["font"] = (fam, size, style)
+        try:
+            text.tag_configure(tag, **opts)
+            text.tag_raise(tag)
+        except tk.TclError as e:
+            logger.warning("Invalid style for color rule %s: %s", i, e)
+
+
+def _configure_inline_tags(text: tk.Text, config: dict) -> None:
+    """Tags für Links, Überschriften und Checkboxen (liegen über allen anderen)."""
+    fam = str(config.get("font_family", "Segoe UI"))
+    size = int(config.get("font_size", 10))
+    text.tag_configure("inline_url", foreground=settings.INLINE_URL_FG, underline=True)
+    text.tag_configure(
+        "inline_heading",
+        font=(fam, size + settings.INLINE_HEADING_SIZE_DELTA, "bold"),
+    )
+    text.tag_configure("inline_todo", foreground=settings.INLINE_TODO_FG)
+    text.tag_configure("inline_done", foreground=settings.INLINE_DONE_FG)
+    for tag in ("inline_heading", "inline_todo", "inline_done", "inline_url"):
+        text.tag_raise(tag)
 
 # =============================================================================
 # Borderless drag helper
@@ -384,6 +824,8 @@ class MenuCallbacks:
     toggle_topmost: Callable[[], None]
     toggle_borderless: Callable[[bool], None]  # bekommt neuen State
     toggle_autohide: Callable[[bool], None]    # bekommt neuen State
+    toggle_outline: Callable[[bool], None]     # bekommt neuen State
+    toggle_timeline: Callable[[bool], None]    # bekommt neuen State
     set_alpha: Callable[[float], None]
 
     change_text_color: Callable[[str], None]       # new hex color
@@ -395,6 +837,14 @@ class MenuCallbacks:
     open_manual: Callable[[], None]
     add_topic: Callable[[], None]
     find_text: Callable[[], None]
+    goto_date: Callable[[], None]
+    filter_dates: Callable[[], None]
+    show_filter_bar: Callable[[], None]
+    tag_picker: Callable[[], None]
+    show_stats: Callable[[], None]
+    toggle_fold: Callable[[], None]
+    fold_all: Callable[[], None]
+    unfold_all: Callable[[], None]
     open_data_dir: Callable[[], None]
     open_log: Callable[[], None]
     quit_app: Callable[[], None]
@@ -455,6 +905,8 @@ def create_context_menu(
     ui.alpha_var = tk.DoubleVar(value=float(config.get("window_alpha", 1.0)))
     ui.autohide_var = tk.BooleanVar(value=bool(config.get("auto_hide_on_focus", False)))
     ui.borderless_var = tk.BooleanVar(value=bool(config.get("borderless", False)))
+    ui.outline_var = tk.BooleanVar(value=bool(config.get("outline_visible", False)))
+    ui.timeline_var = tk.BooleanVar(value=bool(config.get("timeline_visible", False)))
 
     # Farben
     colors_menu = tk.Menu(menu, tearoff=0)
@@ -524,6 +976,16 @@ def create_context_menu(
         variable=ui.borderless_var,
         command=lambda: callbacks.toggle_borderless(bool(ui.borderless_var.get())),
     )
+    menu.add_checkbutton(
+        label="Gliederung",
+        variable=ui.outline_var,
+        command=lambda: callbacks.toggle_outline(bool(ui.outline_var.get())),
+    )
+    menu.add_checkbutton(
+        label="Zeitleiste",
+        variable=ui.timeline_var,
+        command=lambda: callbacks.toggle_timeline(bool(ui.timeline_var.get())),
+    )
 
     menu.add_command(label="Immer im Vordergrund umschalten", command=callbacks.toggle_topmost)
     menu.add_command(label="Fenster ein-/ausblenden", command=callbacks.toggle_visibility)
@@ -531,6 +993,16 @@ def create_context_menu(
     # Manual / data / topic helpers
     menu.add_command(label="Neues Thema…", command=callbacks.add_topic)
     menu.add_command(label="Suchen…", command=callbacks.find_text)
+    menu.add_command(label="Gehe zu Datum…", command=callbacks.goto_date)
+    menu.add_command(label="Zeitraum filtern…", command=callbacks.filter_dates)
+    menu.add_command(label="Filterleiste", command=callbacks.show_filter_bar)
+    menu.add_command(label="Tags…", command=callbacks.tag_picker)
+    menu.add_command(label="Statistik…", command=callbacks.show_stats)
+    fold_menu = tk.Menu(menu, tearoff=0)
+    fold_menu.add_command(label="Eintrag ein-/ausklappen", command=callbacks.toggle_fold)
+    fold_menu.add_command(label="Alle einklappen", command=callbacks.fold_all)
+    fold_menu.add_command(label="Alle ausklappen", command=callbacks.unfold_all)
+    menu.add_cascade(label="Falten", menu=fold_menu)
     menu.add_command(label="Datenordner öffnen", command=callbacks.open_data_dir)
     menu.add_command(label="Log öffnen", command=callbacks.open_log)
     menu.add_command(label="Handbuch öffnen", command=callbacks.open_manual)
@@ -0,0 +1,131 @@
+# File: mindpic/writer.py
+# -*- coding: utf-8 -*-
+"""
+MindPic – Schreiben im Hintergrund (write-behind).
+
+- PersistenceWorker: ein Thread, der Schreibaufträge nacheinander ausführt
+- Aufträge haben einen Schlüssel (z.B. ("content", Thema)); kommt ein neuer
+  Auftrag, bevor der alte lief, ersetzt er ihn (nur der neueste Stand zählt)
+- alles, was beim Aufwachen ansteht, ist ein Zyklus: Aufträge mit durable=True
+  teilen sich einen fsync-Batch (persistence.SyncBatch, group commit)
+- on_done(key, error) wird im Worker-Thread aufgerufen (nach dem fsync) und darf
+  ebenfalls kein Tk anfassen; app.py reiht das Ergebnis nur in eine Queue ein,
+  die der UI-Thread abholt (root.after aus dem Worker würde auf die
+  Hauptschleife warten, die beim Beenden in stop() steckt)
+
+Die Aufträge dürfen kein Tk anfassen: alles, was aus Widgets kommt, wird im
+UI-Thread vorher als Schnappschuss übergeben.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+from .persistence import SyncBatch, durable_writes
+
+logger = logging.getLogger(__name__)
+
+
+class PersistenceWorker:
+    """Schreibaufträge je Schlüssel zusammenfassen und im Hintergrund ausführen."""
+
+    def __init__(self, on_done: Optional[Callable[[Hashable, Optional[Exception]], None]] = None) -> None:
+        self._on_done = on_done
+        self._cond = threading.Condition()
+        # dict behält die Position des ersten Auftrags: älteste Schlüssel zuerst
+        self._pending: dict[Hashable, tuple[Callable[[], Any], bool]] = {}
+        self._busy: list[Hashable] = []  # Schlüssel des laufenden Zyklus
+        self._stopping = False
+        self._thread: threading.Thread | None = None
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any, durable: bool = False) -> None:
+        """fn(*args) einreihen; durable=True: vor der Meldung an on_done fsyncen."""
+        job = functools.partial(fn, *args)
+        with self._cond:
+            # nach stop() und beendetem Worker gleich im aufrufenden Thread schreiben
+            run_now = self._stopping and self._thread is None
+            if not run_now:
+                previous = self._pending.get(key)
+                # ein ersetzter Auftrag mit fsync vererbt den Wunsch an den neuen
+                self._pending[key] = (job, durable or (previous is not None and previous[1]))
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="mindpic-writer", daemon=True)
+                    self._thread.start()
+                self._cond.notify_all()
+        if run_now:
+            self._execute({key: (job, durable)})
+
+    def pending(self) -> list[Hashable]:
+        with self._cond:
+            return self._busy + [key for key in self._pending if key not in self._busy]
+
+    def _execute(self, jobs: dict[Hashable, tuple[Callable[[], Any], bool]]) -> None:
+        batch = SyncBatch()
+        results: list[tuple[Hashable, bool, Optional[Exception]]] = []
+        for key, (job, durable) in jobs.items():
+            error = None
+            with durable_writes(batch if durable else None):
+                try:
+                    job()
+                except Exception as e:
+                    error = e
+                    logger.error("Background write %s failed: %s", key, e)
+            results.append((key, durable, error))
+        try:
+            batch.commit()
+        except OSError as e:
+            logger.error("fsync of write batch failed: %s", e)
+            results = [(key, durable, error or (e if durable else None)) for key, durable, error in results]
+        if self._on_done is None:
+            return
+        for key, _durable, error in results:
+            try:
+                self._on_done(key, error)
+            except Exception as e:
+                logger.error("Write callback for %s failed: %s", key, e)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    self._thread = None
+                    return
+                jobs, self._pending = self._pending, {}
+                self._busy = list(jobs)
+            try:
+                self._execute(jobs)
+            finally:
+                with self._cond:
+                    self._busy = []
+                    self._cond.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Warten, bis alles geschrieben ist. False, wenn timeout vorher abläuft."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def stop(self, timeout: float | None = None) -> bool:
+        """Ausstehendes noch schreiben (höchstens timeout Sekunden), danach synchron weiter."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        return self.flush(timeout)
+
+    def drain(self) -> list[Hashable]:
+        """
+        Nach abgelaufenem stop(): wartende Aufträge im aufrufenden Thread
+        ausführen. Schlüssel, die gerade im Worker hängen, bleiben liegen
+        (zwei Schreiber auf derselben Datei); sie werden zurückgegeben.
+        """
+        with self._cond:
+            busy = list(self._busy)
+            jobs = {key: job for key, job in self._pending.items() if key not in busy}
+            for key in jobs:
+                del self._pending[key]
+        self._execute(jobs)
+        return busy
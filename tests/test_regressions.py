@@ -1,12 +1,64 @@
+import io
+import json
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import date, datetime
 import unittest
 from unittest.mock import Mock, patch
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
 from mindpic import settings
-from mindpic.colorize import generate_timestamp, is_timestamp_line, iter_blocks
+from mindpic.colorize import (
+    BlockIndex,
+    LineRanges,
+    RuleSet,
+    generate_timestamp,
+    inline_spans,
+    is_timestamp_line,
+    iter_block_spans,
+    iter_blocks,
+    parse_timestamp,
+    set_timestamp_formats,
+    timestamp_of,
+)
 from mindpic.app import MindPicApp
-from mindpic.persistence import save_content
+from mindpic.hashtags import TagIndex, tag_postings, tags_in
+from mindpic.journal import NoteJournal, load_journaled_content, replay_journal, text_delta
+from mindpic.persistence import (
+    SidecarIndex,
+    atomic_write_text,
+    iter_backup,
+    load_sidecar_index,
+    load_tag_index,
+    restore_backup,
+    retained_backups,
+    save_content,
+    save_sidecar_index,
+    save_tag_index,
+    store_snapshot,
+    write_content,
+    write_json_if_changed,
+)
+from mindpic.reminders import ReminderIndex, ReminderScheduler, reminders_in
+from mindpic.stats import TopicStats, entries_per_day, longest_gaps
+from mindpic.tagging import TagApplier
+from mindpic.writer import PersistenceWorker
+from mindpic.navigation import (
+    DateIndex,
+    EntryFilter,
+    EntryOutline,
+    Timeline,
+    blocks_containing,
+    body_line_ranges,
+    hidden_line_ranges,
+    parse_date_query,
+    parse_date_range,
+    preset_range,
+)
 from mindpic.note_store import ensure_topics, topic_to_filename, unique_topic_name
 
 
@@ -40,36 +92,312 @@ class SaveBehaviorTests(unittest.TestCase):
         app._mark_saved = Mock()
         app._save_geometry = Mock()
         app._recolorize = Mock()
+        app._block_indexes = {}
+        app._tag_indexes = {}
+        app._dirty_topics = {settings.DEFAULT_ACTIVE_TOPIC}
+        app.root = Mock()
+        app._config_save_job = None
+        app._geometry_dirty = False
+        app._write_results = queue.SimpleQueue()
+        app._write_poll_job = None
+        app._writer = PersistenceWorker()
+        tmp = TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        notes = patch("mindpic.persistence.get_topic_path", side_effect=lambda topic: Path(tmp.name) / f"{topic}.txt")
+        notes.start()
+        self.addCleanup(notes.stop)
+        app._journals = {topic: NoteJournal(topic, "") for topic in ("Arbeit", "Privat", "Ideen", settings.DEFAULT_ACTIVE_TOPIC)}
+        app._journaled = set()
+        app._compact_requests = {}
+        app._compact_lock = threading.Lock()
+        self.addCleanup(app._writer.stop, 5)
         return app
 
     @patch("mindpic.app.save_config")
-    @patch("mindpic.app.save_content")
-    def test_autosave_state_save_does_not_insert_timestamp(self, save_content, save_config):
+    @patch("mindpic.journal.write_content")
+    def test_autosave_state_save_does_not_insert_timestamp(self, write_content, save_config):
         app = self.make_app()
 
         app.save_current_state()
+        app._writer.flush()
 
         self.assertEqual(app.ui.text.inserts, [])
-        save_content.assert_called_once_with("note", topic=settings.DEFAULT_ACTIVE_TOPIC)
+        write_content.assert_called_once_with("note", topic=settings.DEFAULT_ACTIVE_TOPIC, force_backup=False)
         save_config.assert_called_once_with(app.config)
-        app._save_geometry.assert_called_once()
+        app._save_geometry.assert_not_called()
         app._recolorize.assert_not_called()
 
     @patch("mindpic.app.save_config")
-    @patch("mindpic.app.save_content")
-    def test_explicit_save_inserts_timestamp_before_saving(self, save_content, save_config):
+    @patch("mindpic.journal.write_content")
+    def test_explicit_save_inserts_timestamp_before_saving(self, write_content, save_config):
         app = self.make_app()
 
         app.save_with_timestamp()
+        app._writer.flush()
 
         self.assertEqual(len(app.ui.text.inserts), 1)
         self.assertTrue(app.ui.text.inserts[0].startswith("\n"))
-        save_content.assert_called_once()
-        saved_text = save_content.call_args.args[0]
+        write_content.assert_called_once()
+        saved_text = write_content.call_args.args[0]
         self.assertIn("note\n", saved_text)
         self.assertRegex(saved_text, r"\d{2}-\d{2}-\d{4} \d{2}:\d{2}")
+        self.assertTrue(write_content.call_args.kwargs["force_backup"])
         app._recolorize.assert_called_once()
 
+    @patch("mindpic.app.save_config")
+    @patch("mindpic.journal.write_content")
+    def test_save_all_only_reads_and_writes_dirty_topics(self, write_content, save_config):
+        app = self.make_app()
+        app._topics = ["Arbeit", "Privat", "Ideen"]
+        app.ui.texts = {topic: Mock() for topic in app._topics}
+        app.ui.texts["Privat"].get.return_value = "changed"
+        app._dirty_topics = {"Privat"}
+
+        app.save_all_topics()
+        app._writer.flush()
+
+        write_content.assert_called_once_with("changed", topic="Privat", force_backup=False)
+        app.ui.texts["Arbeit"].get.assert_not_called()
+        app.ui.texts["Ideen"].get.assert_not_called()
+        self.assertEqual(app._dirty_topics, set())
+        save_config.assert_called_once_with(app.config)
+
+        write_content.reset_mock()
+        app.save_current_state()
+        app._writer.flush()
+        write_content.assert_not_called()
+
+    @patch("mindpic.app.save_config")
+    @patch("mindpic.journal.write_content")
+    def test_geometry_is_saved_once_after_the_window_settles(self, write_content, save_config):
+        app = self.make_app()
+        app.root.after.side_effect = ["job1", "job2", "poll"]
+        app._visible = False
+
+        app._on_configure(Mock(widget=app.root))
+        app._on_configure(Mock(widget=app.root))
+        app._on_configure(Mock(widget=Mock()))  # Kind-Widget, kein Fenster-Move
+        self.assertEqual(app.root.after.call_count, 2)
+        app.root.after_cancel.assert_called_once_with("job1")
+        app._save_geometry.assert_not_called()
+
+        app.save_current_state()
+        app.root.after_cancel.assert_called_with("job2")
+        app._save_geometry.assert_called_once()
+        app.save_current_state()
+        app._save_geometry.assert_called_once()
+        app._writer.flush()
+
+    @patch("mindpic.app.save_config")
+    @patch("mindpic.journal.write_content")
+    def test_autosave_appends_the_edit_and_tab_switch_compacts(self, write_content, save_config):
+        app = self.make_app()
+        topic = settings.DEFAULT_ACTIVE_TOPIC
+        app.ui.text.value = "x" * 10_000
+
+        app.save_current_state(compact=False)
+        app._writer.flush()
+        app.ui.text.value += "\n01-10-2026 09:00 neu"
+        app._dirty_topics.add(topic)
+        app.save_current_state(compact=False)
+        app._writer.flush()
+
+        write_content.assert_not_called()
+        journal = app._journals[topic]._path
+        self.assertLess(journal.stat().st_size - 10_000, 200)
+        self.assertEqual(app._journaled, {topic})
+
+        app.save_current_state()
+        app._writer.flush()
+        write_content.assert_called_once_with(app.ui.text.value, topic=topic, force_backup=False)
+        self.assertFalse(journal.exists())
+        self.assertEqual(app._journaled, set())
+
+    @patch("mindpic.app.save_config")
+    @patch("mindpic.journal.write_content")
+    def test_autosave_after_explicit_save_keeps_the_forced_backup(self, write_content, save_config):
+        app = self.make_app()
+        topic = settings.DEFAULT_ACTIVE_TOPIC
+        started, gate = threading.Event(), threading.Event()
+
+        def hold():
+            started.set()
+            gate.wait(5)
+
+        app._writer.submit("gate", hold)
+        self.assertTrue(started.wait(5))
+        app.save_with_timestamp()
+        app.ui.text.value += "\nweiter"
+        app._dirty_topics.add(topic)
+        app.save_current_state(compact=False)
+        gate.set()
+        app._writer.flush()
+
+        write_content.assert_called_once_with(app.ui.text.value, topic=topic, force_backup=True)
+        self.assertEqual(app._journaled, set())
+        self.assertEqual(app._compact_requests, {})
+
+    @patch("mindpic.app.save_config")
+    @patch("mindpic.journal.write_content")
+    def test_quit_does_not_wait_for_the_main_loop(self, write_content, save_config):
+        app = self.make_app()
+        app._writer = PersistenceWorker(app._on_write_done)
+        self.addCleanup(app._writer.stop, 5)
+        main_loop = threading.Event()  # wird nie gesetzt: die Hauptschleife steckt in stop()
+
+        def after(ms, fn=None):
+            # wie Tk mit Thread-Unterstützung: Aufrufe aus anderen Threads warten auf die Hauptschleife
+            if threading.current_thread() is not threading.main_thread():
+                main_loop.wait(2)
+            return "poll"
+
+        app.root.after.side_effect = after
+        app.save_current_state()
+        self.assertTrue(app._writer.stop(1))
+
+        app._write_poll_job = None
+        app._poll_write_results()
+        app._mark_saved.assert_called_once()
+        self.assertEqual(app._dirty_topics, set())
+
+    def test_durability_modes(self):
+        app = self.make_app()
+        for mode, autosave, explicit in (("none", False, False), ("explicit", False, True), ("always", True, True)):
+            app.config["durability"] = mode
+            self.assertEqual((app._durable(False), app._durable(True)), (autosave, explicit), mode)
+        app.config["durability"] = "bogus"
+        self.assertEqual((app._durable(False), app._durable(True)), (False, True))
+
+    def test_failed_background_write_marks_topic_dirty_again(self):
+        app = self.make_app()
+        app._dirty_topics = set()
+
+        app._write_finished(("content", "Privat"), OSError("share offline"))
+
+        self.assertEqual(app._dirty_topics, {"Privat"})
+        app.ui.status_label.configure.assert_called_with(text="Speichern fehlgeschlagen: Privat")
+        app._mark_saved.assert_not_called()
+
+
+class JournalTests(unittest.TestCase):
+    def test_text_delta_rebuilds_new_text(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            old = "".join(rng.choice("ab\nä") for _ in range(rng.randint(0, 9000)))
+            new = list(old)
+            for _ in range(rng.randint(0, 3)):
+                at = rng.randint(0, len(new))
+                new[at:at + rng.randint(0, 5)] = rng.choice(["", "b", "xä\n", "a" * 5000])
+            new = "".join(new)
+            start, end, insert = text_delta(old, new)
+            self.assertEqual(old[:start] + insert + old[end:], new)
+        self.assertEqual(text_delta("abc\n", "abc\nd"), (4, 4, "d"))
+
+    def test_leftover_journal_is_replayed_after_a_crash(self):
+        with TemporaryDirectory() as tmp:
+            note_path = Path(tmp) / "Allgemein.txt"
+            with patch("mindpic.persistence.get_topic_path", return_value=note_path), \
+                 patch("mindpic.persistence.get_backups_dir", return_value=Path(tmp) / "backups"), \
+                 patch("mindpic.journal.get_backups_dir", return_value=Path(tmp) / "backups"):
+                note_path.write_text("alt\n", encoding="utf-8")
+                journal = NoteJournal("Allgemein", "alt\n")
+                journal.append("alt\n01-10-2026 09:00 a")
+                journal.append("ALT\n01-10-2026 09:00 a\nb")
+                with open(note_path.with_suffix(".journal"), "a", encoding="utf-8") as f:
+                    f.write('[0, 3, "abgeschnit')  # Absturz mitten im Schreiben
+
+                self.assertEqual(load_journaled_content("Allgemein"), "ALT\n01-10-2026 09:00 a\nb")
+                self.assertEqual(note_path.read_text(encoding="utf-8"), "ALT\n01-10-2026 09:00 a\nb")
+                self.assertFalse(note_path.with_suffix(".journal").exists())
+
+                # Journal zu einem anderen Stand der .txt: nicht anwenden, aber aufheben
+                NoteJournal("Allgemein", "anders").append("anders!")
+                self.assertEqual(load_journaled_content("Allgemein"), "ALT\n01-10-2026 09:00 a\nb")
+                self.assertEqual(len(list((Path(tmp) / "backups").glob("*.journal"))), 1)
+
+    def test_replayed_edits_survive_a_failing_write(self):
+        with TemporaryDirectory() as tmp:
+            note_path = Path(tmp) / "Allgemein.txt"
+            backups = Path(tmp) / "backups"
+            with patch("mindpic.persistence.get_topic_path", return_value=note_path), \
+                 patch("mindpic.journal.get_backups_dir", return_value=backups):
+                note_path.write_text("alt", encoding="utf-8")
+                NoteJournal("Allgemein", "alt").append("alt neu")
+
+                with patch("mindpic.journal.write_content", side_effect=OSError("Platte voll")), \
+                     self.assertLogs("mindpic.journal", "ERROR"):
+                    self.assertEqual(load_journaled_content("Allgemein"), "alt neu")
+
+                self.assertFalse(note_path.with_suffix(".journal").exists())
+                kept = list(backups.glob("*.journal"))
+                self.assertEqual(len(kept), 1)
+                self.assertEqual(replay_journal(kept[0], "alt"), "alt neu")
+
+
+class PersistenceWorkerTests(unittest.TestCase):
+    def test_only_newest_pending_snapshot_per_key_is_written(self):
+        done = []
+        worker = PersistenceWorker(lambda key, error: done.append((key, error)))
+        gate = threading.Event()
+        written = []
+
+        worker.submit("a", gate.wait)
+        for version in range(3):
+            worker.submit("b", written.append, version)
+        worker.submit("c", written.append, "c")
+        self.assertFalse(worker.flush(0.01))
+        self.assertEqual(worker.pending(), ["a", "b", "c"])
+
+        gate.set()
+        self.assertTrue(worker.stop(5))
+        self.assertEqual(written, [2, "c"])
+        self.assertEqual([key for key, _e in done], ["a", "b", "c"])
+
+        worker.submit("d", written.append, "sync")  # nach stop(): direkt geschrieben
+        self.assertEqual(written[-1], "sync")
+
+    def test_durable_jobs_of_one_cycle_share_the_directory_fsync(self):
+        with TemporaryDirectory() as tmp:
+            worker = PersistenceWorker()
+            started, gate = threading.Event(), threading.Event()
+
+            def hold():
+                started.set()
+                gate.wait(5)
+
+            worker.submit("gate", hold)
+            self.assertTrue(started.wait(5))
+            for name in ("a", "b", "c"):
+                worker.submit(name, atomic_write_text, Path(tmp) / f"{name}.txt", name, durable=True)
+            worker.submit("d", atomic_write_text, Path(tmp) / "d.txt", "d")
+            with patch("mindpic.persistence.os.fsync") as fsync:
+                gate.set()
+                self.assertTrue(worker.stop(5))
+            # je ersetzte Datei ein fsync, das gemeinsame Verzeichnis nur einmal, "d" gar nicht
+            self.assertEqual(fsync.call_count, 3 + (0 if sys.platform.startswith("win") else 1))
+            self.assertEqual((Path(tmp) / "d.txt").read_text(encoding="utf-8"), "d")
+
+    def test_drain_skips_the_key_that_is_stuck(self):
+        worker = PersistenceWorker()
+        started, gate = threading.Event(), threading.Event()
+        written = []
+
+        def hold():
+            started.set()
+            gate.wait(5)
+
+        worker.submit("stuck", hold)
+        self.assertTrue(started.wait(5))
+        worker.submit("stuck", written.append, "newer")
+        worker.submit("other", written.append, "other")
+
+        self.assertFalse(worker.stop(0.01))
+        self.assertEqual(worker.drain(), ["stuck"])
+        self.assertEqual(written, ["other"])
+        gate.set()
+        self.assertTrue(worker.flush(5))
+        self.assertEqual(written, ["other", "newer"])
+
 
 class TimestampTests(unittest.TestCase):
     def test_generated_timestamp_is_plain_and_detected(self):
@@ -85,6 +413,759 @@ class TimestampTests(unittest.TestCase):
         ]
         self.assertEqual(iter_blocks(lines), [(0, 2), (2, 3)])
 
+    def test_streaming_scanner_matches_line_based_blocks(self):
+        text = "preamble\n09-06-2026 12:00 a\n  12:05\nbody\n09-06-2026\n12:10 split date\n\n2026-06-09 13:00 z\n"
+        spans = list(iter_block_spans(text))
+
+        self.assertEqual([(s, e) for s, e, _ in spans], iter_blocks(text.splitlines(True)))
+        self.assertEqual([text[o:].split("\n", 1)[0] for _, _, o in spans][0], "09-06-2026 12:00 a")
+        self.assertEqual(list(iter_block_spans(io.StringIO(text))), spans)
+        self.assertEqual([(s, e) for s, e, _ in iter_block_spans(text.encode("utf-8"))], [(s, e) for s, e, _ in spans])
+        self.assertEqual(list(iter_block_spans("no timestamps\nat all")), [(0, 2, 0)])
+
+
+class TimestampFormatTests(unittest.TestCase):
+    def tearDown(self):
+        set_timestamp_formats(None)
+
+    def test_default_formats_parse_to_datetime(self):
+        self.assertEqual(parse_timestamp("19-12-2025 18:44"), datetime(2025, 12, 19, 18, 44))
+        self.assertEqual(parse_timestamp(timestamp_of("  2025-12-12  18:44:05 x")), datetime(2025, 12, 12, 18, 44, 5))
+        self.assertEqual(parse_timestamp("18:44", date(2025, 12, 19)), datetime(2025, 12, 19, 18, 44))
+        self.assertIsNone(parse_timestamp("99-99-2025 18:44"))
+
+    def test_configured_format_is_detected_and_generated(self):
+        set_timestamp_formats(["[%Y/%m/%d %H:%M]", "%Q broken"])
+        self.assertEqual(timestamp_of("[2026/06/09 12:00] note"), "[2026/06/09 12:00]")
+        self.assertIsNone(timestamp_of("09-06-2026 12:00 no longer a header"))
+        self.assertEqual(list(iter_block_spans("x\n[2026/06/09 12:00] a\nb")), [(1, 3, 2)])
+        self.assertTrue(is_timestamp_line(generate_timestamp()))
+        self.assertEqual(parse_timestamp("[2026/06/09 12:00]"), datetime(2026, 6, 9, 12, 0))
+
+
+class DateNavigationTests(unittest.TestCase):
+    def test_date_index_bisects_and_follows_edits(self):
+        lines = [f"{d:02d}-03-2025 08:00 day {d}" for d in range(1, 29)] + ["12:00 lunch"]
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+        dates = DateIndex(index)
+
+        start, end = parse_date_query("14.03.2025")
+        self.assertEqual(index.starts[dates.first_at_or_after(start)], 13)
+        self.assertEqual(len(dates.between(*parse_date_range("10.03.2025 - 12.03.2025"))), 3)
+        self.assertEqual(dates.between(*parse_date_query("03.2025"))[-1], 28)  # time-only entry of the 28th
+
+        lines.insert(0, "01-01-2025 09:00 new year")
+        index.apply_edit(0, 0, 1, lambda a, b: lines[a:b])
+        self.assertEqual(index.starts[dates.first_at_or_after(datetime(2024, 12, 1))], 0)
+        self.assertEqual(index.starts[dates.first_at_or_after(start)], 14)
+        self.assertEqual(index.starts[dates.first_at_or_after(datetime(2030, 1, 1))], 29)
+
+    def test_date_queries(self):
+        self.assertEqual(parse_date_query("2024"), (datetime(2024, 1, 1), datetime(2025, 1, 1)))
+        self.assertEqual(parse_date_query("12.2024"), (datetime(2024, 12, 1), datetime(2025, 1, 1)))
+        self.assertEqual(parse_date_range("2024..2025"), (datetime(2024, 1, 1), datetime(2026, 1, 1)))
+        self.assertIsNone(parse_date_query("gestern"))
+
+
+class FilterFoldTests(unittest.TestCase):
+    def test_filter_ranges_cover_everything_but_matching_entries(self):
+        lines = ["Vorspann", "01-03-2025 08:00 Straße", "a", "02-03-2025 08:00 x", "b", "03-03-2025 08:00 TODO"]
+        content = "\n".join(lines)
+        index = BlockIndex()
+        index.reset(content)
+        self.assertEqual(blocks_containing(index, content, "todo"), {2})
+        self.assertEqual(blocks_containing(index, content, "STRASSE"), {0})  # casefold ß -> ss
+        self.assertEqual(hidden_line_ranges(index, {0, 2}), [(0, 1), (3, 5)])
+        self.assertEqual(hidden_line_ranges(index, set()), [(0, 6)])
+        self.assertEqual(body_line_ranges(index, range(3)), [(2, 3), (4, 5)])
+
+    def test_presets(self):
+        now = datetime(2025, 3, 14, 15, 30)
+        self.assertIsNone(preset_range("Alle", now))
+        self.assertEqual(preset_range("Heute", now)[0], datetime(2025, 3, 14))
+        self.assertEqual(preset_range("Letzte 7 Tage", now)[0], datetime(2025, 3, 8))
+        self.assertEqual(preset_range("Dieses Jahr", now)[0], datetime(2025, 1, 1))
+
+    def test_entry_filter_retests_only_edited_blocks(self):
+        lines = ["Vorspann", "01-03-2025 08:00 TODO", "a", "02-03-2025 08:00 x", "b"]
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+        tested = []
+
+        def matches(b_idx):
+            tested.append(b_idx)
+            end = index.starts[b_idx + 1] if b_idx + 1 < len(index.starts) else index.line_count
+            return "todo" in " ".join(lines[index.starts[b_idx]:end]).casefold()
+
+        entry_filter = EntryFilter(index, matches)
+        lines[4] = "b todo"
+        index.apply_edit(4, 0, 0, lambda a, b: lines[a:b])
+        self.assertEqual(entry_filter.update(), ([(3, 5)], []))
+        self.assertEqual(tested, [1])
+
+        lines.append("03-03-2025 08:00 y")
+        index.apply_edit(4, 0, 1, lambda a, b: lines[a:b])
+        self.assertEqual(entry_filter.update(), ([(3, 5)], [(5, 6)]))
+        self.assertEqual(entry_filter.update(), ([], []))
+        entry_filter.close()
+        self.assertEqual(index.listeners, [])
+
+    def test_open_filter_is_updated_after_edits_without_reading_the_text(self):
+        app = MindPicApp.__new__(MindPicApp)
+        app.root = Mock()
+        app.ui = Mock()
+        app._recolorize = Mock()
+        app._entry_filter = None
+
+        app._recolorize_debounced()
+        app.root.after.call_args.args[1]()
+        app.ui.text.tag_add.assert_not_called()
+
+        app._entry_filter = Mock()
+        app._entry_filter.update.return_value = ([(3, 5)], [(5, 6)])
+        app.root.after.call_args.args[1]()
+        app.ui.text.tk.call.assert_called_once_with(str(app.ui.text), "tag", "remove", "entry_filter", "4.0", "6.0")
+        app.ui.text.tag_add.assert_called_once_with("entry_filter", "6.0", "7.0")
+        app.ui.text.get.assert_not_called()
+        self.assertEqual(app._recolorize.call_count, 2)
+
+
+class TimelineTests(unittest.TestCase):
+    def test_merges_topics_in_time_order_page_by_page(self):
+        indexes = {}
+        for topic, days in {"A": [1, 4, 7], "B": [2, 3, 9], "C": []}.items():
+            index = BlockIndex()
+            index.reset("\n".join(f"{d:02d}-03-2025 08:00 {topic}{d}" for d in days))
+            indexes[topic] = index
+        timeline = Timeline({t: DateIndex(i) for t, i in indexes.items()}, page_size=2)
+
+        self.assertEqual(len(timeline), 6)
+        rows = [(timeline.entry(i).topic, timeline.entry(i).when.day) for i in range(6)]
+        self.assertEqual(rows, [("A", 1), ("B", 2), ("B", 3), ("A", 4), ("A", 7), ("B", 9)])
+        with patch.object(DateIndex, "entries", autospec=True, side_effect=DateIndex.entries) as entries:
+            self.assertEqual(timeline.entry(3).when.day, 4)  # rückwärts: ab gemerktem Seitenanfang
+        self.assertEqual([c.args[1] for c in entries.call_args_list], [1, 1, 0])
+        self.assertEqual(timeline.entry(1).block, 0)
+        with self.assertRaises(IndexError):
+            timeline.entry(6)
+
+        lines = ["05-03-2025 08:00 C5"]
+        indexes["C"].apply_edit(0, 1, 1, lambda a, b: lines[a:b])
+        self.assertEqual(len(timeline), 7)
+        self.assertEqual(timeline.entry(4).topic, "C")
+
+    def test_tabs_map_to_topics_by_widget(self):
+        app = MindPicApp.__new__(MindPicApp)
+        app.ui = Mock()
+        app.ui.texts = {"A": Mock(master=".nb.f1"), "B": Mock(master=".nb.f2")}
+        self.assertEqual(app._topic_for_tab(".nb.f2"), "B")
+        self.assertEqual(app._tab_id_for_topic("A"), ".nb.f1")
+        self.assertIsNone(app._topic_for_tab(".nb.timeline"))
+
+
+class HashtagTests(unittest.TestCase):
+    def test_tags_in_skips_headings_numbers_and_anchors(self):
+        text = "# Überschrift\n#Kunde-X und #inc-4711, Punkt #3\nhttps://x.de/#anker a#b"
+        self.assertEqual(tags_in(text), {"kunde-x", "inc-4711"})
+
+    def test_index_follows_block_edits_and_spans_topics(self):
+        lines = ["01-03-2025 08:00 #kunde", "x", "02-03-2025 08:00 nichts", "03-03-2025 08:00 #kunde #inc"]
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+        tags = TagIndex(index, lambda a, b: lines[a:b])
+        self.assertEqual(tags.blocks("#Kunde"), {0, 2})
+
+        lines[0:0] = ["28-02-2025 08:00 #inc"]
+        index.apply_edit(0, 0, 1, lambda a, b: lines[a:b])
+        self.assertEqual(tags.counts(), {"kunde": 2, "inc": 2})
+        self.assertEqual(tags.blocks("kunde"), {1, 3})
+
+        del lines[1:3]  # Eintrag "#kunde" samt Folgezeile entfernt
+        index.apply_edit(1, 2, 0, lambda a, b: lines[a:b])
+        self.assertEqual(tags.postings(), {"inc": [0, 2], "kunde": [2]})
+        lines[1:1] = ["01-03-2025 08:00 #kunde", "x"]
+        index.apply_edit(1, 0, 2, lambda a, b: lines[a:b])
+        self.assertEqual(tags.postings(), {"inc": [0, 3], "kunde": [1, 3]})
+
+        other_lines = ["05-03-2025 08:00 #kunde"]
+        other = BlockIndex()
+        other.reset(other_lines[0])
+        indexes = {"A": tags, "B": TagIndex(other, lambda a, b: other_lines[a:b])}
+        self.assertEqual(tag_postings(indexes, "kunde"), [("A", 1), ("A", 3), ("B", 0)])
+
+    def test_changed_only_when_tags_or_their_blocks_move(self):
+        lines = ["01-03-2025 08:00 #kunde", "x", "02-03-2025 08:00 nichts"]
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+        tags = TagIndex(index, lambda a, b: lines[a:b])
+        tags.postings()
+        tags.changed = False  # gespeichert
+
+        lines[1] = "y"
+        index.apply_edit(1, 0, 0, lambda a, b: lines[a:b])
+        lines.append("03-03-2025 08:00 neu")
+        index.apply_edit(2, 0, 1, lambda a, b: lines[a:b])
+        self.assertEqual(tags.postings(), {"kunde": [0]})
+        self.assertFalse(tags.changed)
+
+        lines[3] += " #inc"
+        index.apply_edit(3, 0, 0, lambda a, b: lines[a:b])
+        self.assertFalse(tags.changed)  # erst die Abfrage liest den Block
+        self.assertEqual(tags.counts(), {"kunde": 1, "inc": 1})
+        self.assertTrue(tags.changed)
+
+        tags.changed = False
+        lines[0:0] = ["28-02-2025 08:00 ohne"]
+        index.apply_edit(0, 0, 1, lambda a, b: lines[a:b])
+        self.assertTrue(tags.changed)  # Blocknummern getaggter Einträge verschoben
+
+    def test_tag_index_is_written_on_compaction_not_on_journal_appends(self):
+        lines = ["01-03-2025 08:00 #kunde", "x"]
+        text = "\n".join(lines)
+        index = BlockIndex()
+        index.reset(text)
+        app = MindPicApp.__new__(MindPicApp)
+        app._block_indexes = {"A": index}
+        app._tag_indexes = {"A": TagIndex(index, lambda a, b: lines[a:b])}
+        app._compact_lock = threading.Lock()
+        app._compact_requests = {}
+        app._dirty_topics = {"A"}
+        app._journaled = set()
+        journal = Mock(topic="A")
+        journal.compact.return_value = True
+        app._journals = {"A": journal}
+        app._writer = Mock()
+        widget = Mock()
+        widget.get.return_value = text
+
+        self.assertTrue(app._save_topic("A", widget, compact=False))
+        self.assertEqual([c.args[:2] for c in app._writer.submit.call_args_list], [(("content", "A"), journal.append)])
+
+        app._writer.submit.reset_mock()
+        self.assertTrue(app._save_topic("A", widget, compact=True))
+        key, fn, *args = app._writer.submit.call_args.args
+        self.assertEqual((key, fn), (("content", "A"), app._compact_topic))
+        self.assertEqual(app._writer.submit.call_count, 1)
+        with patch("mindpic.app.save_tag_index") as save_tags, patch("mindpic.app.save_sidecar_index"):
+            fn(*args)
+        save_tags.assert_called_once_with(text, {"kunde": [0]}, 1, "A")
+        self.assertFalse(app._save_topic("A", widget, compact=True))  # nichts mehr offen
+
+    def test_tag_index_round_trip(self):
+        with TemporaryDirectory() as tmp:
+            note_path = Path(tmp) / "Allgemein.txt"
+            with patch("mindpic.persistence.get_topic_path", return_value=note_path):
+                save_tag_index("text", {"kunde": [0, 2]}, 3, "Allgemein")
+                self.assertEqual(load_tag_index("text", 3, "Allgemein"), {"kunde": [0, 2]})
+                self.assertIsNone(load_tag_index("text!", 3, "Allgemein"))
+                self.assertIsNone(load_tag_index("text", 4, "Allgemein"))
+
+
+class StatsTests(unittest.TestCase):
+    def test_topic_stats_follow_edits_and_report_gaps(self):
+        lines = ["Vorspann", "01-03-2025 08:00 a", "text", "03-03-2025 08:00 b", "05-03-2025 20:00 c"]
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+        reads = []
+
+        def read_lines(a, b):
+            reads.append((a, b))
+            return lines[a:b]
+
+        stats = TopicStats(index, read_lines)
+        self.assertEqual(stats.chars(), len("\n".join(lines)))
+        reads.clear()
+        lines[2] = "mehr text"
+        index.apply_edit(2, 0, 0, lambda a, b: lines[a:b])
+        self.assertEqual((stats.entries, stats.chars()), (3, len("\n".join(lines))))
+        self.assertEqual(reads, [(1, 3)])  # nur der geänderte Block
+
+        dates = DateIndex(index)
+        gaps = longest_gaps([dates], 1)
+        self.assertEqual(gaps, [(datetime(2025, 3, 3, 8), datetime(2025, 3, 5, 20))])
+        per_day = dict(entries_per_day([dates], 7, date(2025, 3, 5)))
+        self.assertEqual((per_day[date(2025, 3, 1)], per_day[date(2025, 3, 2)]), (1, 0))
+
+
+class ReminderTests(unittest.TestCase):
+    def test_marker_needs_a_dated_timestamp(self):
+        found = reminders_in(["Anruf @due 24-10-2026 09:00", "@due 09:00", "mail@due.de 24-10-2026 09:00"], "A")
+        self.assertEqual([(r.due, r.text) for r in found], [(datetime(2026, 10, 24, 9), "Anruf @due 24-10-2026 09:00")])
+
+    def test_index_reschedules_only_edited_blocks(self):
+        lines = [
+            "01-03-2025 08:00 a @due 02-03-2025 10:00",
+            "01-03-2025 09:00 b",
+            "@due 01-03-2025 12:00",
+            "01-03-2025 10:00 alt @due 01-03-2025 09:30",
+        ]
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+        scheduler = ReminderScheduler()
+        reminders = ReminderIndex(index, lambda a, b: lines[a:b], "A", scheduler)
+        reminders.flush(now=datetime(2025, 3, 1, 10, 0))
+        self.assertEqual(len(scheduler), 2)  # 09:30 liegt schon zurück
+        self.assertEqual(scheduler.next_due(), datetime(2025, 3, 1, 12))
+
+        lines[2] = "@due 01-03-2025 11:00"
+        index.apply_edit(2, 0, 0, lambda a, b: lines[a:b])
+        self.assertTrue(reminders.pending)
+        reminders.flush(now=datetime(2025, 3, 1, 10, 0))
+        self.assertEqual(scheduler.next_due(), datetime(2025, 3, 1, 11))
+
+        due = scheduler.pop_due(datetime(2025, 3, 1, 12))
+        self.assertEqual([r.text for r in due], ["@due 01-03-2025 11:00"])
+        self.assertEqual(reminders.block_of(due[0]), 1)
+        self.assertEqual(scheduler.next_due(), datetime(2025, 3, 2, 10))
+
+    def test_single_after_job_for_next_deadline(self):
+        app = MindPicApp.__new__(MindPicApp)
+        app.root = Mock()
+        app.root.after.side_effect = ["job1", "job2"]
+        app._visible = False
+        app._reminder_job = None
+        app._reminders = ReminderScheduler()
+        for line in ("@due 01-01-2099 09:00", "@due 01-01-2098 09:00"):
+            for reminder in reminders_in([line], "A"):
+                app._reminders.add(reminder)
+        app._arm_reminder()
+        app._arm_reminder()
+        app.root.after_cancel.assert_called_once_with("job1")
+        self.assertEqual(app.root.after.call_args.args[0], settings.REMINDER_MAX_SLEEP_MS)
+
+
+    def test_unopened_topics_with_color_rules_get_their_reminders(self):
+        class LinesText:
+            def __init__(self, text):
+                self.lines = text.split("\n")
+
+            def get(self, start, end):
+                if (start, end) == ("1.0", "end-1c"):
+                    return "\n".join(self.lines)
+                return "\n".join(self.lines[int(start.split(".")[0]) - 1:int(end.split(".")[0]) - 1])
+
+        app = MindPicApp.__new__(MindPicApp)
+        app.root = Mock()
+        app.config = {"color_rules": [{"match": "TODO"}]}
+        app._topics = ["A", "B"]
+        app._block_indexes = {}
+        app._rule_set = None
+        app._reminder_indexes = {}
+        app._reminders = ReminderScheduler()
+        app._reminder_job = None
+        app.ui = Mock()
+        app.ui.texts = {"A": LinesText("nichts"), "B": LinesText("01-03-2099 08:00 TODO\n@due 02-03-2099 10:00")}
+
+        app._start_reminders()
+
+        self.assertEqual(app._reminders.next_due(), datetime(2099, 3, 2, 10))
+        app.root.after.assert_called_once()
+
+    def test_reminder_jumps_to_the_entry_only_if_the_window_was_hidden(self):
+        app = MindPicApp.__new__(MindPicApp)
+        app.root = Mock()
+        app._tray = None
+        app.toggle_visibility = Mock()
+        app._goto_topic_block = Mock()
+        app._mark_saved = Mock()
+        app._reminder_indexes = {"A": Mock(block_of=Mock(return_value=1))}
+        reminder = reminders_in(["@due 01-01-2099 09:00"], "A")[0]
+
+        app._visible = True
+        app._show_reminder(reminder)
+        app.toggle_visibility.assert_not_called()
+        app._goto_topic_block.assert_not_called()
+        app._mark_saved.assert_called_once()
+
+        app._visible = False
+        app._show_reminder(reminder)
+        app.toggle_visibility.assert_called_once()
+        app._goto_topic_block.assert_called_once_with("A", 1)
+
+
+class OutlineTests(unittest.TestCase):
+    def test_outline_reads_titles_lazily_and_follows_edits(self):
+        lines = ["09-06-2026 12:00 Planung Q3", "body", "10-06-2026 08:00", "Review mit Team", "x"]
+        reads = []
+
+        def read_lines(a, b):
+            reads.append((a, b))
+            return lines[a:b]
+
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+        outline = EntryOutline(index, read_lines)
+        self.assertEqual(len(outline), 2)
+        self.assertEqual(reads, [])
+        self.assertEqual(outline.title(1), "10-06-2026 08:00  Review mit Team")
+        self.assertEqual(reads, [(2, 4)])
+
+        lines.insert(2, "09-06-2026 18:00 Abend")
+        index.apply_edit(2, 0, 1, lambda a, b: lines[a:b])
+        self.assertEqual(len(outline), 3)
+        self.assertEqual([outline.title(i) for i in range(3)][1:], ["09-06-2026 18:00  Abend", "10-06-2026 08:00  Review mit Team"])
+
+        lines[4] = "Retro"
+        index.apply_edit(4, 0, 0, lambda a, b: lines[a:b])
+        self.assertEqual(outline.title(2), "10-06-2026 08:00  Retro")
+
+    def test_ctrl_up_down_jump_between_entries(self):
+        app = MindPicApp.__new__(MindPicApp)
+        app.config = {}
+        app._current_topic = settings.DEFAULT_ACTIVE_TOPIC
+        app._block_indexes = {}
+        app._rule_set = None
+        app.ui = Mock()
+        app.ui.outline = None
+        text = app.ui.text
+        app.ui.texts = {settings.DEFAULT_ACTIVE_TOPIC: text}
+        text.get.return_value = "pre\n09-06-2026 12:00 a\nbody\n09-06-2026 13:00 b\nbody"
+        text.index.return_value = "3.4"
+
+        app.jump_entry(1)
+        text.mark_set.assert_called_with("insert", "4.0")
+        app.jump_entry(-1)
+        text.mark_set.assert_called_with("insert", "2.0")
+
+
+class IncrementalRecolorTests(unittest.TestCase):
+    def make_index(self, lines):
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+        index.dirty.clear()
+        return index
+
+    def test_edit_inside_block_only_dirties_that_block(self):
+        lines = ["09-06-2026 12:00 a", "body", "09-06-2026 12:05 b", "body", "09-06-2026 12:10 c"]
+        index = self.make_index(lines)
+
+        lines[1] = "body changed"
+        index.apply_edit(1, 0, 0, lambda a, b: lines[a:b])
+
+        self.assertEqual(index.starts, [0, 2, 4])
+        self.assertEqual(list(index.dirty), [(1, 2)])
+
+    def test_new_timestamp_line_shifts_following_blocks(self):
+        lines = ["09-06-2026 12:00 a", "body", "09-06-2026 12:05 b"]
+        index = self.make_index(lines)
+
+        lines[1:2] = ["body", "09-06-2026 12:01 new"]
+        index.apply_edit(1, 0, 1, lambda a, b: lines[a:b])
+
+        self.assertEqual(index.starts, [0, 2, 3])
+        self.assertEqual(index.line_count, 4)
+        # cyclic colors of all following blocks change
+        self.assertEqual(list(index.dirty), [(1, 4)])
+
+    def test_dirty_ranges_move_with_later_edits(self):
+        ranges = LineRanges()
+        ranges.add(10, 12)
+        ranges.shift(2, 0, 3)
+        self.assertEqual(list(ranges), [(13, 15)])
+        self.assertEqual(ranges.take(0, 14), [(13, 14)])
+        self.assertEqual(list(ranges), [(14, 15)])
+
+
+class TagApplierTests(unittest.TestCase):
+    def test_batches_one_tk_call_per_tag_and_skips_unchanged(self):
+        applier = TagApplier()
+        text = Mock()
+        spans = [("note0", 0, 2), ("note1", 2, 4), ("note0", 4, 6)]
+
+        calls = applier.apply(text, [(0, 6)], spans, ["note0", "note1"])
+
+        self.assertEqual(calls, 2)
+        text.tag_add.assert_any_call("note0", "1.0", "3.0", "5.0", "7.0")
+        text.tk.call.assert_not_called()
+
+        text.reset_mock()
+        self.assertEqual(applier.apply(text, [(0, 6)], spans, ["note0", "note1"]), 0)
+
+    def test_edited_lines_are_reset_and_retagged(self):
+        applier = TagApplier()
+        text = Mock()
+        applier.apply(text, [(0, 4)], [("note0", 0, 2), ("note1", 2, 4)], ["note0", "note1"])
+        text.reset_mock()
+
+        # line 1 edited in place: its tags are unknown afterwards
+        applier.shift(1, 0, 0)
+        removes, adds = applier.diff([(1, 2)], [("note0", 1, 2)], ["note0", "note1"])
+
+        self.assertEqual(removes, {"note1": [(1, 2)]})
+        self.assertEqual(adds, {"note0": [(1, 2)]})
+
+
+class ViewportRecolorTests(unittest.TestCase):
+    def test_viewport_mode_only_tags_visible_lines(self):
+        content = "\n".join(f"09-06-2026 12:{i % 60:02d} entry {i}" for i in range(1000))
+        app = MindPicApp.__new__(MindPicApp)
+        app.config = {"note_colors": ["#111111", "#222222"], "colorize_mode": "viewport", "recolor_slice_ms": 0}
+        app._current_topic = settings.DEFAULT_ACTIVE_TOPIC
+        app._block_indexes = {}
+        app._rule_set = None
+        app._tag_appliers = {}
+        app._recolor_generation = 0
+        app._recolor_slice_job = None
+        app.root = Mock()
+        app.ui = Mock()
+        app.ui.count_label = None
+        app.ui.texts = {}
+        text = app.ui.text
+        text.get.return_value = content
+        text.compare.return_value = False
+        text.winfo_height.return_value = 300
+        text.index.side_effect = lambda idx: "500.0" if idx == "@0,0" else "520.0"
+
+        with patch("mindpic.settings.COLORIZE_VIEWPORT_MARGIN_LINES", 10), patch("mindpic.settings.RECOLOR_SLICE_BLOCKS", 10):
+            app._recolorize()
+            self.assertTrue(app.root.after_idle.called)
+            # Zeitbudget 0: jedes Häppchen gibt ab, after_idle hier von Hand abarbeiten
+            while app.root.after_idle.call_args:
+                callback = app.root.after_idle.call_args.args[0]
+                app.root.after_idle.reset_mock()
+                callback()
+
+        tagged = set()
+        for call in text.tag_add.call_args_list:
+            bounds = [int(idx.split(".")[0]) for idx in call.args[1:]]
+            for start, end in zip(bounds[::2], bounds[1::2]):
+                tagged.update(range(start, end))
+        self.assertEqual(tagged, set(range(490, 531)))
+        index = app._block_indexes[settings.DEFAULT_ACTIVE_TOPIC]
+        self.assertEqual(list(index.dirty), [(0, 489), (530, 1000)])
+
+
+class StableColorTests(unittest.TestCase):
+    def test_inserting_entry_keeps_colors_of_other_blocks(self):
+        lines = [f"09-06-2026 12:{i:02d} entry" for i in range(20)]
+        index = BlockIndex(cyclic_colors=False)
+        index.reset("\n".join(lines))
+        index.dirty.clear()
+        before = [index.color_index(i, 5) for i in range(20)]
+
+        lines.insert(1, "09-06-2026 11:59 inserted")
+        index.apply_edit(1, 0, 1, lambda a, b: lines[a:b])
+
+        after = [index.color_index(i, 5) for i in range(21)]
+        # block 2 had to avoid block 0's color before; now it may take its own
+        self.assertEqual(before[:2], [3, 4])
+        self.assertEqual(after[:3], [3, 2, 3])
+        self.assertEqual(after[3:], before[2:])
+        # the edited lines and the run of blocks whose color may depend on them, not everything
+        self.assertEqual(list(index.dirty), [(1, 8)])
+
+    @staticmethod
+    def line_colors(index, count=5):
+        colors = [None] * index.line_count
+        for b_idx, start, end in index.blocks_between(0, index.line_count):
+            colors[start:end] = [index.color_index(b_idx, count)] * (end - start)
+        return colors
+
+    def replay(self, lines, first, removed, new_lines):
+        """Edit anwenden, nur dirty Zeilen neu färben und mit einem frischen Index vergleichen."""
+        index = BlockIndex(cyclic_colors=False)
+        index.reset("\n".join(lines))
+        shown = self.line_colors(index)
+        index.dirty.clear()
+        lines = lines[:first] + new_lines + lines[first + removed + 1:]
+        index.apply_edit(first, removed, len(new_lines) - 1, lambda a, b: lines[a:b])
+        shown[first:first + removed + 1] = [None] * len(new_lines)
+        current = self.line_colors(index)
+        for start, end in index.dirty:
+            shown[start:end] = current[start:end]
+        fresh = BlockIndex(cyclic_colors=False)
+        fresh.reset("\n".join(lines))
+        self.assertEqual(shown, self.line_colors(fresh))
+
+    def test_deleting_the_first_entry_recolors_the_new_first_block(self):
+        lines = ["09-06-2026 12:00 a", "body", "09-06-2026 12:00 b", "body"]
+        self.replay(lines, 0, 1, ["body"])
+
+    def test_restamping_a_block_recolors_its_successor(self):
+        lines = ["09-06-2026 12:00 a", "body", "09-06-2026 12:00 b", "body"]
+        self.replay(lines, 0, 0, ["09-06-2026 12:02 a"])
+
+    def test_neighbouring_blocks_never_share_a_color(self):
+        index = BlockIndex(cyclic_colors=False)
+        index.reset("\n".join(["09-06-2026 12:00 same"] * 6 + [f"09-06-2026 13:{i:02d} x" for i in range(30)]))
+        colors = [index.color_index(i, 3) for i in range(36)]
+        self.assertTrue(all(a != b for a, b in zip(colors, colors[1:])), colors)
+
+    def test_cyclic_mode_is_still_available(self):
+        index = BlockIndex(cyclic_colors=True)
+        index.reset("09-06-2026 12:00 a\n09-06-2026 12:00 b")
+        self.assertEqual([index.color_index(i, 2) for i in range(2)], [0, 1])
+
+
+class ColorRuleTests(unittest.TestCase):
+    RULES = [
+        {"match": "TODO", "background": "#5a1e1e"},
+        {"regex": "(", "background": "#000000"},
+        {"regex": "^!.*", "scope": "line", "bold": True},
+    ]
+
+    def test_rules_scan_with_timestamps(self):
+        rules = RuleSet(self.RULES)
+        self.assertEqual(rules.tags, ["rule0", "rule2"])  # invalid regex skipped, names stay aligned
+        starts, _stamps, lines, masks = rules.scan("09-06-2026 12:00 todo\n!wichtig\nbody\n12:30 x")
+        self.assertEqual(starts, [0, 3])
+        self.assertEqual(lines, [0, 1])
+        self.assertEqual([rules.tags_for(m) for m in masks], [["rule0"], ["rule2"]])
+
+    def test_rules_that_break_the_combined_pattern_are_dropped(self):
+        with self.assertLogs("mindpic.colorize", "WARNING"):
+            rules = RuleSet(
+                [
+                    {"regex": "(?i)todo"},
+                    {"regex": "x(?i)y"},
+                    {"regex": r"(a)\1"},
+                    {"regex": "(?P<n>a)"},
+                    {"regex": "(?i:todo)"},
+                    {"regex": r"(\d+)\\1"},
+                ]
+            )
+        self.assertEqual(rules.tags, ["rule4", "rule5"])
+        _starts, _stamps, lines, masks = rules.scan("a\nTODO\n42\\1")
+        self.assertEqual((lines, masks), ([1, 2], [0b01, 0b10]))
+
+    def test_overlapping_keywords_all_apply(self):
+        rules = RuleSet([{"match": "inc"}, {"match": "Incident"}, {"match": "STRASSE"}, {"match": "#inc"}])
+        _starts, _stamps, lines, masks = rules.scan("a\n#incident\nStraße\nnichts\nzinc")
+        self.assertEqual(lines, [1, 2, 4])
+        self.assertEqual(masks, [0b1011, 0b0100, 0b0001])
+
+    def test_rule_matches_stay_within_one_line(self):
+        rules = RuleSet([{"regex": r"incident\s+\w+"}])
+        starts, _stamps, lines, _masks = rules.scan("10-06-2026 12:00 incident\n10-06-2026 13:00 next incident  x")
+        self.assertEqual(starts, [0, 1])
+        self.assertEqual(lines, [1])
+
+    def test_rules_on_the_same_span_all_apply(self):
+        rules = RuleSet([{"regex": "^!.*", "scope": "line"}, {"match": "#incident"}])
+        _starts, _stamps, lines, masks = rules.scan("10-06-2026 12:00 a\n! #incident offen")
+        self.assertEqual(lines, [1])
+        self.assertEqual(rules.tags_for(masks[0]), ["rule0", "rule1"])
+
+    def test_entry_rule_recolors_whole_entry_after_edit(self):
+        lines = ["09-06-2026 12:00 a", "body", "more", "09-06-2026 13:00 b", "!x"]
+        index = BlockIndex(rules=RuleSet(self.RULES))
+        index.reset("\n".join(lines))
+        self.assertEqual(sorted(index.rule_spans(0, 5)), [("rule2", 4, 5)])
+        index.dirty.clear()
+
+        lines[2] = "more TODO"
+        index.apply_edit(2, 0, 0, lambda a, b: lines[a:b])
+
+        self.assertEqual(list(index.dirty), [(0, 3)])
+        self.assertEqual(sorted(index.rule_spans(0, 5)), [("rule0", 0, 3), ("rule2", 4, 5)])
+
+
+class InlineHighlightTests(unittest.TestCase):
+    def test_inline_spans(self):
+        spans = list(inline_spans(["# Titel", "#hashtag siehe https://example.org/a.", "- [ ] offen [x] fertig"], 5))
+        self.assertEqual(
+            spans,
+            [
+                ("inline_heading", 5, 0, 7),
+                ("inline_url", 6, 15, 36),
+                ("inline_todo", 7, 2, 5),
+                ("inline_done", 7, 12, 15),
+            ],
+        )
+
+    def test_only_visible_edited_lines_are_highlighted(self):
+        lines = [f"line {i} https://example.org/{i}" for i in range(1000)]
+        app = MindPicApp.__new__(MindPicApp)
+        app.config = {}
+        text = Mock()
+        text.get.side_effect = lambda a, b: "\n".join(
+            lines[int(a.split(".")[0]) - 1 : int(b.split(".")[0]) - 1]
+        )
+        text.winfo_height.return_value = 300
+        text.index.side_effect = lambda idx: "500.0" if idx == "@0,0" else "520.0"
+        index = BlockIndex()
+        index.reset("\n".join(lines))
+
+        with patch("mindpic.settings.COLORIZE_VIEWPORT_MARGIN_LINES", 0):
+            app._highlight_inline(text, index)
+            self.assertEqual(list(index.inline_dirty), [(0, 499), (520, 1000)])
+            text.reset_mock()
+
+            lines[510] = "# edited"
+            index.apply_edit(510, 0, 0, lambda a, b: lines[a:b])
+            app._highlight_inline(text, index)
+
+        text.get.assert_called_once_with("511.0", "512.0")
+        text.tag_add.assert_called_once_with("inline_heading", "511.0", "511.8")
+
+
+    @patch("mindpic.app.webbrowser.open")
+    def test_ctrl_click_opens_only_links(self, open_url):
+        app = MindPicApp.__new__(MindPicApp)
+        text = Mock()
+        text.index.return_value = "1.20"
+        text.tag_prevrange.return_value = ("1.15", "1.30")
+        text.get.return_value = "www.example.org"
+        event = Mock(x=5, y=5)
+
+        text.tag_names.return_value = ()
+        self.assertIsNone(app._open_link_at(text, event))
+        open_url.assert_not_called()
+
+        text.tag_names.return_value = ("inline_url",)
+        self.assertEqual(app._open_link_at(text, event), "break")
+        open_url.assert_called_once_with("https://www.example.org")
+
+
+class TimeSlicedRecolorTests(unittest.TestCase):
+    def make_app(self, blocks):
+        app = MindPicApp.__new__(MindPicApp)
+        app.config = {"note_colors": ["#111111", "#222222"], "colorize_mode": "full", "recolor_slice_ms": 0}
+        app._current_topic = settings.DEFAULT_ACTIVE_TOPIC
+        app._block_indexes = {}
+        app._rule_set = None
+        app._tag_appliers = {}
+        app._recolor_generation = 0
+        app._recolor_slice_job = None
+        app.root = Mock()
+        app.ui = Mock()
+        app.ui.count_label = None
+        app.ui.texts = {}
+        app.ui.text.get.return_value = "\n".join(f"09-06-2026 12:00 entry {i}" for i in range(blocks))
+        app.ui.text.compare.return_value = False
+        app.ui.text.index.side_effect = Exception("not mapped")
+        return app
+
+    @patch("mindpic.settings.RECOLOR_SLICE_BLOCKS", 100)
+    def test_recolor_yields_between_slices_until_done(self):
+        app = self.make_app(250)
+        index_for = lambda: app._block_indexes[settings.DEFAULT_ACTIVE_TOPIC]
+
+        app._recolorize()
+        self.assertEqual(list(index_for().dirty), [(100, 250)])
+        app.ui.busy_label.configure.assert_called_with(text="Färbe ein… (150 Zeilen offen)")
+
+        while app.root.after_idle.call_args:
+            callback = app.root.after_idle.call_args.args[0]
+            app.root.after_idle.reset_mock()
+            callback()
+
+        self.assertFalse(index_for().dirty)
+        app.ui.busy_label.configure.assert_called_with(text="")
+
+    @patch("mindpic.settings.RECOLOR_SLICE_BLOCKS", 100)
+    def test_newer_edit_cancels_pending_slice(self):
+        app = self.make_app(250)
+        app._recolorize()
+        callback = app.root.after_idle.call_args.args[0]
+
+        app._recolor_generation += 1
+        app.ui.text.tag_add.reset_mock()
+        callback()
+
+        app.ui.text.tag_add.assert_not_called()
+
 
 class PathTests(unittest.TestCase):
     def test_default_dev_project_path_is_repo_root_not_hardcoded_windows_path(self):
@@ -131,14 +1212,178 @@ class PersistenceSafetyTests(unittest.TestCase):
 
             with patch("mindpic.persistence.get_topic_path", return_value=note_path), \
                  patch("mindpic.persistence.get_backups_dir", return_value=backup_dir), \
-                 patch("mindpic.settings.MAX_BACKUPS_PER_NOTE", 1):
+                 patch("mindpic.settings.MAX_BACKUPS_PER_NOTE", 1), \
+                 patch("mindpic.settings.BACKUP_MIN_INTERVAL_S", 0):
                 save_content("new", topic="Allgemein")
                 save_content("newer", topic="Allgemein")
 
             self.assertEqual(note_path.read_text(encoding="utf-8"), "newer")
-            backups = list(backup_dir.glob("Allgemein_*.txt"))
+            backups = list(backup_dir.glob("Allgemein_*.txt.manifest"))
             self.assertEqual(len(backups), 1)
-            self.assertEqual(backups[0].read_text(encoding="utf-8"), "new")
+            self.assertEqual(b"".join(iter_backup(backups[0])), b"new")
+            # der Chunk von "old" gehört zu keinem Manifest mehr
+            self.assertEqual(len(list((backup_dir / "chunks").glob("*/*"))), 1)
+
+    def test_backups_are_throttled_unless_forced(self):
+        with TemporaryDirectory() as tmp:
+            note_path = Path(tmp) / "notes" / "Allgemein.txt"
+            backup_dir = Path(tmp) / "backups"
+            note_path.parent.mkdir()
+            note_path.write_text("v0", encoding="utf-8")
+            with patch("mindpic.persistence.get_topic_path", return_value=note_path), \
+                 patch("mindpic.persistence.get_backups_dir", return_value=backup_dir):
+                for text in ("v1", "v2", "v3"):
+                    save_content(text, topic="Allgemein")
+                self.assertEqual(len(list(backup_dir.glob("Allgemein_*.txt.manifest"))), 1)
+                write_content("v4", topic="Allgemein", force_backup=True)
+            # das erzwungene Backup ersetzt das ältere derselben Stunde
+            backups = [b"".join(iter_backup(p)) for p in backup_dir.glob("Allgemein_*.txt.manifest")]
+            self.assertEqual(backups, [b"v3"])
+
+    def test_backup_retention_is_hourly_then_daily_then_weekly(self):
+        now = time.mktime((2026, 10, 15, 12, 0, 0, 0, 0, -1))
+        hour, day = 3600, 24 * 3600
+        backups = [(now - m * 60, f"m{m}") for m in range(0, 180, 10)]  # drei Stunden alle 10 min
+        backups += [(now - d * day - h * hour, f"d{d}h{h}") for d in range(2, 5) for h in (0, 5)]
+        backups += [(now - w * 7 * day - d * day, f"w{w}d{d}") for w in (6, 7) for d in (0, 1)]
+
+        keep = retained_backups(backups, now)
+
+        self.assertEqual(keep[:5], ["m0", "m10", "m70", "m130", "d2h0"])  # je volle Stunde das neueste
+        self.assertEqual([k for k in keep if k.startswith("d")], ["d2h0", "d3h0", "d4h0"])
+        self.assertEqual(sum(k.startswith("w6") for k in keep), 1)
+        self.assertEqual(sum(k.startswith("w7") for k in keep), 1)
+        with patch("mindpic.settings.MAX_BACKUPS_PER_NOTE", 2):
+            self.assertEqual(retained_backups(backups, now), ["m0", "m10"])
+
+    def test_backup_store_keeps_shared_chunks_once(self):
+        rnd = random.Random(7)
+        words = "notiz termin kunde rückruf ticket meeting idee #incident todo erledigt".split()
+        lines = [f"{generate_timestamp()} " + " ".join(rnd.choices(words, k=10)) for _ in range(15_000)]
+        with TemporaryDirectory() as tmp:
+            note, backups = Path(tmp) / "Allgemein.txt", Path(tmp) / "backups"
+            text = "\n".join(lines)
+            for n in range(20):
+                if n == 10:
+                    text = text[:len(text) // 2] + "\neingeschoben\n" + text[len(text) // 2:]
+                else:
+                    text += f"\n{generate_timestamp()} Eintrag {n}"
+                note.write_text(text, encoding="utf-8")
+                chunks_before = len(list((backups / "chunks").glob("*/*")))
+                store_snapshot(note, backups / f"Allgemein_{n:02d}.txt.manifest")
+                self.assertLessEqual(len(list((backups / "chunks").glob("*/*"))) - chunks_before, 3 if n else 10_000)
+
+            stored = sum(p.stat().st_size for p in backups.rglob("*") if p.is_file())
+            self.assertLess(stored, note.stat().st_size)  # 20 Stände kleiner als eine Kopie
+            restored = Path(tmp) / "zurück.txt"
+            restore_backup(backups / "Allgemein_19.txt.manifest", restored)
+            self.assertEqual(restored.read_text(encoding="utf-8"), text)
+
+    def test_restore_rejects_a_corrupt_chunk_and_keeps_the_target(self):
+        with TemporaryDirectory() as tmp:
+            note, backups = Path(tmp) / "Allgemein.txt", Path(tmp) / "backups"
+            note.write_text("eins\nzwei\n", encoding="utf-8")
+            store_snapshot(note, backups / "Allgemein_1.txt.manifest")
+            chunk = next((backups / "chunks").glob("*/*"))
+            chunk.write_bytes(b"n" + b"kaputt")
+
+            with self.assertRaises(ValueError):
+                restore_backup(backups / "Allgemein_1.txt.manifest", note)
+            self.assertEqual(note.read_text(encoding="utf-8"), "eins\nzwei\n")
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ["Allgemein.txt", "backups"])
+
+    def test_unchanged_save_skips_reading_but_notices_external_edits(self):
+        with TemporaryDirectory() as tmp:
+            note_path = Path(tmp) / "Allgemein.txt"
+            with patch("mindpic.persistence.get_topic_path", return_value=note_path), \
+                 patch("mindpic.persistence.get_backups_dir", return_value=Path(tmp) / "backups"):
+                self.assertTrue(save_content("eins", topic="Allgemein"))
+                with patch.object(Path, "read_text", side_effect=AssertionError("read")):
+                    self.assertFalse(save_content("eins", topic="Allgemein"))
+
+                note_path.write_text("von außen geändert", encoding="utf-8")
+                self.assertTrue(save_content("eins", topic="Allgemein"))
+                self.assertEqual(note_path.read_text(encoding="utf-8"), "eins")
+
+    def test_identical_json_is_not_rewritten(self):
+        with TemporaryDirectory() as tmp:
+            path = Path(tmp) / "config.json"
+            self.assertTrue(write_json_if_changed(path, {"a": 1}))
+            with patch("mindpic.persistence.atomic_write_text", side_effect=AssertionError("write")):
+                self.assertFalse(write_json_if_changed(path, {"a": 1}))
+            self.assertTrue(write_json_if_changed(path, {"a": 2}))
+            self.assertEqual(json.loads(path.read_text(encoding="utf-8")), {"a": 2})
+
+    def test_sidecar_index_round_trip_and_staleness(self):
+        content = "pre\n19-12-2025 18:44 a\nbody\n18:50 b\n12.12.2025 09:00 c"
+        index = BlockIndex()
+        index.reset(content)
+        with TemporaryDirectory() as tmp:
+            note_path = Path(tmp) / "Allgemein.txt"
+            note_path.write_text(content, encoding="utf-8")
+            with patch("mindpic.persistence.get_topic_path", return_value=note_path):
+                save_sidecar_index(
+                    content, SidecarIndex(index.starts, index.keys, index.times, index.line_count), "Allgemein"
+                )
+                cached = load_sidecar_index(content, "Allgemein")
+                self.assertIsNone(load_sidecar_index(content + "x", "Allgemein"))
+
+                note_path.write_text(content + "\nmore", encoding="utf-8")
+                self.assertIsNone(load_sidecar_index(content + "\nmore", "Allgemein"))
+
+        restored = BlockIndex()
+        restored.load(cached.starts, cached.keys, cached.times, cached.line_count)
+        self.assertEqual((restored.starts, restored.keys, restored.line_count), (index.starts, index.keys, 5))
+        self.assertEqual(restored.block_times(), index.block_times())
+        self.assertEqual(restored.block_time(1), datetime(2025, 12, 19, 18, 50))
+
+    def test_missing_indexes_are_rebuilt_off_thread_and_adopted_on_poll(self):
+        active = "19-12-2025 18:44 a\nbody"
+        other = "pre\n18:50 b\n12.12.2025 09:00 c"
+        app = MindPicApp.__new__(MindPicApp)
+        app.root = Mock()
+        app.config = {}
+        app._rule_set = None
+        app._writer = Mock()
+        app._current_topic = "Aktiv"
+        app._index_results = queue.SimpleQueue()
+        app._index_poll_job = None
+        app._block_indexes = {}
+        app._block_index("Aktiv").reset(active)  # schon von _recolorize gebaut
+        app._block_index("Anderes")
+        app._index_rebuilds = [("Aktiv", active), ("Anderes", other)]
+        texts = {"Aktiv": Mock(), "Anderes": Mock()}
+        texts["Anderes"].get.return_value = other
+        app.ui = Mock(texts=texts)
+        app._sync_reminders = Mock()
+        app._refresh_outline = Mock()
+        rebuilt = []
+        main = threading.current_thread()
+
+        def rebuild(jobs):
+            self.assertIsNot(threading.current_thread(), main)
+            rebuilt.extend(topic for topic, _ in jobs)
+            MindPicApp._rebuild_block_indexes(app, jobs)
+
+        with patch.object(app, "_rebuild_block_indexes", side_effect=rebuild):
+            app._start_index_rebuilds()
+            for thread in threading.enumerate():
+                if thread.name == "mindpic-index":
+                    thread.join(5)
+
+        self.assertEqual(rebuilt, ["Anderes"])
+        self.assertFalse(app._block_indexes["Anderes"].ready)  # erst der Poll übernimmt
+        app._writer.submit.assert_not_called()
+        _, poll = app.root.after.call_args[0]
+        poll()
+
+        self.assertTrue(app._block_indexes["Anderes"].ready)
+        self.assertEqual(app._block_indexes["Anderes"].starts, [1, 2])
+        key, fn, content, sidecar, topic = app._writer.submit.call_args[0]
+        self.assertEqual((key, fn, content, topic), (("sidecar", "Anderes"), save_sidecar_index, other, "Anderes"))
+        self.assertEqual(sidecar.starts, [1, 2])
+        app._sync_reminders.assert_called_once_with("Anderes")
+        self.assertEqual(app.root.after.call_count, 1)  # alles da: kein weiterer Poll
 
 
 class HotkeyToggleTests(unittest.TestCase):